@@ -0,0 +1,146 @@
+"""
+Micro-benchmark for the construction cost and memory footprint of scene atoms.
+
+Reports constructions per second and bytes per vertex for points and lines, and
+the time taken by two construction-heavy producers: the WaveLines generator and
+the SVG importer.
+
+Run from the repository root with::
+
+    python -m benchmarks.atoms
+
+To compare against an earlier version, pass ``--baseline`` a git revision. The same
+measurements are then also run against the ``grafeo`` package as of that revision,
+e.g. the commit before atoms were slotted::
+
+    python -m benchmarks.atoms --baseline <revision>
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from grafeo.generators.impl.NoiseLineGenerator import NoiseLineGenerator
+from grafeo.models.atoms import Line, Point
+from grafeo.pens import Pen
+from grafeo.svg.Svg import Svg
+
+NUM_POINTS = 100_000
+LINE_LENGTH = 500
+NUM_LINES = 200
+
+
+def rate(fn, count: int, repeat: int = 3) -> float:
+    """Get the best-of-`repeat` rate at which `fn` performs `count` constructions."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def allocated_bytes(fn) -> int:
+    """Get the number of bytes still allocated by the objects `fn` returns."""
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def best_time(fn, repeat: int = 3) -> float:
+    """Get the best-of-`repeat` wall time of `fn`, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_points():
+    return [Point(float(i), float(i), Pen.One) for i in range(NUM_POINTS)]
+
+
+def make_lines(points):
+    return [Line(points[i:i + LINE_LENGTH], Pen.One) for i in range(0, LINE_LENGTH * NUM_LINES, LINE_LENGTH)]
+
+
+def make_svg() -> Svg:
+    rng = random.Random(0)
+    paths = []
+    for _ in range(500):
+        coords = " L ".join(f"{rng.uniform(0, 1000):.3f},{rng.uniform(0, 1000):.3f}" for _ in range(100))
+        paths.append({"d": f"M {coords}"})
+    return Svg(paths, 1000, 1000)
+
+
+def generate_wave_lines():
+    random.seed(0)
+    generator = NoiseLineGenerator()
+    return generator._generate(generator.params.get_dict_values())
+
+
+def count_vertices(model) -> int:
+    # Lines only have coordinate arrays in later versions, but always have points
+    return sum(len(line.points) for line in model.all_lines)
+
+
+def import_svg(svg: Svg):
+    svg.model = None
+    return svg.get_model()
+
+
+def run_baseline(revision: str):
+    """Run this benchmark in a separate process, against the `grafeo` package as of a git revision."""
+    root = Path(__file__).resolve().parent.parent
+    with tempfile.TemporaryDirectory() as directory:
+        archive = subprocess.run(
+            ["git", "archive", revision, "grafeo"], cwd=root, check=True, capture_output=True
+        ).stdout
+        subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+        # Run as a script, so the package is imported from the extracted tree rather than the working one
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join([directory, os.environ.get("PYTHONPATH", "")]))
+        subprocess.run([sys.executable, __file__], env=environment, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--baseline", metavar="REVISION", help="also measure the package as of this git revision")
+    args = parser.parse_args()
+    if args.baseline is not None:
+        print(f"Baseline ({args.baseline}):", flush=True)
+        run_baseline(args.baseline)
+        print("Working tree:")
+    measure()
+
+
+def measure():
+    points = make_points()
+    point_bytes = allocated_bytes(make_points) / NUM_POINTS
+    line_bytes = allocated_bytes(lambda: make_lines(points)) / (LINE_LENGTH * NUM_LINES)
+
+    print(f"Point: {rate(make_points, NUM_POINTS):>12,.0f} constructions/s {point_bytes:>8.1f} bytes/vertex")
+    print(
+        f"Line:  {rate(lambda: make_lines(points), LINE_LENGTH * NUM_LINES):>12,.0f} vertices/s     "
+        f"{line_bytes:>8.1f} bytes/vertex"
+    )
+
+    wave_lines = generate_wave_lines()
+    num_vertices = count_vertices(wave_lines)
+    print(f"WaveLines ({num_vertices:,} vertices): {best_time(generate_wave_lines):.3f}s")
+
+    svg = make_svg()
+    num_vertices = count_vertices(import_svg(svg))
+    print(f"SVG import ({num_vertices:,} vertices): {best_time(lambda: import_svg(svg)):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Byte-count comparison of GPGL encodings.
+
+Encodes the same lines, in plotter units, both as one absolute command per vertex
+(the previous encoding) and with the compact encoding, which chains vertices into
+draw commands and picks relative coordinates where shorter. Reports bytes sent
+and transfer time at the Graphtec MP4100's default serial settings.
+
+Run from the repository root with::
+
+    python -m benchmarks.gpgl_bytes
+"""
+import json
+
+import numpy as np
+
+from grafeo.config.ConfigManager import PRINTERS_PATH
+from grafeo.models import PackedLines
+from grafeo.printers.GpglPrinter import ETX, GpglPrinter
+from grafeo.serializers.SerialSerializer import SerialSerializer
+
+NUM_LINES = 2_000
+PEN_MAP = {"1": {"descr": "black", "pause_to_replace": False, "location": 1}}
+
+
+def dense_splines() -> PackedLines:
+    """Smooth curves sampled a few plotter units apart, like flattened splines."""
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(20, 400, NUM_LINES)
+    angles = np.cumsum(rng.normal(0, 0.05, lengths.sum()))
+    steps = 4 * np.column_stack([np.cos(angles), np.sin(angles)])
+    starts = rng.uniform(1000, 15000, (NUM_LINES, 2))
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    coords = np.cumsum(steps, axis=0)
+    coords += np.repeat(starts - coords[offsets[:-1]], lengths, axis=0)
+    return PackedLines(coords, offsets, np.ones(NUM_LINES, dtype=np.int64))
+
+
+def hatching() -> PackedLines:
+    """Long straight strokes, two vertices each, spread over the page."""
+    rng = np.random.default_rng(0)
+    starts = rng.uniform(500, 16000, (NUM_LINES, 2))
+    ends = starts + rng.uniform(-3000, 3000, (NUM_LINES, 2))
+    coords = np.stack([starts, ends], axis=1).reshape(-1, 2)
+    return PackedLines(coords, np.arange(0, 2 * NUM_LINES + 1, 2), np.ones(NUM_LINES, dtype=np.int64))
+
+
+def per_vertex_bytes(lines: PackedLines) -> int:
+    """Get the bytes of one absolute M or D command per vertex."""
+    points = np.rint(lines.coords).astype(np.int64).tolist()
+    return sum(len(b"M%d,%d" % tuple(point)) + len(ETX) for point in points)
+
+
+def compact_bytes(lines: PackedLines) -> int:
+    commands = GpglPrinter(None).generate_commands(lines, None, PEN_MAP)
+    return sum(len(command) + len(ETX) for command in commands if command[:1] in b"MDE")
+
+
+def main():
+    with open(PRINTERS_PATH) as f:
+        serial_settings = json.load(f)[0]["connection_defaults"]
+    bytes_per_second = SerialSerializer.get_bytes_per_second(serial_settings)
+    print(f"Sending at {serial_settings['baud']} baud ({bytes_per_second:.0f} bytes/s)")
+    for name, lines in (("dense splines", dense_splines()), ("hatching", hatching())):
+        before, after = per_vertex_bytes(lines), compact_bytes(lines)
+        print(f"{name} ({lines.num_vertices} vertices):")
+        print(f"  per-vertex commands: {before:10,} bytes, {before / bytes_per_second:8.0f} s")
+        print(f"  compact commands:    {after:10,} bytes, {after / bytes_per_second:8.0f} s ({after / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+End-to-end benchmark of the print pipeline, against a simulated plotter.
+
+A generated model is added to the print with two pens, one replaced by hand, and
+printed through the GPGL printer to a mock plotter at the Graphtec MP4100's
+settings. Reports the wall time taken to prepare and send the print, the simulated
+time the plotter takes to draw it next to the printer's own estimate, and how often
+flow control paused sending. Checks that what the plotter drew covers the model's
+lines as placed on paper before they were optimized, and nothing else, to within
+the distance by which merging and simplifying may move them.
+
+Run from the repository root with::
+
+    python -m benchmarks.plot_pipeline
+"""
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from grafeo.config.ConfigManager import PRINTERS_PATH
+from grafeo.generators.impl.NoiseLineGenerator import NoiseLineGenerator
+from grafeo.models import PackedLines
+from grafeo.pens import Pen
+from grafeo.printers.GpglPrinter import GpglPrinter
+from grafeo.printers.Printer import MERGE_TOLERANCE, SIMPLIFY_TOLERANCE
+from grafeo.serializers.MockPlotterSerializer import MockPlotter, MockPlotterSerializer
+from grafeo.serializers.SerialSerializer import SerialSerializer
+
+NUM_LINES = 300
+PEN_MAP = {
+    str(pen.value): (
+        {"descr": "black", "pause_to_replace": False, "location": 1}
+        if pen.value % 2
+        else {"descr": "red", "pause_to_replace": True, "location": 3}
+    )
+    for pen in Pen
+}
+
+
+# Greatest distance by which the plotted lines may stray from the unoptimized ones
+TOLERANCE = MERGE_TOLERANCE + SIMPLIFY_TOLERANCE
+# Greatest distance between points sampled along lines when rasterizing them
+SAMPLE_SPACING = 1
+# Rounding samples to pixels moves them by less than half a pixel along each axis, so a
+# point within the tolerance of a line lands within this many pixels of one of its samples
+COVERAGE_RADIUS = int(np.ceil(TOLERANCE + SAMPLE_SPACING / 2))
+
+
+def rasterize(lines: PackedLines, width: int, height: int) -> np.ndarray:
+    """Get a (width, height) mask of the unit pixels the lines pass through, sampled along every segment."""
+    mask = np.zeros((width, height), dtype=bool)
+    starts, ends, _ = lines.segments()
+    samples = np.ceil(np.hypot(*(ends - starts).T) / SAMPLE_SPACING).astype(np.int64) + 1
+    segment_indices = np.repeat(np.arange(len(samples)), samples)
+    ratios = (np.arange(samples.sum()) - np.repeat(np.cumsum(samples) - samples, samples)) / np.repeat(samples - 1, samples)
+    points = starts[segment_indices] + (ends - starts)[segment_indices] * ratios[:, None]
+    x, y = np.rint(points).astype(np.int64).T
+    mask[np.clip(x, 0, width - 1), np.clip(y, 0, height - 1)] = True
+    return mask
+
+
+def dilate(mask: np.ndarray, radius: int) -> np.ndarray:
+    """Grow a mask by some number of pixels along both axes."""
+    for axis in (0, 1):
+        grown = mask.copy()
+        for shift in range(1, radius + 1):
+            ahead = [slice(None), slice(None)]
+            behind = [slice(None), slice(None)]
+            ahead[axis], behind[axis] = slice(shift, None), slice(None, -shift)
+            grown[tuple(ahead)] |= mask[tuple(behind)]
+            grown[tuple(behind)] |= mask[tuple(ahead)]
+        mask = grown
+    return mask
+
+
+def uncovered_pixels(expected: PackedLines, plotted: PackedLines, width: int, height: int) -> tuple[int, int]:
+    """
+    Compare the expected and plotted lines, rasterized, regardless of direction, order and pen.
+
+    :return: The number of pixels of the expected lines the plot doesn't come within the
+        tolerance of, and of the plotted lines that don't come within it of the expected ones
+    """
+    expected_mask = rasterize(expected, width, height)
+    plotted_mask = rasterize(plotted, width, height)
+    return (
+        int(np.count_nonzero(expected_mask & ~dilate(plotted_mask, COVERAGE_RADIUS))),
+        int(np.count_nonzero(plotted_mask & ~dilate(expected_mask, COVERAGE_RADIUS))),
+    )
+
+
+def main():
+    with open(PRINTERS_PATH) as f:
+        printer_config = json.load(f)[0]
+    serial_settings = printer_config["connection_defaults"]
+    print_settings = {
+        "resolution_x": printer_config["resolution_x"],
+        "resolution_y": printer_config["resolution_y"],
+        "margin_x": printer_config["default_margin_x"],
+        "margin_y": printer_config["default_margin_y"],
+    }
+    random.seed(0)
+    generator = NoiseLineGenerator()
+    params = generator.params.get_dict_values()
+    params["num_lines"] = NUM_LINES
+    model = generator._generate(params)
+
+    plotter = MockPlotter(
+        baud=serial_settings["baud"],
+        bits_per_byte=serial_settings["baud"] / SerialSerializer.get_bytes_per_second(serial_settings),
+        motion=printer_config["motion"],
+    )
+    printer = GpglPrinter(MockPlotterSerializer(plotter), printer_config["motion"])
+    # The real plotter needs a moment to initialize, the mock doesn't
+    sys.modules[GpglPrinter.__module__].sleep = lambda seconds: None
+
+    expected = printer.place_lines(model, print_settings, 0, 0, 1, 0)
+
+    start = time.perf_counter()
+    printer.add_to_print(model, PEN_MAP, print_settings, 0, 0, 1, 0)
+    estimate = printer.estimate(SerialSerializer.get_bytes_per_second(serial_settings)).total
+    printer.begin_print()
+    pen_changes = 0
+    while printer.printing:
+        # Replace the pen straight away
+        pen_changes += 1
+        printer.continue_print()
+    elapsed = time.perf_counter() - start
+
+    missing, stray = uncovered_pixels(
+        expected, plotter.plotted_lines(), printer_config["resolution_x"] + 1, printer_config["resolution_y"] + 1
+    )
+    print(f"{NUM_LINES} noise lines, {expected.num_vertices:,} vertices, {pen_changes} pen changes by hand")
+    print(f"  pipeline wall time:  {elapsed:8.3f} s")
+    print(f"  bytes sent:          {plotter.bytes_received:8,} ({plotter.commands_executed:,} commands)")
+    print(f"  flow control pauses: {plotter.pauses:8,}")
+    print(f"  simulated plot time: {plotter.elapsed:8.0f} s (estimated {estimate.seconds:.0f} s)")
+    print(f"  plotted output:      {'matches' if missing == stray == 0 else 'CHANGED'} (within {TOLERANCE} units)")
+    if missing or stray:
+        raise SystemExit(f"{missing:,} pixels of the model not drawn, {stray:,} pixels drawn outside of it")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Throughput benchmark for sending GPGL commands through the serial serializer.
+
+Commands for a job of random lines are sent over a pseudo-terminal to a mock plotter,
+once writing each command as it comes and once with buffered writes. The mock
+executes commands as fast as it can, and pauses the sender with XOFF/XON whenever
+its receive buffer fills up, like a plotter does. Reports commands per second for
+each mode.
+
+Run from the repository root (on a system with pseudo-terminals) with::
+
+    python -m benchmarks.serial_throughput
+"""
+import time
+
+import numpy as np
+
+from grafeo.models import PackedLines
+from grafeo.printers.GpglPrinter import GpglPrinter
+from grafeo.serializers.MockPlotterSerializer import MockPlotter
+from grafeo.serializers.SerialSerializer import DEFAULT_CHUNK_SIZE, SerialSerializer
+
+NUM_LINES = 20_000
+LINE_LENGTH = 25
+PEN_MAP = {"1": {"descr": "black", "pause_to_replace": False, "location": 1}}
+
+
+def make_commands() -> list[bytes]:
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(0, 10_000, size=(NUM_LINES * LINE_LENGTH, 2))
+    offsets = np.arange(0, len(coords) + 1, LINE_LENGTH)
+    lines = PackedLines(coords, offsets, np.ones(NUM_LINES, dtype=np.int64))
+    return [command + b"\x03" for command in GpglPrinter(None).generate_commands(lines, None, PEN_MAP)]
+
+
+def send(commands: list[bytes], chunk_size: int) -> float:
+    """Get the time taken to send all commands until the mock plotter has executed them."""
+    plotter = MockPlotter()
+    try:
+        serializer = SerialSerializer(
+            {
+                "port": plotter.serve_pty(time_scale=0),
+                "baud": 9600,
+                "bytesize": 8,
+                "parity": "none",
+                "stopbits": "1",
+                "flowcontrol": "xon/xoff",
+            },
+            chunk_size=chunk_size,
+        )
+        start = time.perf_counter()
+        for command in commands:
+            serializer.serialize_command(command)
+        serializer.flush()
+        while plotter.commands_executed < len(commands):
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        serializer.ser.close()
+        return elapsed
+    finally:
+        plotter.stop()
+
+
+def main():
+    commands = make_commands()
+    print(f"{len(commands)} commands, {sum(len(command) for command in commands)} bytes")
+    for label, chunk_size in (("unbuffered", None), (f"buffered ({DEFAULT_CHUNK_SIZE} B chunks)", DEFAULT_CHUNK_SIZE)):
+        elapsed = send(commands, chunk_size)
+        print(f"{label:>28}: {len(commands) / elapsed:12,.0f} commands/s ({elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,10 @@ CONFIG_PATH = os.path.join(
 PENS_PATH = os.path.join(
     CONFIG_DIR, PENS_FILENAME
 )
+# Prints are spooled here, so that interrupted ones can be resumed
+SPOOL_PATH = os.path.join(
+    CONFIG_DIR, "grafeo_spool.gpgl"
+)
 
 PRINTERS_FILENAME = "printers.json"
 PRINTERS_PATH = Path(CURRENT_PATH, PRINTERS_FILENAME)
@@ -90,6 +94,12 @@ class ConfigManager:
         default_config = self._get_default_config()
 
         self.config = deep_merge_dicts(default_config, existing_config)
+        # Printers saved to disk may predate settings since added to printers.json
+        default_printers = {printer["name"]: printer for printer in default_config["printers"]}
+        self.config["printers"] = [
+            deep_merge_dicts(default_printers.get(printer["name"], {}), printer)
+            for printer in self.config["printers"]
+        ]
         self.write_config_to_disk()
 
     def write_config_to_disk(self):
@@ -2,7 +2,6 @@ from pathlib import Path
 from bs4 import BeautifulSoup
 from ..models.Model import Model
 from ..models.atoms.Line import Line
-from ..models.atoms.Point import Point
 from ..pens.Pen import Pen
 from svg.path import parse_path
 from svg.path import Path as SvgPath, Move as SvgMove, Close as SvgClose
@@ -10,7 +9,10 @@ from ..fonts.FontCharacter import FontCharacter
 from ..fonts.FontFamily import FontFamily
 from ..models.derived.Polygon import Polygon
 from ..models.derived.MultiPolygon import MultiPolygon
+from ..models.derived.mixins.Hatchable import hatch_many
 import networkx as nx
+import numpy as np
+import shapely
 
 
 def midpoint(point1, point2):
@@ -45,6 +47,7 @@ class SvgFont(FontFamily):
         Text is left-justified.
         """
         model = Model()
+        to_hatch = []
         y_offset = 0
         for line in lines:
             x_offset = 0
@@ -57,12 +60,18 @@ class SvgFont(FontFamily):
                 if not char_model.is_empty():
                     char_model.translate(x_offset, y_offset)
                     if hatch_angle and hatch_spacing:
-                        char_model.hatch(Pen.One, hatch_angle, hatch_spacing)
+                        to_hatch.append(char_model)
                     row_model.add_model(char_model)
                 offset_to_use = font_char.x_offset if font_char.x_offset else self.x_offset
                 x_offset += offset_to_use
             model.add_model(row_model)
             y_offset -= abs(self.ascent) + abs(self.descent)
+
+        # Hatch all characters in a single pass
+        num_hatched = len(to_hatch)
+        hatches = hatch_many(to_hatch, [Pen.One] * num_hatched, [hatch_angle] * num_hatched, [hatch_spacing] * num_hatched)
+        for char_model, hatch_model in zip(to_hatch, hatches.models):
+            char_model.add_model(hatch_model)
         return model
 
     def load_font(self):
@@ -109,14 +118,10 @@ class SvgFont(FontFamily):
         polygons = []
         for path in paths:
             points = [path.point(i/num_samples) for i in range(num_samples + 1)]
+            coords = np.array([(point.real, point.imag) for point in points], dtype=np.float64)
 
             polygons.append(Polygon(
-                Line(
-                    [
-                        Point(float(point.real), float(point.imag), Pen.One) for point in points
-                    ],
-                    Pen.One
-                ),
+                Line.from_coords(coords, Pen.One),
                 Pen.One
             ))
 
@@ -144,12 +149,13 @@ class SvgFont(FontFamily):
         for i in range(len(polygons)):
             graph.nodes[i]['status'] = None
 
-        for i in range(len(polygons)):
-            for j in range(len(polygons)):
-                if i == j:
-                    continue
-                if polygons[i].contains(polygons[j]):
-                    graph.add_edge(i, j)
+        # Test every pair at once against prepared geometries, rather than pair by pair
+        geometries = np.array([polygon.shapely_geometry for polygon in polygons], dtype=object)
+        shapely.prepare(geometries)
+        contains = shapely.contains(geometries[:, np.newaxis], geometries[np.newaxis, :])
+        np.fill_diagonal(contains, False)
+        rows, cols = np.nonzero(contains)
+        graph.add_edges_from(zip(rows.tolist(), cols.tolist()))
 
         # These are our intial base polygons. These act as roots of trees.
         start_polygons = [res[0] for res in graph.in_degree(range(len(polygons))) if res[1] == 0]
@@ -5,6 +5,7 @@ from ...pens.Pen import Pen
 from ..Generator import Generator
 from ..Parameters import GeneratorParamGroup, IntParam, FloatParam
 from ...models.derived.Box import Box
+from ...models.derived.mixins.Hatchable import hatch_many
 import random
 
 
@@ -63,6 +64,8 @@ y of the current parameter values
         size = param_dict["object_size"]
 
         model = Model()
+        boxes = []
+        hatches = []
         for i in range(rows):
             for j in range(cols):
                 deg = 0
@@ -84,11 +87,18 @@ y of the current parameter values
                     spacing = random.uniform(min_spacing, max_spacing)
                     pen = random.choice([Pen.One, Pen.Two, Pen.Three, Pen.Four])
                     random_spacing = random.uniform(-i, i)
-                    box.hatch(pen, 45 + random_spacing*param_dict["hatch_angle_random_scaling"], spacing)
+                    hatches.append((box, pen, 45 + random_spacing*param_dict["hatch_angle_random_scaling"], spacing))
 
-                box.rotate(deg, 0, 0)
-                box.translate(j*size, i*-size)
+                boxes.append((box, deg, j*size, i*-size))
 
-                model.add_model(box)
+        # Hatch all boxes in a single pass, before moving them into place
+        hatched_boxes, pens, angles, spacings = zip(*hatches) if hatches else ([], [], [], [])
+        for box, hatch_model in zip(hatched_boxes, hatch_many(hatched_boxes, pens, angles, spacings).models):
+            box.add_model(hatch_model)
+
+        for box, deg, x, y in boxes:
+            box.rotate(deg, 0, 0)
+            box.translate(x, y)
+            model.add_model(box)
 
         return model
@@ -1,9 +1,11 @@
 import math
+import threading
 import traceback
 
 import dearpygui.dearpygui as dpg
 
 from ..config import ConfigManager
+from ..config.ConfigManager import SPOOL_PATH
 from ..fonts.FontManager import FontManager
 from ..generators import (GeneratorManager, GeneratorParam,
                                 GeneratorParamGroup)
@@ -15,6 +17,8 @@ from ..utils.debounce import debounce
 from ..svg.SvgManager import SvgManager
 from ..serializers import get_serializer
 from ..printers import get_printer
+from ..printers.PrintJobRunner import PrintJobRunner
+from ..printers.PrintSpool import has_checkpoint
 from ..serializers.SerialSerializer import SerialSerializer
 
 LEFT_PANEL_WIDTH = 400
@@ -24,6 +28,22 @@ MIN_VIEWPORT_WIDTH = 1000
 MIN_VIEWPORT_HEIGHT = 1000
 
 
+def _format_duration(seconds):
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+
+def _format_plot_estimate(estimate):
+    rows = list(estimate.pens.items()) + [("total", estimate.total)]
+    return "\n".join(
+        f"{name}: {_format_duration(pen.seconds)}, {pen.pen_down_length:.0f} drawn, "
+        f"{pen.pen_up_length:.0f} travelled, {pen.lifts} lifts, {pen.pen_changes} pen changes, "
+        f"{pen.command_bytes} bytes"
+        for name, pen in rows
+    )
+
+
 def _wrap_callback(cb):
     def wrapped(sender, tag, app_data, user_data):
         cb(sender, app_data, user_data)
@@ -52,6 +72,7 @@ class Gui:
         )
 
         self.printer = self._get_printer()
+        self.print_runner = self._get_print_runner()
 
         self.font_manager = FontManager()
 
@@ -62,6 +83,8 @@ class Gui:
 
         self.pen_replace_modal_visible = False
         self.print_options_modal_visible = False
+        self.plot_estimate_text = ""
+        self.plot_estimate_pending = False
 
         self.program_mode = Modes.GENERATOR
         self.svg_manager = SvgManager()
@@ -75,6 +98,12 @@ class Gui:
             return get_printer(current_printer, serializer)
         return None
 
+    # Prints run on their own thread, so the GUI stays responsive while plotting
+    def _get_print_runner(self):
+        if self.printer:
+            return PrintJobRunner(self.printer)
+        return None
+
     def _get_serializer(self):
         current_printer = self.config_manager.get_current_printer()
         if current_printer:
@@ -187,7 +216,7 @@ class Gui:
                         pen_config = pen_map[str(line.pen.value)]
                         r, g, b, a = bytes.fromhex(pen_config["color"][1:])
                         dpg.draw_polyline(
-                            [(point.x, point.y) for point in line.points],
+                            line.coords.tolist(),
                             color=(r, g, b, a),
                             thickness=pen_config["weight"],
                         )
@@ -211,7 +240,7 @@ class Gui:
                 pen_config = pens[self.config_manager.get_pen_index_by_desc(title_settings['title']['pen'])]
                 r, g, b, a = bytes.fromhex(pen_config["color"][1:])
                 dpg.draw_polyline(
-                    [(point.x, point.y) for point in line.points],
+                    line.coords.tolist(),
                     color=(r, g, b, a),
                     thickness=pen_config["weight"],
                 )
@@ -221,7 +250,7 @@ class Gui:
                 pen_config = pens[self.config_manager.get_pen_index_by_desc(title_settings['subtitle']['pen'])]
                 r, g, b, a = bytes.fromhex(pen_config["color"][1:])
                 dpg.draw_polyline(
-                    [(point.x, point.y) for point in line.points],
+                    line.coords.tolist(),
                     color=(r, g, b, a),
                     thickness=pen_config["weight"],
                 )
@@ -371,11 +400,22 @@ class Gui:
     @_wrap_callback
     def _print_callback(self, app_data, user_data):
         if not self.printer or not self.printer.has_serializer():
-            pass
+            return
+        if self.print_runner.is_printing():
+            return
+        self.print_runner.begin_print(self._get_print_jobs(), SPOOL_PATH)
 
+    # Returns a function adding everything to be printed to a printer. Models are only added to
+    # the printer on another thread, which is where they're processed, so copies are taken here
+    # in case they're re-rendered in the meantime. The copies are detached, so that processing
+    # them doesn't touch state shared with the models the preview keeps drawing.
+    def _get_print_jobs(self):
         model = self.generator_manager.current_generator.model
         title_settings = self.config_manager.get_title_settings()
-        print_settings = self.config_manager.get_print_settings()
+        print_settings = dict(self.config_manager.get_print_settings())
+
+        # Each job is (model, pen_map, translate_x, translate_y, scale, rotation).
+        jobs = []
 
         if self.program_mode == Modes.SVG:
             svg_model = self.svg_manager.get_model_for_current_page()
@@ -385,28 +425,26 @@ class Gui:
             pen_map = {
                 pen_num: pen_config
             }
-            self.printer.add_to_print(
-                svg_model,
+            jobs.append((
+                svg_model.detached_copy(),
                 pen_map,
-                print_settings,
                 print_settings['translate_x'],
                 print_settings['translate_y'],
                 print_settings['scale'],
                 print_settings['rotation'],
-            )
+            ))
 
         if self.program_mode == Modes.GENERATOR:
-            self.printer.add_to_print(
-                model,
+            jobs.append((
+                model.detached_copy(),
                 self.config_manager.get_pen_map(
                     self.config_manager.get_current_generator(), model.get_used_pens()
                 ),
-                print_settings,
                 print_settings['translate_x'],
                 print_settings['translate_y'],
                 print_settings['scale'],
                 print_settings['rotation'],
-            )
+            ))
 
             if title_settings['title']['show']:
                 pen_num = str(list(self.title_model.get_used_pens())[0].value)
@@ -415,15 +453,14 @@ class Gui:
                 pen_map = {
                     pen_num: pen_config
                 }
-                self.printer.add_to_print(
-                    self.title_model,
+                jobs.append((
+                    self.title_model.detached_copy(),
                     pen_map,
-                    print_settings,
                     title_settings['title']['translate_x'],
                     title_settings['title']['translate_y'],
                     title_settings['title']['scale'],
                     title_settings['title']['rotation'],
-                )
+                ))
 
             if title_settings['subtitle']['show']:
                 pen_num = str(list(self.subtitle_model.get_used_pens())[0].value)
@@ -432,18 +469,54 @@ class Gui:
                 pen_map = {
                     pen_num: pen_config
                 }
-                self.printer.add_to_print(
-                    self.subtitle_model,
+                jobs.append((
+                    self.subtitle_model.detached_copy(),
                     pen_map,
-                    print_settings,
                     title_settings['subtitle']['translate_x'],
                     title_settings['subtitle']['translate_y'],
                     title_settings['subtitle']['scale'],
                     title_settings['subtitle']['rotation'],
+                ))
+
+        def add_jobs(printer):
+            for job_model, job_pen_map, translate_x, translate_y, scale, rotation in jobs:
+                printer.add_to_print(
+                    job_model, job_pen_map, print_settings, translate_x, translate_y, scale, rotation
                 )
 
-        self.printer.begin_print()
-        pass
+        return add_jobs
+
+    @_wrap_callback
+    def _estimate_plot_callback(self, app_data, user_data):
+        current_printer = self.config_manager.get_current_printer()
+        if not current_printer or self.plot_estimate_pending:
+            return
+        add_jobs = self._get_print_jobs()
+        bytes_per_second = None
+        if current_printer['connection'] == 'serial':
+            bytes_per_second = SerialSerializer.get_bytes_per_second(current_printer['connection_defaults'])
+
+        # Estimating processes the models just as printing does, so it's done on its own thread
+        def estimate():
+            try:
+                printer = get_printer(current_printer, None)
+                add_jobs(printer)
+                self.plot_estimate_text = _format_plot_estimate(printer.estimate(bytes_per_second))
+            except Exception as e:
+                self.plot_estimate_text = f"Error while estimating: {e}"
+            self.plot_estimate_pending = False
+
+        self.plot_estimate_pending = True
+        self.plot_estimate_text = "Estimating..."
+        threading.Thread(target=estimate, daemon=True).start()
+
+    @_wrap_callback
+    def _resume_print_callback(self, app_data, user_data):
+        if not self.printer or not self.printer.has_serializer():
+            return
+        if self.print_runner.is_printing() or not has_checkpoint(SPOOL_PATH):
+            return
+        self.print_runner.resume_print(SPOOL_PATH)
 
     @_wrap_callback
     def _render_callback(self, app_data, user_data):
@@ -594,7 +667,7 @@ class Gui:
     def _pen_replaced(self, app_data, user_data):
         dpg.configure_item(Tags.PEN_REPLACE_MODAL, show=False)
         self.pen_replace_modal_visible = False
-        self.printer.continue_print()
+        self.print_runner.continue_print()
 
     @_wrap_callback
     def _update_selected_printer(self, app_data, user_data):
@@ -605,7 +678,10 @@ class Gui:
         # In either case, this may cause the current x/y resolution and margins to change,
         # so we require a re-render. We also re-create the existing global printer here.
         self._update_print_options_modal()
+        if self.print_runner:
+            self.print_runner.stop()
         self.printer = self._get_printer()
+        self.print_runner = self._get_print_runner()
         self._render_print_preview()
         # Need to update values in margin_x and margin_y sliders
         self._make_margin_section()
@@ -636,7 +712,10 @@ class Gui:
             self.config_manager.update_current_printer_connection_setting(user_data, val)
 
         self._update_print_options_modal()
+        if self.print_runner:
+            self.print_runner.stop()
         self.printer = self._get_printer()
+        self.print_runner = self._get_print_runner()
 
     def _render_serializer_options_section(self, printer_config):
         if not printer_config:
@@ -716,6 +795,8 @@ class Gui:
                     dpg.add_text(default_value=f"Printer name: {current_printer_name}", color=(204, 36, 29))
                     dpg.add_text(default_value=f"Type: {current_printer['serializer']}", color=(204, 36, 29))
                     dpg.add_text(default_value=f"Serializer: {current_printer['connection']}", color=(204, 36, 29))
+                    dpg.add_button(label="estimate plot", callback=self._estimate_plot_callback)
+                    dpg.add_text(default_value=self.plot_estimate_text, tag=Tags.PLOT_ESTIMATE)
                 else:
                     dpg.add_text(default_value=f"No printer selected!", color=(204, 36, 29))
             with dpg.group(horizontal=False):
@@ -730,6 +811,20 @@ class Gui:
 
         dpg.configure_item(Tags.PRINT_OPTIONS_MODAL, show=True)
 
+    def _update_print_progress(self):
+        if not self.print_runner or not dpg.does_item_exist(Tags.PRINT_PROGRESS):
+            return
+        progress = self.print_runner.get_progress()
+        if progress.total_commands == 0:
+            text = ""
+        else:
+            text = f"{progress.commands_sent}/{progress.total_commands} commands ({progress.percent:.1f}%)"
+            if self.print_runner.needs_pen_replacement():
+                text += ", waiting for pen"
+            elif progress.eta is not None and progress.eta > 0:
+                text += f", {_format_duration(progress.eta)} left"
+        dpg.set_value(Tags.PRINT_PROGRESS, text)
+
     def _update_pen_replace_modal(self):
         self.pen_replace_modal_visible = True
         dpg.delete_item(Tags.PEN_REPLACE_MODAL, children_only=True)
@@ -1078,11 +1173,16 @@ class Gui:
                 callback=self._print_callback,
                 tag=Tags.PRINT_BUTTON,
             )
+            dpg.add_button(
+                label="resume interrupted print",
+                callback=self._resume_print_callback,
+            )
             dpg.add_button(
                 label="print options",
                 callback=self._print_options_callback,
                 tag=Tags.PRINT_OPTIONS_BUTTON,
             )
+            dpg.add_text(default_value="", tag=Tags.PRINT_PROGRESS)
         with dpg.tab_bar(parent = Tags.MIDDLE_PANEL):
             with dpg.tab(label="print preview", tag=Tags.PRINT_PREVIEW):
                 pass
@@ -1111,11 +1211,16 @@ class Gui:
                 callback=self._print_callback,
                 tag=Tags.PRINT_BUTTON,
             )
+            dpg.add_button(
+                label="resume interrupted print",
+                callback=self._resume_print_callback,
+            )
             dpg.add_button(
                 label="print options",
                 callback=self._print_options_callback,
                 tag=Tags.PRINT_OPTIONS_BUTTON,
             )
+            dpg.add_text(default_value="", tag=Tags.PRINT_PROGRESS)
         with dpg.collapsing_header(label="print layout", parent=Tags.MODE_OPTIONS_PANEL):
             self._make_print_settings_section()
         with dpg.collapsing_header(label="title & subtitle", parent=Tags.MODE_OPTIONS_PANEL):
@@ -1196,8 +1301,11 @@ class Gui:
         # Update render once on start to show empty canvas
         self.should_render = True
         while dpg.is_dearpygui_running():
-            if self.printer and self.printer.printing_needs_user_input and not self.pen_replace_modal_visible:
+            if self.print_runner and self.print_runner.needs_pen_replacement() and not self.pen_replace_modal_visible:
                 self._update_pen_replace_modal()
+            self._update_print_progress()
+            if dpg.does_item_exist(Tags.PLOT_ESTIMATE):
+                dpg.set_value(Tags.PLOT_ESTIMATE, self.plot_estimate_text)
 
             dpg.render_dearpygui_frame()
 
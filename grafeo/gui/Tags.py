@@ -26,6 +26,8 @@ class Tags(StrEnum):
     SVG_PAGE_NUM_SELECT = auto()
     SVG_PRINT_OPTIONS = auto()
     PRINT_OPTIONS_BUTTON = auto()
+    PRINT_PROGRESS = auto()
+    PLOT_ESTIMATE = auto()
     PRINT_OPTIONS_MODAL = auto()
     MARGIN_SECTION = auto()
 
@@ -10,6 +10,8 @@ class Bounded(ABC):
     This class is intended to be used as a mixin.
     """
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         """Initialize the class."""
         pass
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from ..utils.intersection import intersects, points_are_epsilon_close
 
-@dataclass
+@dataclass(slots=True)
 class BoundingBox:
     """Class for representing the bounding box of some two-dimensional area."""
 
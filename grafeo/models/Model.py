@@ -3,8 +3,59 @@ from .atoms.Line import Line
 from .atoms.Point import Point
 from .Bounded import Bounded
 from .BoundingBox import BoundingBox
+from .PackedLines import PackedLines
+from .SpatialIndex import SpatialIndex
+from ..utils.affine import apply_affine, rotation_matrix, to_affine, translation_matrix
+from ..utils.clipping import clip_to_rectangle, clip_to_region
 from abc import abstractmethod
+import numpy as np
 import shapely
+import weakref
+
+
+def _convex_hull(coords: np.ndarray) -> np.ndarray:
+    """
+    Get the vertices of the convex hull of a set of coordinates.
+
+    :param coords: Array of shape (N, 2)
+    :return: Array of shape (M, 2) of hull vertices
+    """
+    if len(coords) < 3:
+        return coords
+    return shapely.get_coordinates(shapely.convex_hull(shapely.multipoints(coords)))
+
+
+def _bounds(coords: np.ndarray) -> BoundingBox:
+    if len(coords) == 0:
+        return BoundingBox()
+    min_x, min_y = coords.min(axis=0).tolist()
+    max_x, max_y = coords.max(axis=0).tolist()
+    return BoundingBox(min_x=min_x, max_x=max_x, min_y=min_y, max_y=max_y)
+
+
+def _transform_bounding_box(bounding_box: BoundingBox, matrix: np.ndarray) -> BoundingBox:
+    """Transform a bounding box by an axis-aligned (scale and translate only) matrix."""
+    if bounding_box.min_x > bounding_box.max_x:
+        return BoundingBox()
+    corners = np.array(
+        [[bounding_box.min_x, bounding_box.min_y], [bounding_box.max_x, bounding_box.max_y]],
+        dtype=np.float64,
+    )
+    return _bounds(apply_affine(corners, matrix))
+
+
+def _is_axis_aligned(matrix: np.ndarray) -> bool:
+    return matrix[0, 1] == 0 and matrix[1, 0] == 0
+
+
+def _union(bounding_box: BoundingBox, other: BoundingBox) -> BoundingBox:
+    """Create a new bounding box covering two others."""
+    return BoundingBox(
+        min_x=min(bounding_box.min_x, other.min_x),
+        max_x=max(bounding_box.max_x, other.max_x),
+        min_y=min(bounding_box.min_y, other.min_y),
+        max_y=max(bounding_box.max_y, other.max_y),
+    )
 
 
 class BaseModel(Bounded):
@@ -13,6 +64,27 @@ class BaseModel(Bounded):
 
     This base class equips all subclassess with the facilities to
     render points, lines, and models (recursively).
+
+    Transforms applied to a model (translate, rotate, apply_matrix, transform) are
+    deferred: they compose into a pending matrix held by the model, and are only
+    baked into coordinates when something reads them (lines, points, submodels,
+    shapely geometry). Bounding boxes are derived without baking, by transforming
+    the corners of the cached untransformed box, or the cached convex hull when the
+    pending matrix rotates or shears. Submodels, lines and points may be held outside
+    of the model tree, so reading or modifying them first bakes the transforms
+    pending on the models holding them.
+
+    Copies are copy-on-write: a copy shares its content with the original until
+    either of them is modified or hands its content out, at which point that model
+    takes private copies of the objects it directly holds. Modifying a submodel,
+    line or point, through any reference, first does the same for every model
+    holding it, so that copies never see the change.
+
+    Together, the cached bounding boxes of a model tree form a bounding volume
+    hierarchy. Each model knows its parents (weakly), so a change deep in the tree
+    only invalidates the caches along the path to the root, and adding content
+    grows the cached boxes in place rather than discarding them. The hierarchy
+    can be queried with :meth:`get_intersecting_models`.
     """
 
     def __init__(self, lines = None, points = None, models = None):
@@ -20,11 +92,28 @@ class BaseModel(Bounded):
         self._lines: list[Line] = lines if lines else []
         self._points: list[Point] = points if points else []
         self._models: list["Model"] = models if models else []
+        # Weak references to the models holding this one
+        self._parents: list[weakref.ref] = []
+        self._adopt(self._lines, self._points, self._models)
         self._used_pens: set[Pen] = set()
-        self._bounding_box = BoundingBox()
-
-        for atom in self._lines + self._points + self._models:
-            self._update_bounding_box(atom)
+        # Pending transform, or None for the identity
+        self._matrix: np.ndarray | None = None
+        # Caches of the extent of the model's content, ignoring the pending transform
+        self._local_bounding_box: BoundingBox | None = None
+        self._local_hull: np.ndarray | None = None
+        # Cache of the extent of the model, including the pending transform
+        self._bounding_box: BoundingBox | None = None
+        # Spatial index over the (local) bounding boxes of the submodels
+        self._model_index: tuple[shapely.STRtree, np.ndarray] | None = None
+        # Spatial index over all lines in the model tree
+        self._spatial_index: SpatialIndex | None = None
+        # Whether the lists above may be shared with a copy of this model
+        self._shared = False
+        # Weak references to the models sharing the lists above (including this one)
+        self._sharers: list[weakref.ref] = [weakref.ref(self)]
+        # Cached shapely geometry, and the objects it was built from
+        self._shapely_geometry = None
+        self._shapely_dependencies: list | None = None
 
     @abstractmethod
     def _make_shapely_geometry(self):
@@ -42,31 +131,195 @@ class BaseModel(Bounded):
         pass
 
     def is_empty(self):
-        return len(self.models) == 0 and len(self.lines) == 0 and len(self.points) == 0
+        return len(self._models) == 0 and len(self._lines) == 0 and len(self._points) == 0
 
-    @abstractmethod
     def copy(self) -> "BaseModel":
         """
-        Create a copy of the model with new objects.
+        Create a copy of the model.
+
+        No content is copied. The copy shares its lines, points and submodels with
+        this model, along with the pending transform and cached extents, until one
+        of the two is modified (see :meth:`_materialize`).
 
-        This is an abstract method since subclasses may include more bookkeeping
-        and require different initialization than this base class.
+        :return: A copy of the model, of the same class
         """
-        pass
+        # The copy only takes this model's own pending transform along
+        self._bake_ancestors()
+        return self._copy()
 
-    def intersection(self, model: "BaseModel") -> "BaseModel":
+    def detached_copy(self) -> "BaseModel":
         """
-        Return a new model, which represents the interserction of this model and another
+        Create a copy of the model which shares no state with it, besides vertex arrays.
+
+        Unlike :meth:`copy`, the sharing is resolved right away rather than when either
+        model is next read or modified, which updates state held by this model. The copy
+        can then be handed to another thread while this model is still in use.
 
-        Currently, this removes pen information. TODO: fix.
+        :return: A copy of the model, of the same class
         """
-        new_model = Model()
-        shapely_intersection = self.shapely_geometry.intersection(model.shapely_geometry)
-        if shapely_intersection.geom_type == 'MultiLineString':
-            for line_string in shapely_intersection.geoms:
-                new_model.add_line(Line([Point(coord[0], coord[1], Pen.One) for coord in line_string.coords], Pen.One))
+        new_model = self.copy()
+        new_model._get_all_lines()
         return new_model
 
+    def _copy(self) -> "BaseModel":
+        """Create a copy of the model as it is, even if the models holding it have transforms pending."""
+        new_model = type(self).__new__(type(self))
+        new_model.__dict__.update(self.__dict__)
+        new_model._parents = []
+        new_model._spatial_index = None
+        new_model._shared = True
+        self._shared = True
+        self._sharers.append(weakref.ref(new_model))
+        # The shared submodels now have a second parent to keep up to date
+        parent = weakref.ref(new_model)
+        for model in self._models:
+            model._parents.append(parent)
+        return new_model
+
+    def _materialize(self):
+        """
+        Take private copies of the lines, points and submodels shared with copies.
+
+        Only the objects directly held by this model are copied; submodels are
+        themselves copied lazily, and line vertex arrays are shared since they are
+        never modified in place. Lines, points and submodels belonging to this model
+        (it was the first of the models sharing them to hold them) stay with it, and
+        the models still sharing them get the copies instead, so that outside
+        references to them keep updating the right model.
+        """
+        if not self._shared:
+            return
+        others = [sharer for sharer in (ref() for ref in self._sharers) if sharer is not None and sharer is not self]
+        self._sharers[:] = [weakref.ref(sharer) for sharer in others]
+        self._sharers = [weakref.ref(self)]
+        self._shared = False
+        if len(others) == 0:
+            # Nothing else holds the content anymore, so it's already private
+            self._adopt(self._lines, self._points, [])
+            return
+
+        shared_lines = self._lines
+        self._lines = []
+        for i, line in enumerate(shared_lines):
+            if line._get_parent() is self:
+                shared_lines[i] = line._copy()
+                self._lines.append(line)
+            else:
+                self._lines.append(line._copy())
+        shared_points = self._points
+        self._points = []
+        for i, point in enumerate(shared_points):
+            if point._get_parent() is self:
+                shared_points[i] = point._copy()
+                self._points.append(point)
+            else:
+                self._points.append(point._copy())
+
+        sharer_ids = {id(self)} | {id(sharer) for sharer in others}
+        other_refs = [weakref.ref(sharer) for sharer in others]
+        shared_models = self._models
+        self._models = []
+        copies = []
+        for i, model in enumerate(shared_models):
+            holders = [parent() for parent in model._parents]
+            owner = next((holder for holder in holders if id(holder) in sharer_ids), None)
+            if owner is self:
+                # The other models get a copy, and stop being parents of this one
+                shared_models[i] = model._copy()
+                shared_models[i]._parents = list(other_refs)
+                model._parents = [
+                    ref for ref, holder in zip(model._parents, holders)
+                    if holder is not None and (holder is self or id(holder) not in sharer_ids)
+                ]
+                self._models.append(model)
+            else:
+                model._parents = [ref for ref, holder in zip(model._parents, holders) if holder is not self]
+                copies.append(model._copy())
+                self._models.append(copies[-1])
+        self._adopt(self._lines, self._points, copies)
+
+        # Spatial indices hand out the lines themselves, so those built over the
+        # objects just replaced are no longer valid
+        for model in [self] + others:
+            model._spatial_index = None
+            model._invalidate_parent_indices()
+
+    def _adopt(self, lines: list[Line], points: list[Point], models: list["BaseModel"]):
+        """Register this model as the parent of some lines, points and submodels."""
+        parent = weakref.ref(self)
+        for line in lines:
+            line._parent = parent
+        for point in points:
+            point._parent = parent
+        for model in models:
+            model._parents.append(parent)
+
+    def _bake_ancestors(self):
+        """Apply the transforms pending on every model holding this one, down to its content."""
+        for ref in list(self._parents):
+            parent = ref()
+            if parent is not None:
+                parent._bake_ancestors()
+                parent._bake()
+
+    def _bake_from_root(self):
+        """Apply the transforms pending on this model and every model holding it."""
+        self._bake_ancestors()
+        self._bake()
+
+    def _prepare_ancestors(self):
+        """Get every model holding this one ready for it to be modified (see :meth:`_prepare_change`)."""
+        for ref in list(self._parents):
+            parent = ref()
+            # Preparing a parent sharing this model with the one holding it gives it a copy instead
+            if parent is not None and ref in self._parents:
+                parent._prepare_change()
+
+    def _prepare_change(self):
+        """
+        Get ready to modify the content of this model, directly or through one of its lines.
+
+        Transforms pending on this model and every model holding it are applied, so
+        that they don't apply to the change. Content shared with copies, by this model
+        or any model holding it, is made private, so that the copies don't see the change.
+        """
+        self._prepare_ancestors()
+        self._bake()
+        self._materialize()
+
+    def intersection(self, model: "BaseModel") -> "Model":
+        """
+        Return a new model, containing all lines in this model clipped to the area of another.
+
+        Lines from submodels are included, and keep their pens. Points are dropped.
+
+        :param model: Model whose polygonal area to clip to
+        :return: A flat model of the clipped lines
+        """
+        return Model.from_packed(clip_to_region(self.pack(), model.shapely_geometry))
+
+    def difference(self, model: "BaseModel") -> "Model":
+        """
+        Return a new model, containing the parts of all lines in this model outside the area of another.
+
+        Lines from submodels are included, and keep their pens. Points are dropped.
+
+        :param model: Model whose polygonal area to cut away
+        :return: A flat model of the remaining lines
+        """
+        return Model.from_packed(clip_to_region(self.pack(), model.shapely_geometry, difference=True))
+
+    def clip(self, bounding_box: BoundingBox) -> "Model":
+        """
+        Return a new model, containing all lines in this model clipped to a rectangle.
+
+        Lines from submodels are included, and keep their pens. Points are dropped.
+
+        :param bounding_box: Rectangle to clip to
+        :return: A flat model of the clipped lines
+        """
+        return Model.from_packed(clip_to_rectangle(self.pack(), bounding_box))
+
     def contains(self, model: "BaseModel"):
         return self.shapely_geometry.contains(model.shapely_geometry)
 
@@ -76,8 +329,26 @@ class BaseModel(Bounded):
 
         :param line: Line to add
         """
+        self._prepare_change()
         self._lines.append(line)
-        self._update_bounding_box(line)
+        self._adopt([line], [], [])
+        self._extend_extent(line._bounding_box)
+
+    def _get_shapely_dependencies(self) -> list:
+        """
+        Get the objects that the model's shapely geometry is built from.
+
+        Line coordinate arrays and atom/submodel geometries are replaced rather than
+        modified whenever they change, so the cached geometry is still valid as long
+        as these are the very same objects it was built from.
+
+        Subclasses whose geometry only depends on part of their content may override
+        this to avoid rebuilds when the rest changes.
+        """
+        dependencies: list = [line._coords for line in self._lines]
+        dependencies += [point.shapely_geometry for point in self._points]
+        dependencies += [model.shapely_geometry for model in self._models]
+        return dependencies
 
     @property
     def shapely_geometry(self):
@@ -85,33 +356,79 @@ class BaseModel(Bounded):
         Return a shapely geometry for the model.
 
         This is a property so that we can lazily generate the geometry
-        in an opaque way.
+        in an opaque way. The geometry is cached, and only rebuilt once
+        the lines, points or submodels it depends on have changed.
         """
-        self._make_shapely_geometry()
+        self._bake_from_root()
+        dependencies = self._get_shapely_dependencies()
+        cached = self._shapely_dependencies
+        if (
+            self._shapely_geometry is None
+            or cached is None
+            or len(cached) != len(dependencies)
+            or any(old is not new for old, new in zip(cached, dependencies))
+        ):
+            self._make_shapely_geometry()
+            self._shapely_dependencies = dependencies
         return self._shapely_geometry
 
     @property
     def lines(self):
         """Get the lines in this model."""
+        self._bake_from_root()
+        self._materialize()
         return self._lines
 
     @property
     def all_lines(self):
         """Gets all lines in this model, including those in submodels."""
+        self._bake_ancestors()
+        return self._get_all_lines()
+
+    def _get_all_lines(self) -> list[Line]:
+        self._bake()
+        self._materialize()
         lines = []
         for model in self._models:
-            lines += model.all_lines
+            lines += model._get_all_lines()
         lines += [line for line in self._lines]
         return lines
 
+    def spatial_index(self) -> SpatialIndex:
+        """
+        Get a spatial index over all lines in this model, including those in submodels.
+
+        The index is built on first use, and kept until the model tree is modified.
+
+        :return: The spatial index
+        """
+        self._bake_from_root()
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(self.all_lines)
+        return self._spatial_index
+
+    def pack(self) -> PackedLines:
+        """
+        Pack all lines in this model, including those in submodels, into a single store.
+
+        Lines are packed in the same order as :attr:`all_lines`.
+
+        :return: The packed lines
+        """
+        return PackedLines.from_lines(self.all_lines)
+
     @property
     def models(self):
         """Get the models in this model."""
+        self._bake_from_root()
+        self._materialize()
         return self._models
 
     @property
     def points(self):
         """Get the points in this model."""
+        self._bake_from_root()
+        self._materialize()
         return self._points
 
     def add_point(self, point: Point):
@@ -120,7 +437,10 @@ class BaseModel(Bounded):
 
         :param point: Point to add
         """
+        self._prepare_change()
         self._points.append(point)
+        self._adopt([], [point], [])
+        self._extend_extent(point._make_bounding_box())
 
     def add_model(self, model: "BaseModel", prepend=False):
         """
@@ -128,14 +448,80 @@ class BaseModel(Bounded):
 
         :param model: Model to add
         """
+        self._prepare_change()
         if prepend:
             self._models.insert(0, model)
         else:
             self._models.append(model)
-        self._update_bounding_box(model)
+        self._adopt([], [], [model])
+        self._model_index = None
+        self._extend_extent(model.get_bounding_box())
+
+    def _invalidate_extent(self):
+        """Discard the cached extent and spatial indices of the model, and of every model holding it."""
+        self._local_bounding_box = None
+        self._local_hull = None
+        self._bounding_box = None
+        self._model_index = None
+        self._spatial_index = None
+        self._invalidate_parents()
+
+    def _invalidate_parent_indices(self):
+        """Discard the spatial indices of every model holding this one."""
+        for parent in self._parents:
+            parent = parent()
+            if parent is not None:
+                parent._spatial_index = None
+                parent._invalidate_parent_indices()
+
+    def _invalidate_parents(self):
+        parents = [parent() for parent in self._parents]
+        if None in parents:
+            self._parents = [ref for ref, parent in zip(self._parents, parents) if parent is not None]
+        for parent in parents:
+            if parent is not None:
+                parent._invalidate_extent()
+
+    def _line_changed(self, bounding_box: BoundingBox | None = None):
+        """
+        Update the cached extents after one of this model's lines or points was modified.
+
+        The model must have been prepared with :meth:`_prepare_change` before the line
+        or point was modified, so no copy shares it anymore.
+
+        :param bounding_box: Bounding box of new vertices, if the line only grew
+        """
+        if bounding_box is None:
+            self._invalidate_extent()
+        else:
+            self._extend_extent(bounding_box)
+
+    def _extend_extent(self, bounding_box: BoundingBox):
+        """
+        Grow the cached extent of the model, and of every model holding it, to cover new content.
 
-    def _update_bounding_box(self, atom: Bounded):
-        self._bounding_box.update(atom.get_bounding_box())
+        :param bounding_box: Bounding box of the new content, in the coordinates of this
+            model's content (i.e. ignoring the pending transform)
+        """
+        if self._local_bounding_box is None:
+            self._invalidate_extent()
+            return
+        self._local_bounding_box = _union(self._local_bounding_box, bounding_box)
+        self._local_hull = None
+        self._bounding_box = None
+        self._spatial_index = None
+        matrix = self._matrix
+        if matrix is not None and not _is_axis_aligned(matrix):
+            # A rotated box would overestimate the extent, so let the parents recompute
+            self._invalidate_parents()
+            return
+        if matrix is not None:
+            bounding_box = _transform_bounding_box(bounding_box, matrix)
+        for parent in self._parents:
+            parent = parent()
+            if parent is not None:
+                parent._model_index = None
+                parent._extend_extent(bounding_box)
 
     def get_used_pens(self) -> set[Pen]:
         """
@@ -162,10 +548,93 @@ class BaseModel(Bounded):
         """
         Get the bounding box of the model.
 
+        Pending transforms are taken into account without being baked, except for
+        those of the models holding this one.
+
         :return: The bounding box of the model
         """
+        self._bake_ancestors()
+        return self._get_bounding_box()
+
+    def _get_bounding_box(self) -> BoundingBox:
+        """Get the bounding box of the model, ignoring transforms pending on the models holding it."""
+        if self._bounding_box is None:
+            matrix = self._matrix
+            if matrix is None:
+                self._bounding_box = self._get_local_bounding_box()
+            elif _is_axis_aligned(matrix):
+                self._bounding_box = _transform_bounding_box(self._get_local_bounding_box(), matrix)
+            else:
+                self._bounding_box = _bounds(apply_affine(self._get_local_hull(), matrix))
         return self._bounding_box
 
+    def get_intersecting_models(self, bounding_box: BoundingBox, recursive: bool = False) -> list["BaseModel"]:
+        """
+        Get the submodels whose bounding boxes intersect a region.
+
+        Rather than testing every submodel, this descends the bounding volume
+        hierarchy: each model keeps a spatial index over the bounding boxes of its
+        submodels, and subtrees whose box misses the region are never visited.
+
+        :param bounding_box: Region to query, in the same coordinates as this model's bounding box
+        :param recursive: Whether to include intersecting submodels at every depth,
+            rather than only direct submodels
+        :return: The intersecting submodels, in depth-first order
+        """
+        self._bake_from_root()
+        self._materialize()
+        models = []
+        for index in self._query_model_index(bounding_box).tolist():
+            model = self._models[index]
+            models.append(model)
+            if recursive:
+                models += model.get_intersecting_models(bounding_box, recursive=True)
+        return models
+
+    def _query_model_index(self, bounding_box: BoundingBox) -> np.ndarray:
+        """Get the indices of the submodels whose bounding boxes intersect a region, in order."""
+        if self._model_index is None:
+            bounds = np.array(
+                [
+                    (box.min_x, box.min_y, box.max_x, box.max_y)
+                    for box in (model._get_bounding_box() for model in self._models)
+                ],
+                dtype=np.float64,
+            ).reshape(-1, 4)
+            # Empty submodels have inverted bounds, and can never intersect anything
+            indices = np.flatnonzero((bounds[:, 0] <= bounds[:, 2]) & (bounds[:, 1] <= bounds[:, 3]))
+            self._model_index = (shapely.STRtree(shapely.box(*bounds[indices].T)), indices)
+        tree, indices = self._model_index
+        region = shapely.box(bounding_box.min_x, bounding_box.min_y, bounding_box.max_x, bounding_box.max_y)
+        return np.sort(indices[tree.query(region)])
+
+    def _get_local_bounding_box(self) -> BoundingBox:
+        """Get the bounding box of the model's content, ignoring the pending transform."""
+        if self._local_bounding_box is None:
+            bounding_box = BoundingBox()
+            for line in self._lines:
+                bounding_box.update(line._bounding_box)
+            for point in self._points:
+                bounding_box.update(point._make_bounding_box())
+            for model in self._models:
+                bounding_box.update(model._get_bounding_box())
+            self._local_bounding_box = bounding_box
+        return self._local_bounding_box
+
+    def _get_local_hull(self) -> np.ndarray:
+        """Get the convex hull of the model's content, ignoring the pending transform."""
+        if self._local_hull is None:
+            coords = [line._coords for line in self._lines]
+            coords += [np.array([(point._x, point._y) for point in self._points], dtype=np.float64).reshape(-1, 2)]
+            coords += [model._get_hull() for model in self._models]
+            self._local_hull = _convex_hull(np.concatenate(coords))
+        return self._local_hull
+
+    def _get_hull(self) -> np.ndarray:
+        """Get the convex hull of the model, including the pending transform."""
+        hull = self._get_local_hull()
+        return hull if self._matrix is None else apply_affine(hull, self._matrix)
+
     def normalize(self):
         """
         Normalize the model by translating it.
@@ -173,18 +642,10 @@ class BaseModel(Bounded):
         Translates the model such that it is bound within the +x/+y quadrant.
         TODO: This should probably be abstract.
         """
-        translate_x = abs(min(0, self._bounding_box.min_x))
-        translate_y = abs(min(0, self._bounding_box.min_y))
-        for line in self._lines:
-            line.translate(translate_x, translate_y)
-        for point in self._points:
-            point.translate(translate_x, translate_y)
-        for model in self._models:
-            model.normalize()
-        self._bounding_box.min_x += translate_x
-        self._bounding_box.max_x += translate_x
-        self._bounding_box.min_y += translate_y
-        self._bounding_box.max_y += translate_y
+        bounding_box = self.get_bounding_box()
+        translate_x = abs(min(0, bounding_box.min_x))
+        translate_y = abs(min(0, bounding_box.min_y))
+        self.translate(translate_x, translate_y)
 
     def make_bounding_box(self) -> BoundingBox:
         """
@@ -192,6 +653,7 @@ class BaseModel(Bounded):
 
         :return: The bounding box of the model
         """
+        self._bake_from_root()
         bounding_box = BoundingBox()
         for line in self._lines:
             bounding_box.update(line.make_bounding_box())
@@ -202,16 +664,7 @@ class BaseModel(Bounded):
         return bounding_box
 
     def translate(self, x, y):
-        for line in self._lines:
-            line.translate(x, y)
-        for point in self._points:
-            point.translate(x, y)
-        for model in self._models:
-            model.translate(x, y)
-        self._bounding_box.min_x += x
-        self._bounding_box.max_x += x
-        self._bounding_box.min_y += y
-        self._bounding_box.max_y += y
+        self.transform(translation_matrix(x, y))
 
     def rotate(self, deg, x, y):
         """
@@ -221,22 +674,106 @@ class BaseModel(Bounded):
         :param x: x coordinate of point to rotate about
         :param y: y coordinate of point to rotate about
         """
-        for line in self._lines:
-            line.rotate(deg, x, y)
-        for point in self._points:
-            point.rotate(deg, x, y)
-        for model in self._models:
-            model.rotate(deg, x, y)
-        self._bounding_box = self.make_bounding_box()
+        self.transform(rotation_matrix(deg, x, y))
 
     def apply_matrix(self, matrix):
-        for line in self._lines:
-            line.apply_matrix(matrix)
-        for point in self._points:
-            point.apply_matrix(matrix)
+        """
+        Transforms the model by a 2x2 linear or 3x3 homogeneous matrix.
+
+        :param matrix: Matrix to transform by
+        """
+        self.transform(to_affine(matrix))
+
+    def transform(self, matrix: np.ndarray):
+        """
+        Transforms the entire model tree by a 3x3 homogeneous matrix.
+
+        The transform is composed onto the model's pending matrix in constant time;
+        coordinates are updated the next time they are read. Transforms pending on
+        the models holding this one are applied first, since they come before it.
+
+        :param matrix: 3x3 homogeneous matrix
+        """
+        self._prepare_ancestors()
+        self._matrix = matrix if self._matrix is None else matrix @ self._matrix
+        self._bounding_box = None
+        self._spatial_index = None
+        self._invalidate_parents()
+
+    def _bake(self):
+        """
+        Apply the pending transform to the coordinates of this model tree.
+
+        Pending transforms of submodels are composed with their ancestors', and all
+        models sharing the same effective transform are baked in one batched pass.
+        """
+        if self._matrix is None:
+            return
+        groups: dict[bytes, tuple[np.ndarray, list["BaseModel"]]] = {}
+        self._gather_pending(None, groups)
+        for matrix, models in groups.values():
+            BaseModel._apply_transform(models, matrix)
+
+    def _gather_pending(self, matrix: np.ndarray | None, groups):
+        """Collect the effective pending transform of each model in this tree, clearing it."""
+        if self._matrix is not None:
+            matrix = self._matrix if matrix is None else matrix @ self._matrix
+            self._matrix = None
+        if matrix is None:
+            return
+        # Content shared with a copy must not see this model's transform
+        self._materialize()
+        groups.setdefault(matrix.tobytes(), (matrix, []))[1].append(self)
         for model in self._models:
-            model.apply_matrix(matrix)
-        self._bounding_box = self.make_bounding_box()
+            model._gather_pending(matrix, groups)
+
+    @staticmethod
+    def _apply_transform(models: list["BaseModel"], matrix: np.ndarray):
+        """
+        Transform the lines and points directly held by some models, in a single pass.
+
+        :param models: Models whose own lines and points should be transformed
+        :param matrix: 3x3 homogeneous matrix
+        """
+        lines = [line for model in models for line in model._lines]
+        points = [point for model in models for point in model._points]
+
+        if len(lines) > 0:
+            offsets = np.zeros(len(lines) + 1, dtype=np.int64)
+            np.cumsum([len(line._coords) for line in lines], out=offsets[1:])
+            coords = apply_affine(np.concatenate([line._coords for line in lines]), matrix)
+            # Per-line bounds, reduced over the vertices of each non-empty line
+            non_empty = np.flatnonzero(offsets[1:] > offsets[:-1])
+            mins = np.full((len(lines), 2), np.inf)
+            maxes = np.full((len(lines), 2), -np.inf)
+            if len(non_empty) > 0:
+                mins[non_empty] = np.minimum.reduceat(coords, offsets[non_empty], axis=0)
+                maxes[non_empty] = np.maximum.reduceat(coords, offsets[non_empty], axis=0)
+            for line, start, end, (min_x, min_y), (max_x, max_y) in zip(
+                lines, offsets[:-1].tolist(), offsets[1:].tolist(), mins.tolist(), maxes.tolist()
+            ):
+                line._set_coords(coords[start:end])
+                line._bounding_box = BoundingBox(min_x=min_x, max_x=max_x, min_y=min_y, max_y=max_y)
+
+        if len(points) > 0:
+            coords = apply_affine(np.array([(point._x, point._y) for point in points], dtype=np.float64), matrix)
+            for point, (x, y) in zip(points, coords.tolist()):
+                point._x = x
+                point._y = y
+
+        # The transformed content now sits where the pending transform put it, so the
+        # cached extents carry over rather than being rebuilt from coordinates.
+        for model in models:
+            if model._local_hull is not None:
+                model._local_hull = apply_affine(model._local_hull, matrix)
+                model._local_bounding_box = _bounds(model._local_hull)
+            elif model._local_bounding_box is not None and _is_axis_aligned(matrix):
+                model._local_bounding_box = _transform_bounding_box(model._local_bounding_box, matrix)
+            else:
+                model._local_bounding_box = None
+            model._bounding_box = None
+            model._model_index = None
+            model._spatial_index = None
 
 
 class Model(BaseModel):
@@ -249,17 +786,17 @@ class Model(BaseModel):
         if len(self._points) > 0:
             geometries.append(shapely.multipoints([point.shapely_geometry for point in self._points]))
         if len(self._lines) > 0:
-            geometries.append(shapely.multilinestrings([line.shapely_geometry for line in self._lines]))
+            geometries.append(shapely.multilinestrings(PackedLines.from_lines(self._lines).linestrings()))
         if len(self._models) > 0:
             geometries.append(shapely.geometrycollections([model.shapely_geometry for model in self._models]))
         self._shapely_geometry = shapely.GeometryCollection(geometries)
 
-    def copy(self) -> "Model":
-        new_model = Model()
-        for model in self.models:
-            new_model.add_model(model.copy())
-        for line in self.lines:
-            new_model.add_line(line.copy())
-        for point in self.points:
-            new_model.add_point(point.copy())
-        return new_model
+    @staticmethod
+    def from_packed(packed: PackedLines) -> "Model":
+        """
+        Create a model whose lines are views over a packed store.
+
+        :param packed: Packed lines to wrap
+        :return: A new model
+        """
+        return Model(lines=packed.lines())
@@ -0,0 +1,231 @@
+import numpy as np
+import shapely
+
+from ..pens.Pen import Pen
+from .atoms.Line import Line
+from .BoundingBox import BoundingBox
+
+
+class PackedLines:
+    """
+    A columnar representation of a collection of polylines.
+
+    Rather than holding a :class:`Line` object per polyline and a :class:`Point`
+    object per vertex, all vertices are stored in one contiguous array. Line ``i``
+    spans ``coords[offsets[i]:offsets[i + 1]]`` and is drawn with pen ``pens[i]``.
+
+    :ivar coords: All vertices, as a float64 array of shape (N, 2)
+    :vartype coords: :class:`numpy.ndarray`
+    :ivar offsets: Start index of each line within `coords`, plus a trailing end index
+    :vartype offsets: :class:`numpy.ndarray`
+    :ivar pens: Pen value of each line
+    :vartype pens: :class:`numpy.ndarray`
+    """
+
+    def __init__(self, coords=None, offsets=None, pens=None):
+        """
+        Initialize a packed collection of lines.
+
+        :param coords: Array of shape (N, 2) containing all vertices
+        :param offsets: Array of length L + 1 delimiting the L lines within `coords`
+        :param pens: Array of length L containing the pen value of each line
+        """
+        self.coords = (
+            np.empty((0, 2), dtype=np.float64)
+            if coords is None
+            else np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        )
+        self.offsets = (
+            np.zeros(1, dtype=np.int64)
+            if offsets is None
+            else np.asarray(offsets, dtype=np.int64)
+        )
+        self.pens = (
+            np.empty(0, dtype=np.int64)
+            if pens is None
+            else np.asarray(pens, dtype=np.int64)
+        )
+
+    @staticmethod
+    def from_lines(lines: list[Line]) -> "PackedLines":
+        """
+        Pack a list of lines into a single contiguous store.
+
+        :param lines: Lines to pack
+        :return: The packed lines
+        """
+        if len(lines) == 0:
+            return PackedLines()
+        # Apply the transforms pending on the models holding the lines once per model, rather than per line
+        parents = {id(parent): parent for parent in (line._get_parent() for line in lines) if parent is not None}
+        for parent in parents.values():
+            parent._bake_from_root()
+        offsets = np.zeros(len(lines) + 1, dtype=np.int64)
+        np.cumsum([len(line._coords) for line in lines], out=offsets[1:])
+        coords = np.concatenate([line._coords for line in lines])
+        pens = np.fromiter((int(line.pen) for line in lines), dtype=np.int64, count=len(lines))
+        return PackedLines(coords, offsets, pens)
+
+    @staticmethod
+    def from_linestrings(linestrings, pens=None) -> "PackedLines":
+        """
+        Pack shapely LineStrings (or LinearRings) into a single contiguous store.
+
+        :param linestrings: Array of LineStrings
+        :param pens: Pen value of each line. Defaults to :attr:`Pen.One`.
+        :return: The packed lines
+        """
+        linestrings = np.asarray(linestrings, dtype=object)
+        coords, indices = shapely.get_coordinates(linestrings, return_index=True)
+        offsets = np.zeros(len(linestrings) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=len(linestrings)), out=offsets[1:])
+        if pens is None:
+            pens = np.full(len(linestrings), Pen.One.value, dtype=np.int64)
+        return PackedLines(coords, offsets, pens)
+
+    @staticmethod
+    def concatenate(packed_lines: list["PackedLines"]) -> "PackedLines":
+        """
+        Join several packed collections into one, preserving order.
+
+        :param packed_lines: Packed collections to join
+        :return: The combined packed lines
+        """
+        packed_lines = [packed for packed in packed_lines if len(packed) > 0]
+        if len(packed_lines) == 0:
+            return PackedLines()
+        starts = np.cumsum([0] + [len(packed.coords) for packed in packed_lines[:-1]])
+        offsets = np.concatenate(
+            [[0]] + [packed.offsets[1:] + start for packed, start in zip(packed_lines, starts)]
+        )
+        return PackedLines(
+            np.concatenate([packed.coords for packed in packed_lines]),
+            offsets,
+            np.concatenate([packed.pens for packed in packed_lines]),
+        )
+
+    def __len__(self) -> int:
+        """Get the number of lines."""
+        return len(self.offsets) - 1
+
+    @property
+    def num_vertices(self) -> int:
+        """Get the total number of vertices across all lines."""
+        return len(self.coords)
+
+    def line_lengths(self) -> np.ndarray:
+        """
+        Get the number of vertices in each line.
+
+        :return: Array of vertex counts, one per line
+        """
+        return np.diff(self.offsets)
+
+    def path_lengths(self) -> np.ndarray:
+        """
+        Get the length of the path traced by each line.
+
+        :return: Array of lengths, one per line
+        """
+        starts, ends, line_indices = self.segments()
+        return np.bincount(
+            line_indices, weights=np.hypot(*(ends - starts).T), minlength=len(self)
+        ).astype(np.float64)
+
+    def line_indices(self) -> np.ndarray:
+        """
+        Get, for every vertex, the index of the line it belongs to.
+
+        :return: Array of line indices, one per vertex
+        """
+        return np.repeat(np.arange(len(self)), self.line_lengths())
+
+    def line_coords(self, index: int) -> np.ndarray:
+        """
+        Get the vertices of a single line, as a view into `coords`.
+
+        :param index: Index of the line
+        :return: Array of shape (n, 2)
+        """
+        return self.coords[self.offsets[index]:self.offsets[index + 1]]
+
+    def take(self, indices, reverse=None) -> "PackedLines":
+        """
+        Create a new packed collection from a subset of lines.
+
+        :param indices: Indices (or a boolean mask) of the lines to keep, in order
+        :param reverse: If given, a boolean for every kept line, saying whether to reverse its vertices
+        :return: The selected lines
+        """
+        indices = np.arange(len(self))[indices]
+        lengths = self.line_lengths()[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        positions = np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+        if reverse is not None:
+            reverse = np.repeat(np.asarray(reverse, dtype=bool), lengths)
+            positions = np.where(reverse, np.repeat(lengths, lengths) - 1 - positions, positions)
+        vertex_indices = np.repeat(self.offsets[:-1][indices], lengths) + positions
+        return PackedLines(self.coords[vertex_indices], offsets, self.pens[indices])
+
+    def segments(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get every segment of every line.
+
+        Consecutive vertices belonging to different lines do not form a segment.
+
+        :return: A tuple of segment start points (M, 2), end points (M, 2), and the
+            index of the line each segment belongs to (M,)
+        """
+        if len(self.coords) < 2:
+            empty = np.empty((0, 2), dtype=np.float64)
+            return empty, empty, np.empty(0, dtype=np.int64)
+        line_indices = self.line_indices()
+        is_segment = line_indices[:-1] == line_indices[1:]
+        return self.coords[:-1][is_segment], self.coords[1:][is_segment], line_indices[:-1][is_segment]
+
+    def linestrings(self) -> np.ndarray:
+        """
+        Create a shapely LineString for every line, in a single pass.
+
+        Empty lines produce empty LineStrings.
+
+        :return: Object array of LineStrings, one per line
+        """
+        lengths = self.line_lengths()
+        non_empty = np.flatnonzero(lengths > 0)
+        geometries = np.full(len(self), shapely.LineString(), dtype=object)
+        if len(non_empty) > 0:
+            indices = np.repeat(np.arange(len(non_empty)), lengths[non_empty])
+            geometries[non_empty] = shapely.linestrings(self.coords, indices=indices)
+        return geometries
+
+    def lines(self) -> list[Line]:
+        """
+        Create :class:`Line` objects over the packed store.
+
+        The lines are views; no vertices are copied. Their bounding boxes are
+        computed for all lines at once.
+
+        :return: One line per packed polyline
+        """
+        lines = [None] * len(self)
+        lengths = self.line_lengths()
+        non_empty = np.flatnonzero(lengths > 0)
+        empty = np.flatnonzero(lengths == 0)
+        if len(non_empty) > 0:
+            starts = self.offsets[:-1][non_empty]
+            mins = np.minimum.reduceat(self.coords, starts).tolist()
+            maxs = np.maximum.reduceat(self.coords, starts).tolist()
+            for index, start, end, pen, (min_x, min_y), (max_x, max_y) in zip(
+                non_empty.tolist(), starts.tolist(), self.offsets[1:][non_empty].tolist(),
+                self.pens[non_empty].tolist(), mins, maxs
+            ):
+                lines[index] = Line.from_coords(
+                    self.coords[start:end],
+                    Pen(pen),
+                    BoundingBox(min_x=min_x, max_x=max_x, min_y=min_y, max_y=max_y),
+                )
+        for index in empty.tolist():
+            lines[index] = Line.from_coords(self.coords[self.offsets[index]:self.offsets[index]], Pen(self.pens[index]))
+        return lines
@@ -0,0 +1,76 @@
+import numpy as np
+import shapely
+
+from .atoms.Line import Line
+from .BoundingBox import BoundingBox
+from .PackedLines import PackedLines
+
+
+def _region_geometry(region: BoundingBox | shapely.Geometry) -> shapely.Geometry:
+    if isinstance(region, BoundingBox):
+        return shapely.box(region.min_x, region.min_y, region.max_x, region.max_y)
+    return region
+
+
+class SpatialIndex:
+    """
+    A spatial index over the segments of a collection of lines.
+
+    Segments are held in a shapely STRtree, so that finding the geometry within a
+    region only tests segments whose envelopes overlap it, rather than every
+    segment of every line. Lines with fewer than two vertices have no segments,
+    and are never returned.
+
+    :ivar lines: The indexed lines
+    :vartype lines: list[:class:`Line`]
+    :ivar packed: The indexed lines, packed into a single store
+    :vartype packed: :class:`PackedLines`
+    """
+
+    def __init__(self, lines: list[Line]):
+        """
+        Build a spatial index.
+
+        :param lines: Lines to index
+        """
+        self.lines = lines
+        self.packed = PackedLines.from_lines(lines)
+        self._starts, self._ends, self._line_indices = self.packed.segments()
+        self._tree = shapely.STRtree(shapely.linestrings(np.stack([self._starts, self._ends], axis=1)))
+
+    def __len__(self) -> int:
+        """Get the number of indexed segments."""
+        return len(self._line_indices)
+
+    def _query(self, region: BoundingBox | shapely.Geometry) -> np.ndarray:
+        """Get the sorted indices of the segments intersecting a region."""
+        return np.sort(self._tree.query(_region_geometry(region), predicate="intersects"))
+
+    def query_segments(self, region: BoundingBox | shapely.Geometry) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the segments intersecting a region.
+
+        :param region: A bounding box, or any shapely geometry (e.g. a polygon)
+        :return: A tuple of segment start points (M, 2), end points (M, 2), and the
+            index in :attr:`lines` of the line each segment belongs to (M,)
+        """
+        indices = self._query(region)
+        return self._starts[indices], self._ends[indices], self._line_indices[indices]
+
+    def query_line_indices(self, region: BoundingBox | shapely.Geometry) -> np.ndarray:
+        """
+        Find the indices of the lines with at least one segment intersecting a region.
+
+        :param region: A bounding box, or any shapely geometry (e.g. a polygon)
+        :return: Sorted indices into :attr:`lines`
+        """
+        return np.unique(self._line_indices[self._query(region)])
+
+    def query_lines(self, region: BoundingBox | shapely.Geometry) -> list[Line]:
+        """
+        Find the lines with at least one segment intersecting a region.
+
+        :param region: A bounding box, or any shapely geometry (e.g. a polygon)
+        :return: The intersecting lines, in the order they were indexed
+        """
+        return [self.lines[index] for index in self.query_line_indices(region).tolist()]
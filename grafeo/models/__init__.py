@@ -1,5 +1,7 @@
 from .Bounded import Bounded
 from .BoundingBox import BoundingBox
 from .Model import Model
+from .PackedLines import PackedLines
+from .SpatialIndex import SpatialIndex
 
-__all__ = ["Model", "Bounded", "BoundingBox"]
+__all__ = ["Model", "Bounded", "BoundingBox", "PackedLines", "SpatialIndex"]
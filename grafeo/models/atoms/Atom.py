@@ -18,6 +18,8 @@ class Atom(Bounded):
     :vartype pen: :class:`Pen`
     """
 
+    __slots__ = ("pen",)
+
     def __init__(self, *args, **kwargs: Unpack[_AtomKwargs]):
         """
         Initialize an atom.
@@ -2,42 +2,151 @@ from ...pens import Pen
 from ..BoundingBox import BoundingBox
 from .Atom import Atom
 from .Point import Point
+from ...utils.affine import apply_affine, rotation_matrix, to_affine
+import numpy as np
 import shapely
 
 class Line(Atom):
     """
     The Line class is used to represent a line in a scene.
 
-    Lines consist of any number of points, as well as a pen identifier.
+    Lines consist of any number of points, as well as a pen identifier. Vertices are
+    stored in a single (N, 2) float64 array rather than as individual :class:`Point`
+    objects; this array may be a view into a larger packed store
+    (see :class:`grafeo.models.PackedLines`).
 
-    :ivar points: The points comprising the line
-    :vartype points: list[:class:`Point`]
+    Coordinate arrays are never modified in place once created. Operations which
+    move a line's vertices replace its array instead, so views handed out by
+    :attr:`coords` remain valid snapshots. The same holds for the line's bounding
+    box, which may be shared between copies.
+
+    A line held by a model is kept in step with it: transforms pending on the model
+    tree are applied before the line's vertices are read or modified, and the model
+    tree stops sharing the line with any copies before it's modified.
     """
 
-    def __init__(self, points: list[Point], pen: Pen):
+    __slots__ = ("_coords", "_buffer", "_bounding_box", "_shapely_geometry", "_parent")
+
+    def __init__(self, points: list[Point] | np.ndarray, pen: Pen):
         """
         Initialize a line.
 
-        :param points: A list of points
+        :param points: A list of points, or an array of shape (N, 2) of coordinates
         :param pen: A pen identifier
         """
-        super().__init__(pen=pen)
-        self.points = [point.copy() for point in points]
         self.pen = pen
+        self._coords = Line._make_coords(points)
+        # Spare capacity used to amortize add_point. When set, _coords is a prefix of it.
+        self._buffer = None
+        self._shapely_geometry = None
+        # Weak reference to the model holding this line, kept up to date on changes
+        self._parent = None
         self._bounding_box = self._make_bounding_box()
 
+    @staticmethod
+    def _make_coords(points: list[Point] | np.ndarray) -> np.ndarray:
+        if isinstance(points, np.ndarray):
+            return np.array(points, dtype=np.float64).reshape(-1, 2)
+        # Only points held by a model can have transforms pending, so read the others directly
+        return np.array(
+            [(point._x, point._y) if point._parent is None else (point.x, point.y) for point in points],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+
+    @classmethod
+    def from_coords(cls, coords: np.ndarray, pen: Pen, bounding_box: BoundingBox | None = None) -> "Line":
+        """
+        Create a line over an existing coordinate array, without copying it.
+
+        :param coords: Array of shape (N, 2)
+        :param pen: A pen identifier
+        :param bounding_box: The bounding box of `coords`, if already known
+        :return: A line whose vertices are a view of `coords`
+        """
+        line = cls.__new__(cls)
+        line.pen = pen
+        line._coords = coords
+        line._buffer = None
+        line._shapely_geometry = None
+        line._parent = None
+        line._bounding_box = bounding_box if bounding_box is not None else line._make_bounding_box()
+        return line
+
+    @property
+    def coords(self) -> np.ndarray:
+        """Get a read-only (N, 2) view of the line's vertices."""
+        self._bake()
+        coords = self._coords.view()
+        coords.flags.writeable = False
+        return coords
+
+    @property
+    def points(self) -> list[Point]:
+        """
+        Get the points comprising the line.
+
+        Points are created on demand from the line's coordinates; modifying them
+        does not modify the line.
+        """
+        self._bake()
+        return [Point(x, y, self.pen) for x, y in self._coords.tolist()]
+
+    def _set_coords(self, coords: np.ndarray):
+        self._coords = coords
+        self._buffer = None
+        self._shapely_geometry = None
+
+    def _get_parent(self):
+        return self._parent() if self._parent is not None else None
+
+    def _bake(self):
+        """Apply the transforms pending on the models holding this line to its vertices."""
+        parent = self._get_parent()
+        if parent is not None:
+            parent._bake_from_root()
+
+    def _prepare_change(self):
+        """
+        Get the model holding this line, if any, ready for the line to be modified.
+
+        :return: The model holding the line
+        """
+        parent = self._get_parent()
+        if parent is not None:
+            parent._prepare_change()
+        return parent
+
     @property
     def shapely_geometry(self):
-        self._make_shapely_geometry()
+        """Get the shapely geometry for the line, cached until its vertices change."""
+        self._bake()
+        if self._shapely_geometry is None:
+            self._make_shapely_geometry()
         return self._shapely_geometry
 
     def _make_shapely_geometry(self):
-        points = [[point.x, point.y] for point in self.points]
-        self._shapely_geometry = shapely.LineString(points)
+        self._shapely_geometry = shapely.LineString(self._coords)
 
     def copy(self) -> "Line":
-        """Create a deep-copy of the current Line."""
-        return Line([point.copy() for point in self.points], self.pen)
+        """
+        Create a copy of the current Line.
+
+        The copy shares its coordinate array, bounding box and shapely geometry with
+        this line, which is safe since none of them is modified in place.
+        """
+        self._bake()
+        return self._copy()
+
+    def _copy(self) -> "Line":
+        """Create a copy of the line as it is, even if its model has transforms pending."""
+        line = Line.__new__(Line)
+        line.pen = self.pen
+        line._coords = self._coords
+        line._buffer = None
+        line._bounding_box = self._bounding_box
+        line._shapely_geometry = self._shapely_geometry
+        line._parent = None
+        return line
 
     def intersection(self, bounding_box: BoundingBox) -> list["Line"]:
         """
@@ -45,79 +154,10 @@ class Line(Atom):
 
         This may result in several new, noncontiguous lines being created.
         """
-        new_lines = []
-        current_line_points = []
-        for i in range(len(self.points) - 1):
-            start_point = self.points[i]
-            end_point = self.points[i+1]
-            start_point_inside = self.points[i].is_within_bounds(bounding_box)
-            end_point_inside = self.points[i+1].is_within_bounds(bounding_box)
-            if (start_point_inside and end_point_inside):
-                if len(current_line_points) == 0:
-                    current_line_points.append(start_point.copy())
-                current_line_points.append(end_point.copy())
-
-            elif (not start_point_inside and not end_point_inside):
-                # Two cases:
-                #  - Passes through no edges
-                #  - Passes through two edges
-                intersections = bounding_box.find_intersections(
-                    start_point.x,
-                    start_point.y,
-                    end_point.x,
-                    end_point.y
-                )
-                if len(intersections) == 0:
-                    continue
-                elif len(intersections) == 2:
-                    current_line_points.append(Point(intersections[0][0], intersections[0][1], self.pen))
-                    current_line_points.append(Point(intersections[1][0], intersections[1][1], self.pen))
-                    new_lines.append(Line(current_line_points, self.pen))
-                    current_line_points = []
-                else:
-                    # 3 intersections could occur exactly when line begins or ends on a corner of
-                    # the bounding box. Figure out which case we're in.
-                    start_on_corner = bounding_box.point_is_on_corner(start_point.x, start_point.y)
-                    if start_on_corner:
-                        current_line_points.append(Point(start_point.x, start_point.y, self.pen))
-                        current_line_points.append(Point(intersections[0][0], intersections[0][1], self.pen))
-                        new_lines.append(Line(current_line_points, self.pen))
-                        current_line_points = []
-                    else:
-                        current_line_points.append(Point(intersections[0][0], intersections[0][1], self.pen))
-                        current_line_points.append(Point(end_point.x, end_point.y, self.pen))
-                        new_lines.append(Line(current_line_points, self.pen))
-                        current_line_points = []
-            elif (start_point_inside and not end_point_inside):
-                if len(current_line_points) == 0:
-                    current_line_points.append(start_point.copy())
-                current_line_points.append(end_point.copy())
-                intersections = bounding_box.find_intersections(
-                    start_point.x,
-                    start_point.y,
-                    end_point.x,
-                    end_point.y
-                )
-
-                current_line_points.append(Point(intersections[0][0], intersections[0][1], self.pen))
-                new_lines.append(Line(current_line_points, self.pen))
-                current_line_points = []
-            else:
-                # End point inside and start point outside
-                intersections = bounding_box.find_intersections(
-                    start_point.x,
-                    start_point.y,
-                    end_point.x,
-                    end_point.y
-                )
-                current_line_points.append(Point(intersections[0][0], intersections[0][1], self.pen))
-                current_line_points.append(Point(end_point.x, end_point.y, self.pen))
-
-        # If we've gotten though everything and still have points on the working line,
-        # add it to the new_lines list
-        if len(current_line_points) > 0:
-            new_lines.append(Line(current_line_points, self.pen))
-        return new_lines
+        from ..PackedLines import PackedLines
+        from ...utils.clipping import clip_to_rectangle
+
+        return clip_to_rectangle(PackedLines.from_lines([self]), bounding_box).lines()
 
     def _make_bounding_box(self) -> BoundingBox:
         """
@@ -125,11 +165,11 @@ class Line(Atom):
 
         :return: The line's bounding box
         """
-        bounding_box = BoundingBox()
-        for point in self.points:
-            bounding_box.update(point.get_bounding_box())
-
-        return bounding_box
+        if len(self._coords) == 0:
+            return BoundingBox()
+        min_x, min_y = self._coords.min(axis=0).tolist()
+        max_x, max_y = self._coords.max(axis=0).tolist()
+        return BoundingBox(min_x=min_x, max_x=max_x, min_y=min_y, max_y=max_y)
 
     def make_bounding_box(self) -> BoundingBox:
         """
@@ -137,10 +177,8 @@ class Line(Atom):
 
         :return: The line's bounding box
         """
-        bounding_box = BoundingBox()
-        for point in self.points:
-            bounding_box.update(point.make_bounding_box())
-        return bounding_box
+        self._bake()
+        return self._make_bounding_box()
 
     def add_point(self, point: Point):
         """
@@ -148,8 +186,25 @@ class Line(Atom):
 
         :param point: Point to add.
         """
-        self.points.append(point)
-        self._bounding_box.update(point.get_bounding_box())
+        parent = self._prepare_change()
+        num_points = len(self._coords)
+        if self._buffer is None or num_points == len(self._buffer):
+            buffer = np.empty((max(8, 2 * num_points), 2), dtype=np.float64)
+            buffer[:num_points] = self._coords
+            self._buffer = buffer
+        # Only the unused tail of the buffer is written, so existing views stay untouched
+        self._buffer[num_points] = (point.x, point.y)
+        self._coords = self._buffer[:num_points + 1]
+        self._shapely_geometry = None
+        bounding_box = self._bounding_box
+        self._bounding_box = BoundingBox(
+            min_x=min(bounding_box.min_x, point.x),
+            max_x=max(bounding_box.max_x, point.x),
+            min_y=min(bounding_box.min_y, point.y),
+            max_y=max(bounding_box.max_y, point.y),
+        )
+        if parent is not None:
+            parent._line_changed(point.get_bounding_box())
 
     def get_bounding_box(self) -> BoundingBox:
         """
@@ -157,6 +212,7 @@ class Line(Atom):
 
         :return: Bounding box of the line
         """
+        self._bake()
         return self._bounding_box
 
     def translate(self, x: float, y: float):
@@ -166,12 +222,17 @@ class Line(Atom):
         :param x: Magnitude in x direction of translation
         :param y: Magnitude in y direction of translation
         """
-        for point in self.points:
-            point.translate(x, y)
-        self._bounding_box.min_x += x
-        self._bounding_box.max_x += x
-        self._bounding_box.min_y += y
-        self._bounding_box.max_y += y
+        parent = self._prepare_change()
+        self._set_coords(self._coords + (x, y))
+        bounding_box = self._bounding_box
+        self._bounding_box = BoundingBox(
+            min_x=bounding_box.min_x + x,
+            max_x=bounding_box.max_x + x,
+            min_y=bounding_box.min_y + y,
+            max_y=bounding_box.max_y + y,
+        )
+        if parent is not None:
+            parent._line_changed()
 
     def lerp(self, other: "Line", ratio: float):
         """
@@ -193,11 +254,12 @@ class Line(Atom):
         :param ratio: Interpolation ratio
         :return: New line, with inteprolated points
         """
-        if len(self.points) != len(other.points):
+        coords, other_coords = self.coords, other.coords
+        if len(coords) != len(other_coords):
             raise Exception("Lines have non-equal number of points")
 
-        return Line(
-            [p1.lerp(p2, ratio) for (p1, p2) in zip(self.points, other.points)],
+        return Line.from_coords(
+            coords + (other_coords - coords) * ratio,
             self.pen,
         )
 
@@ -209,11 +271,24 @@ class Line(Atom):
         :param x: x coordinate of point to rotate about
         :param y: y coordinate of point to rotate about
         """
-        for point in self.points:
-            point.rotate(deg, x, y)
-        self._bounding_box = self.make_bounding_box()
+        self.transform(rotation_matrix(deg, x, y))
 
     def apply_matrix(self, matrix):
-        for point in self.points:
-            point.apply_matrix(matrix)
-        self._bounding_box = self.make_bounding_box()
+        """
+        Transforms the line by a 2x2 linear or 3x3 homogeneous matrix.
+
+        :param matrix: Matrix to transform by
+        """
+        self.transform(to_affine(matrix))
+
+    def transform(self, matrix: np.ndarray):
+        """
+        Transforms the line by a 3x3 homogeneous matrix.
+
+        :param matrix: 3x3 homogeneous matrix
+        """
+        parent = self._prepare_change()
+        self._set_coords(apply_affine(self._coords, matrix))
+        self._bounding_box = self._make_bounding_box()
+        if parent is not None:
+            parent._line_changed()
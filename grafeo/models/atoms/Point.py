@@ -14,12 +14,14 @@ class Point(Atom):
     When used to define other scene elements, the semantics of the pen associated with the
     point may be undefined.
 
-    :ivar x: x coordinate of point
-    :vartype x: float
-    :ivar y: y coordinate of point
-    :vartype y: float
+    A point held by a model is kept in step with it, like a line: transforms pending
+    on the model tree are applied before the point's coordinates are read or
+    modified, and the model tree stops sharing the point with any copies before it's
+    modified.
     """
 
+    __slots__ = ("_x", "_y", "_shapely_geometry", "_shapely_coords", "_parent")
+
     def __init__(self, x: float, y: float, pen: Pen):
         """
         Initialize the point.
@@ -28,19 +30,65 @@ class Point(Atom):
         :param y: y coordinate of point
         :param pen: Pen to associate with the point
         """
-        super().__init__(pen=pen)
-        self.x = x
-        self.y = y
-        self._bounding_box = BoundingBox(
-            min_x=self.x, max_x=self.x, min_y=self.y, max_y=self.y
-        )
+        # Points are constructed in bulk, so skip the (empty) initializers of the mixins
+        self.pen = pen
+        self._x = x
+        self._y = y
+        self._shapely_geometry = None
+        # Weak reference to the model holding this point, kept up to date on changes
+        self._parent = None
+
+    @property
+    def x(self) -> float:
+        """Get the x coordinate of the point."""
+        if self._parent is not None:
+            self._bake()
+        return self._x
+
+    @x.setter
+    def x(self, x: float):
+        self._move_to(x, self.y)
+
+    @property
+    def y(self) -> float:
+        """Get the y coordinate of the point."""
+        if self._parent is not None:
+            self._bake()
+        return self._y
+
+    @y.setter
+    def y(self, y: float):
+        self._move_to(self.x, y)
+
+    def _get_parent(self):
+        return self._parent() if self._parent is not None else None
+
+    def _bake(self):
+        """Apply the transforms pending on the models holding this point to its coordinates."""
+        parent = self._get_parent()
+        if parent is not None:
+            parent._bake_from_root()
+
+    def _move_to(self, x: float, y: float):
+        """Move the point, keeping the model holding it, if any, up to date."""
+        parent = self._get_parent()
+        if parent is not None:
+            parent._prepare_change()
+        self._x = x
+        self._y = y
+        if parent is not None:
+            parent._line_changed()
 
     def _make_shapely_geometry(self):
-        self._shapely_geometry = shapely.Point(self.x, self.y)
+        self._shapely_geometry = shapely.Point(self._x, self._y)
+        self._shapely_coords = (self._x, self._y)
 
     @property
     def shapely_geometry(self):
-        self._make_shapely_geometry()
+        """Get the shapely geometry for the point, cached until it moves."""
+        self._bake()
+        if self._shapely_geometry is None or self._shapely_coords != (self._x, self._y):
+            self._make_shapely_geometry()
         return self._shapely_geometry
 
     def is_within_bounds(self, bounding_box: BoundingBox) -> bool:
@@ -48,15 +96,18 @@ class Point(Atom):
         Determine whether the point is within a bounding box.
         """
         return (
-            self.x == bounding_box.max_x and
-            self.x == bounding_box.min_x and
-            self.y == bounding_box.max_y and
-            self.y == bounding_box.min_y
+            bounding_box.min_x <= self.x <= bounding_box.max_x and
+            bounding_box.min_y <= self.y <= bounding_box.max_y
         )
 
     def copy(self) -> "Point":
         """Create a deep-copy of the current Point."""
-        return Point(self.x, self.y, self.pen)
+        self._bake()
+        return self._copy()
+
+    def _copy(self) -> "Point":
+        """Create a copy of the point as it is, even if its model has transforms pending."""
+        return Point(self._x, self._y, self.pen)
 
     def lerp(self, other: "Point", ratio: float) -> "Point":
         """
@@ -78,11 +129,13 @@ class Point(Atom):
 
     def get_bounding_box(self) -> BoundingBox:
         """
-        Get the bounding box of the line.
+        Get the bounding box of the point.
+
+        The box is degenerate, and is created on demand rather than stored.
 
-        :return: Bounding box of the line
+        :return: Bounding box of the point
         """
-        return self._bounding_box
+        return self.make_bounding_box()
 
     def translate(self, x: float, y: float):
         """
@@ -91,12 +144,11 @@ class Point(Atom):
         :param x: Magnitude in x direction of translation
         :param y: Magnitude in y direction of translation
         """
-        self.x += x
-        self.y += y
-        self._bounding_box.min_x += x
-        self._bounding_box.max_x += x
-        self._bounding_box.min_y += y
-        self._bounding_box.max_y += y
+        self._bake()
+        self._move_to(self._x + x, self._y + y)
+
+    def _make_bounding_box(self) -> BoundingBox:
+        return BoundingBox(min_x=self._x, max_x=self._x, min_y=self._y, max_y=self._y)
 
     def make_bounding_box(self) -> BoundingBox:
         """
@@ -104,7 +156,8 @@ class Point(Atom):
 
         :return: The point's bounding box
         """
-        return BoundingBox(min_x=self.x, max_x=self.x, min_y=self.y, max_y=self.y)
+        self._bake()
+        return self._make_bounding_box()
 
     def rotate(self, deg, x, y):
         """
@@ -115,16 +168,13 @@ class Point(Atom):
         :param y: y coordinate of point to rotate about
         """
         theta = math.pi*deg/180.0
-        new_x = (self.x - x)*math.cos(theta) - (self.y - y)*math.sin(theta) + x
-        new_y = (self.y - y)*math.cos(theta) + (self.x - x)*math.sin(theta) + y
-        self.x = new_x
-        self.y = new_y
-        self._bounding_box = self.make_bounding_box()
+        self._bake()
+        new_x = (self._x - x)*math.cos(theta) - (self._y - y)*math.sin(theta) + x
+        new_y = (self._y - y)*math.cos(theta) + (self._x - x)*math.sin(theta) + y
+        self._move_to(new_x, new_y)
 
     def apply_matrix(self, matrix):
-        new_x = matrix[0][0] * self.x + matrix[0][1] * self.y
-        new_y = matrix[1][0] * self.x + matrix[1][1] * self.y
-        self.x = new_x
-        self.y = new_y
-
-        self._bounding_box = self.make_bounding_box()
+        self._bake()
+        new_x = matrix[0][0] * self._x + matrix[0][1] * self._y
+        new_y = matrix[1][0] * self._x + matrix[1][1] * self._y
+        self._move_to(new_x, new_y)
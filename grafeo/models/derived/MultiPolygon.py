@@ -2,11 +2,15 @@ from ...pens.Pen import Pen
 import shapely
 from .Polygon import Polygon
 from .mixins.Hatchable import Hatchable
+from ..Model import BaseModel
 
 
 class MultiPolygon(Hatchable):
     """
     The mulipolygon class is used to model a collection of polygons.
+
+    The polygons are held as submodels, following any submodels prepended
+    afterwards; other submodels are not part of the collection's shape.
     """
 
     def __init__(self, polygons: list[Polygon], pen: Pen):
@@ -14,21 +18,22 @@ class MultiPolygon(Hatchable):
         Initialize a polygon
 
         """
-        super().__init__(models=polygons)
+        super().__init__(models=list(polygons))
         self.pen = pen
-        self._polygons = polygons
-
-    def copy(self):
-        # Get all models that are not the polygons defining the collection
-        unique_models = list(filter(lambda x: x not in self._polygons, self.models))
-        new_model = MultiPolygon([poly.copy() for poly in self._polygons], self.pen)
-        for model in unique_models:
-            new_model.add_model(model.copy())
-        for line in self.lines:
-            new_model.add_line(line.copy())
-        for point in self.points:
-            new_model.add_point(point.copy())
-        return new_model
+        self._num_polygons = len(polygons)
+        self._num_prepended = 0
+
+    @property
+    def _polygons(self) -> list[Polygon]:
+        return self._models[self._num_prepended:self._num_prepended + self._num_polygons]
+
+    def add_model(self, model: BaseModel, prepend=False):
+        super().add_model(model, prepend)
+        if prepend:
+            self._num_prepended += 1
+
+    def _get_shapely_dependencies(self) -> list:
+        return [polygon.shapely_geometry for polygon in self._polygons]
 
     def _make_shapely_geometry(self):
         self._shapely_geometry = shapely.MultiPolygon([polygon.shapely_geometry for polygon in self._polygons])
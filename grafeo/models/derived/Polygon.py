@@ -9,6 +9,9 @@ class Polygon(Hatchable):
 
     The polygon must have identical start and end points, and
     is assumed to not self-intersect.
+
+    The outline and holes are the first lines of the model; any lines
+    added afterwards are not part of the polygon's shape.
     """
 
     def __init__(self, line: Line, pen: Pen, holes = None):
@@ -16,25 +19,22 @@ class Polygon(Hatchable):
         Initialize a polygon
 
         """
-        self._holes = holes if holes else []
-        self._poly_line = line
+        holes = holes if holes else []
+        self._num_holes = len(holes)
         self.pen = pen
-        super().__init__(lines=[line] + self._holes)
+        super().__init__(lines=[line] + holes)
+
+    @property
+    def _poly_line(self) -> Line:
+        return self._lines[0]
 
-    def copy(self):
-        # Get all lines that are not the lines/holes defining the polygon
-        unique_lines = list(filter(lambda x: x != self._poly_line and x not in self._holes, self.lines))
-        new_model = Polygon(self._poly_line.copy(), self.pen, [hole.copy() for hole in self._holes])
+    @property
+    def _holes(self) -> list[Line]:
+        return self._lines[1:1 + self._num_holes]
 
-        for model in self.models:
-            new_model.add_model(model.copy())
-        for line in unique_lines:
-            new_model.add_line(line.copy())
-        for point in self.points:
-            new_model.add_point(point.copy())
-        return new_model
+    def _get_shapely_dependencies(self) -> list:
+        return [self._poly_line._coords] + [hole_line._coords for hole_line in self._holes]
 
     def _make_shapely_geometry(self):
-        line = self._lines[0]
-        holes = [[[point.x, point.y] for point in hole_line.points] for hole_line in self._holes]
-        self._shapely_geometry = shapely.Polygon([[point.x, point.y] for point in line.points], holes)
+        holes = [hole_line.coords for hole_line in self._holes]
+        self._shapely_geometry = shapely.Polygon(self._poly_line.coords, holes)
@@ -1,9 +1,15 @@
+from concurrent.futures import ProcessPoolExecutor
 from ...Model import Model, BaseModel
-from ...atoms.Point import Point
-from ...atoms.Line import Line
+from ...PackedLines import PackedLines
 from ....pens.Pen import Pen
-import math
-import shapely
+from ....utils import fills
+from ....utils.clipping import polygonal_part
+from ....utils.hatch_join import JOIN_TOLERANCE, join_strokes
+from ....utils.scanline import get_rings, hatch_regions
+import numpy as np
+
+# Batches with fewer polygons than this are always hatched in the calling process
+_MIN_POLYGONS_PER_PROCESS = 2000
 
 
 class Hatchable(BaseModel):
@@ -18,48 +24,150 @@ class Hatchable(BaseModel):
         super().__init__(*args, **kwargs)
         pass
 
-    def hatch(self, pen: Pen, angle: float, spacing: float):
+    def hatch(self, pen: Pen, angle: float, spacing: float, join_distance: float = None):
         """
         Return a model representing the hatched area of the model.
 
         :param pen: Pen to hatch with
         :angle float: Angle to draw hatched lines. Between -90 and 90.
         :spacing float: Distance between hatched lines
+        :join_distance float: Longest joint to chain hatched lines with. Defaults to a
+            multiple of `spacing`; 0 leaves every line separate.
+        """
+        join_distances = None if join_distance is None else [join_distance]
+        hatch_model = hatch_many([self], [pen], [angle], [spacing], join_distances=join_distances).models[0]
+        self.add_model(hatch_model)
+        return hatch_model
+
+    def cross_hatch(self, pen: Pen, angle: float, spacing: float, join_distance: float = None):
         """
+        Return a model representing the cross-hatched area of the model.
+
+        :param pen: Pen to hatch with
+        :angle float: Angle of the first set of hatched lines, in degrees from vertical
+        :spacing float: Perpendicular distance between hatched lines
+        :join_distance float: Longest joint to chain hatched lines with. Defaults to a
+            multiple of `spacing`; 0 leaves every line separate.
+        """
+        join_distances = None if join_distance is None else [join_distance]
+        fill = fills.cross_hatch([self.shapely_geometry], [int(pen)], [angle], [spacing], join_distances)
+        return self._add_fill(fill)
+
+    def contour_fill(self, pen: Pen, spacing: float, max_contours: int = None):
+        """
+        Return a model representing the area of the model filled with concentric contours.
+
+        :param pen: Pen to draw contours with
+        :spacing float: Distance between contours
+        :max_contours int: If given, draw at most this many contours
+        """
+        return self._add_fill(fills.contour_fill([self.shapely_geometry], [int(pen)], [spacing], max_contours))
+
+    def stipple(self, pen: Pen, density: float, dot_size: float, density_function=None, seed: int = None):
+        """
+        Return a model representing the area of the model filled with random dots.
+
+        :param pen: Pen to draw dots with
+        :density float: Number of dots per unit of area
+        :dot_size float: Length of the dash drawn for each dot
+        :density_function: If given, the relative density at given x and y coordinate arrays,
+            between 0 and 1, by which dots are thinned out
+        :seed int: Seed for the random number generator
+        """
+        fill = fills.stipple([self.shapely_geometry], [int(pen)], [density], [dot_size], density_function, seed)
+        return self._add_fill(fill)
+
+    def _add_fill(self, fill: "fills.Fill") -> Model:
+        fill_model = Model.from_packed(fill.lines)
+        self.add_model(fill_model)
+        return fill_model
+
+
+def _hatch_batch(rings: PackedLines, ring_regions, bounds, pens, angles, spacings):
+    packed, stroke_regions = hatch_regions(rings, ring_regions, bounds, pens, angles, spacings)
+    return packed.coords, packed.offsets, packed.pens, stroke_regions
+
+
+def hatch_many(
+    polygons: list[Hatchable],
+    pens: list[Pen],
+    angles: list[float],
+    spacings: list[float],
+    processes: int = None,
+    join_distances: list[float] = None,
+) -> Model:
+    """
+    Hatch many models at once.
+
+    Rather than hatching each model on its own, the hatch lines of all models are
+    computed in a single vectorized pass. Unlike :meth:`Hatchable.hatch`, the
+    models themselves are left unchanged.
+
+    Neighbouring hatch lines are then chained into zig-zags wherever the joint stays
+    inside the model, so that they can be drawn without lifting the pen.
+
+    :param polygons: Models to hatch
+    :param pens: Pen to hatch each model with
+    :param angles: Angle to draw each model's hatch lines at. Between -90 and 90.
+    :param spacings: Distance between each model's hatch lines
+    :param processes: If given, spread large batches over this many worker processes
+    :param join_distances: Longest joint to chain each model's hatch lines with.
+        Defaults to a multiple of the spacing; 0 leaves every line separate.
+    :return: A model holding one submodel per input model, containing its hatch lines
+    """
+    num_polygons = len(polygons)
+    geometries = np.array([polygonal_part(polygon.shapely_geometry) for polygon in polygons], dtype=object)
+    rings, ring_regions = get_rings(geometries)
+    bounds = np.array(
+        [
+            (bounding_box.min_x, bounding_box.min_y, bounding_box.max_x, bounding_box.max_y)
+            for bounding_box in (polygon.get_bounding_box() for polygon in polygons)
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    pens = np.fromiter((int(pen) for pen in pens), dtype=np.int64, count=num_polygons)
+    angles = np.asarray(angles, dtype=np.float64)
+    spacings = np.asarray(spacings, dtype=np.float64)
+
+    num_batches = 1
+    if processes is not None and processes > 1:
+        num_batches = min(processes, num_polygons // _MIN_POLYGONS_PER_PROCESS)
+    if num_batches <= 1:
+        results = [_hatch_batch(rings, ring_regions, bounds, pens, angles, spacings)]
+    else:
+        # Rings are grouped by region, so each batch of regions owns a contiguous run of rings
+        region_splits = np.linspace(0, num_polygons, num_batches + 1).astype(np.int64)
+        ring_splits = np.searchsorted(ring_regions, region_splits)
+        with ProcessPoolExecutor(max_workers=num_batches) as executor:
+            futures = [
+                executor.submit(
+                    _hatch_batch,
+                    rings.take(np.arange(ring_splits[i], ring_splits[i + 1])),
+                    ring_regions[ring_splits[i]:ring_splits[i + 1]] - region_splits[i],
+                    bounds[region_splits[i]:region_splits[i + 1]],
+                    pens[region_splits[i]:region_splits[i + 1]],
+                    angles[region_splits[i]:region_splits[i + 1]],
+                    spacings[region_splits[i]:region_splits[i + 1]],
+                )
+                for i in range(num_batches)
+            ]
+            results = [
+                (coords, offsets, stroke_pens, stroke_regions + region_splits[i])
+                for i, (coords, offsets, stroke_pens, stroke_regions) in enumerate(
+                    future.result() for future in futures
+                )
+            ]
 
-        # Strategy:
-        # - Find minimum hatch line distance s.t. it will always cover the bounding box
-        # - Draw lines spacing apart s.t box is definitely covered
-        # - Get intersection of these lines and the bounding box of this shape
-
-        height = self._bounding_box.max_y - self._bounding_box.min_y
-        width = self._bounding_box.max_x - self._bounding_box.min_x
-
-        origin_x = self._bounding_box.min_x
-        origin_y = self._bounding_box.max_y
-
-        hatch_x_offset = abs(math.tan(math.pi * angle / 180.0) * height)
-        hatch_model = Model()
-        num_lines = round((width + 2 * hatch_x_offset) / spacing)
-
-        # Make sure to alternate the direction we approach from to make the
-        # plotter's life easier. "Boustrophedonically", colloquially.
-        line_strings = []
-        for i in range(num_lines):
-            start_x = origin_x - hatch_x_offset
-            top_point = Point(start_x + i * spacing, origin_y, pen)
-            bottom_point = Point(start_x + (i * spacing) - (math.copysign(1, angle) * hatch_x_offset), origin_y - height, pen)
-            line = None
-            if i % 2:
-                line = [top_point, bottom_point]
-            else:
-                line = [bottom_point, top_point]
-            hatch_model.add_line(Line(
-                line,
-                pen
-            ))
-            line_strings.append(shapely.LineString([[line[0].x, line[0].y], [line[1].x, line[1].y]]))
-
-        hatch_intersection = hatch_model.intersection(self)
-        self.add_model(hatch_intersection)
-        return hatch_intersection
+    strokes = PackedLines.concatenate(
+        [PackedLines(coords, offsets, stroke_pens) for coords, offsets, stroke_pens, _ in results]
+    )
+    stroke_regions = np.concatenate([result[3] for result in results])
+    if join_distances is None:
+        join_distances = JOIN_TOLERANCE * spacings
+    strokes, stroke_regions = join_strokes(strokes, stroke_regions, geometries, join_distances)
+    # Strokes come out grouped by region, in order
+    stroke_splits = np.searchsorted(stroke_regions, np.arange(num_polygons + 1))
+    lines = strokes.lines()
+    return Model(models=[
+        Model(lines=lines[stroke_splits[i]:stroke_splits[i + 1]]) for i in range(num_polygons)
+    ])
@@ -0,0 +1,76 @@
+from typing import Iterator
+
+import numpy as np
+
+# Greatest number of vertices chained into a single draw command, which keeps commands
+# well within the plotter's receive buffer
+MAX_VERTICES_PER_COMMAND = 64
+# Powers of ten, for counting the digits of coordinates
+_POWERS_OF_TEN = 10 ** np.arange(1, 19, dtype=np.int64)
+
+
+def _num_chars(values: np.ndarray) -> np.ndarray:
+    """Get the number of characters integers are formatted with."""
+    return np.searchsorted(_POWERS_OF_TEN, np.abs(values), side="right") + 1 + (values < 0)
+
+
+def plan_lines(points: np.ndarray, offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decide how to encode each line in as few bytes as possible.
+
+    Each line starts with an absolute move to its first vertex. Its other vertices
+    are chained into draw commands, either absolute (`D x1,y1,x2,y2,...`) or relative
+    to the previous vertex (`E dx1,dy1,dx2,dy2,...`), whichever is shorter, at most
+    :data:`MAX_VERTICES_PER_COMMAND` to a command. Moves stay absolute, so the
+    plotter's position never depends on commands sent before the line, such as
+    when resuming a print from the start of a line.
+
+    :param points: Vertices of all lines, rounded to integers
+    :param offsets: Index of the first vertex of each line, followed by the number of vertices
+    :return: Whether each line is drawn with relative commands, the values to send for
+        each vertex, and the number of bytes of each line's commands, terminators included
+    """
+    lengths = np.diff(offsets)
+    line_indices = np.repeat(np.arange(len(lengths)), lengths)
+    is_start = np.zeros(len(points), dtype=bool)
+    is_start[offsets[:-1][lengths > 0]] = True
+    deltas = np.zeros_like(points)
+    deltas[1:] = points[1:] - points[:-1]
+
+    # Every vertex after the first takes its two numbers, the comma between them, and
+    # either a comma or the command letter before them
+    absolute_bytes = np.where(is_start, 0, _num_chars(points).sum(axis=1) + 2)
+    relative_bytes = np.where(is_start, 0, _num_chars(deltas).sum(axis=1) + 2)
+    absolute_totals = np.bincount(line_indices, weights=absolute_bytes, minlength=len(lengths))
+    relative_totals = np.bincount(line_indices, weights=relative_bytes, minlength=len(lengths))
+    relative = relative_totals < absolute_totals
+
+    move_bytes = np.zeros(len(lengths), dtype=np.int64)
+    move_bytes[lengths > 0] = _num_chars(points[is_start]).sum(axis=1) + 3
+    num_draw_commands = -(-np.maximum(lengths - 1, 0) // MAX_VERTICES_PER_COMMAND)
+    command_bytes = np.where(relative, relative_totals, absolute_totals).astype(np.int64)
+    command_bytes += move_bytes + num_draw_commands
+
+    values = np.where((relative[line_indices] & ~is_start)[:, np.newaxis], deltas, points)
+    return relative, values, command_bytes
+
+
+def encode_line(values: list[list[int]], relative: bool) -> Iterator[bytes]:
+    """
+    Encode a line as planned by :func:`plan_lines`, without terminators.
+
+    :param values: Values to send for each of the line's vertices
+    :param relative: Whether the line is drawn with relative commands
+    """
+    if len(values) == 0:
+        return
+    yield b"M%d,%d" % tuple(values[0])
+    letter = "E" if relative else "D"
+    for start in range(1, len(values), MAX_VERTICES_PER_COMMAND):
+        run = values[start:start + MAX_VERTICES_PER_COMMAND]
+        yield (letter + ",".join([str(value) for vertex in run for value in vertex])).encode()
+
+
+def count_vertices(command: bytes) -> int:
+    """Get the number of vertices a move or draw command goes to."""
+    return (command.count(b",") + 1) // 2
@@ -1,45 +1,57 @@
-from .Printer import Printer
+from .Printer import CHECKPOINT_INTERVAL, Printer
+from .PrintSpool import PrintSpool
+from .GpglEncoder import count_vertices, encode_line, plan_lines
 from time import sleep
-from collections import defaultdict
-from ..models.atoms.Line import Line
+from ..models.PackedLines import PackedLines
+import numpy as np
+
+# Terminates every GPGL command
+ETX = b"\x03"
+# Number of lines whose commands are formatted at once while generating commands
+LINES_PER_CHUNK = 1024
+# First bytes of the commands that move to or draw to vertices
+DRAWING_COMMANDS = b"MDE"
 
 def fmt(string):
-    return string.encode() + b"\x03"
+    return string.encode() + ETX
 
 class GpglPrinter(Printer):
-    def __init__(self, serializer):
-        super().__init__(serializer)
+    def __init__(self, serializer, motion=None):
+        super().__init__(serializer, motion)
         self.current_pen = None
         self.pen_to_replace = None
 
     def pre_print_commands(self):
         self.serializer.serialize_command(fmt(':'))
+        self.serializer.flush()
         sleep(5)
         self.serializer.serialize_command(fmt('M0, 0'))
 
-    # Given a list of lines, returns a map from pen_num to a list of lines
-    # using that pen.
-    def _group_lines_by_pen(self, lines: list[Line]):
-        pen_num_map = defaultdict(list)
-        for line in lines:
-            line_pen_num = line.pen
-            pen_num_map[str(line_pen_num)].append(line)
-        return pen_num_map
+    # Given packed lines, returns the order to draw them in so that lines using
+    # the same pen are drawn together, pens in the order they're first used.
+    def _order_lines_by_pen(self, lines: PackedLines):
+        _, first_uses, pen_indices = np.unique(lines.pens, return_index=True, return_inverse=True)
+        pen_ranks = np.argsort(np.argsort(first_uses))
+        return np.argsort(pen_ranks[pen_indices], kind="stable")
 
     def _continue_print(self):
         # This method is only called whenever a pen is replaced
         self.current_pen = self.pen_to_replace
         self.pen_to_replace = None
 
-        # Iterate over buffers, popping items out until we see a "pen replace" command.
+        for gpgl_command in self.resume_commands:
+            self.serializer.serialize_command(gpgl_command + ETX)
+        self.resume_commands = []
+
+        # Iterate over buffers, sending commands until we see a "pen replace" command.
         # Once we see one, set some flags, and stop printing. The GUI will watch these flags
         # and prompt the user to replace the pen. Once it's been replaced, confirming the
         # dialogue will resume the print.
         while self.current_buffer_index < len(self.command_buffer):
-            while len(self.command_buffer[self.current_buffer_index]) > 0:
-                gpgl_command = self.command_buffer[self.current_buffer_index].pop(0)
-                if gpgl_command[:2] == "PR":
-                    new_pen_num = gpgl_command[2]
+            # Buffers are iterators, so after a pen replacement this resumes with the next command
+            for gpgl_command in self.command_buffer[self.current_buffer_index]:
+                if gpgl_command.startswith(b"PR"):
+                    new_pen_num = gpgl_command[2:].decode()
                     new_pen_config = self.pen_maps[self.current_buffer_index][new_pen_num]
                     self.serializer.serialize_command(fmt("J0")) # This returns the previous pen to the bay it was taken from
                     if self.current_pen and self.current_pen.get('load_directly', False):
@@ -49,52 +61,97 @@ class GpglPrinter(Printer):
                         # is issued
                         self.serializer.serialize_command(fmt("J0"))
 
+                    # Everything drawn with the previous pen must reach the plotter before the user swaps pens.
+                    # Resuming from here asks for the new pen again.
+                    self._save_checkpoint(self.command_index, None)
+                    self.serializer.flush()
+                    self.command_index += 1
                     self.pen_to_replace = new_pen_config
                     self.printing_needs_user_input = True
                     return False
-                self.serializer.serialize_command(fmt(gpgl_command))
+                self.serializer.serialize_command(gpgl_command + ETX)
+                if gpgl_command[0] in DRAWING_COMMANDS:
+                    self.commands_sent += count_vertices(gpgl_command)
+                self.command_index += 1
+                if self.spool and self.command_index % CHECKPOINT_INTERVAL == 0:
+                    self._save_checkpoint(self.command_index, self.current_pen)
             self.current_buffer_index += 1
 
+        self.serializer.flush()
         return True
 
-    def generate_commands(self, lines, print_settings, pen_map):
-        lines_grouped_by_pen = self._group_lines_by_pen(lines)
+    def _checkpoint_at(self, spool: PrintSpool, command_index: int) -> dict:
+        # Replay the pen changes and drawing commands before the command, as sending them would have
+        commands_sent = 0
+        pen = None
+        for index, gpgl_command in enumerate(spool.commands(0, command_index)):
+            if gpgl_command.startswith(b"PR"):
+                pen = spool.pen_maps[spool.buffer_index(index)][gpgl_command[2:].decode()]
+            elif gpgl_command[0] in DRAWING_COMMANDS:
+                commands_sent += count_vertices(gpgl_command)
+        return {"command_index": command_index, "commands_sent": commands_sent, "pen": pen}
+
+    def _prepare_resume(self, spool: PrintSpool, checkpoint):
+        # Go back to the start of the line being drawn, or the pen change being made,
+        # since the plotter may have lost its position and pen
+        start = checkpoint["command_index"]
+        buffer_start = spool.buffer_starts[spool.buffer_index(start)]
+        while start > buffer_start and start < len(spool) and not spool.command(start).startswith((b"M", b"PR")):
+            start -= 1
+            if spool.command(start)[0] in DRAWING_COMMANDS:
+                self.commands_sent -= count_vertices(spool.command(start))
+
+        pen = checkpoint["pen"]
+        if start < len(spool) and spool.command(start).startswith(b"PR"):
+            # The pen is asked for again as the print continues
+            pen = None
+        self.resume_commands = [b"H"]
+        if pen:
+            self.resume_commands.append(b"H" if pen.get('load_directly', False) else f"J{pen['location']}".encode())
+            self.pen_to_replace = pen
+            self.printing_needs_user_input = True
+        return start
 
-        gpgl = ["H"]
+    def count_command_bytes(self, lines: PackedLines):
+        _, _, command_bytes = plan_lines(np.rint(lines.coords).astype(np.int64), lines.offsets)
+        return command_bytes
+
+    def generate_commands(self, lines: PackedLines, print_settings, pen_map):
+        """
+        Lazily generate the GPGL commands drawing some lines, encoded but not yet terminated.
+
+        Vertices are rounded and formatted a chunk of lines at a time, as the commands
+        are consumed, so only the lines themselves are ever held in memory. Each line is
+        a move to its start, followed by its other vertices chained into as few draw
+        commands as possible, absolute or relative, whichever is shorter.
+        """
+        yield b"H"
         current_pen = None
 
-        for line_group in lines_grouped_by_pen.values():
-            for line in line_group:
-                line_pen_num = line.pen
+        order = self._order_lines_by_pen(lines)
+        for chunk_start in range(0, len(order), LINES_PER_CHUNK):
+            chunk = lines.take(order[chunk_start:chunk_start + LINES_PER_CHUNK])
+            relative, values, _ = plan_lines(np.rint(chunk.coords).astype(np.int64), chunk.offsets)
+            relative = relative.tolist()
+            values = values.tolist()
+            offsets = chunk.offsets.tolist()
+            for line_index, line_pen_num in enumerate(chunk.pens.tolist()):
                 line_pen_config = pen_map[str(line_pen_num)]
 
                 # If the current pen does not equal the desired pen for this line, get the desired pen.
                 # If pause_to_replace is set, we should wait before getting the current pen.
                 if (not current_pen) or pen_map[str(current_pen)]["descr"] != line_pen_config["descr"]:
                     if line_pen_config['pause_to_replace']:
-                        gpgl.append(f"PR{line_pen_num}")
+                        yield b"PR%d" % line_pen_num
                         new_pen_location = line_pen_config['location']
                         if line_pen_config.get('load_directly', False):
-                            gpgl.append('H')
+                            yield b"H"
                         else:
-                            gpgl.append(f"J{new_pen_location}")
+                            yield f"J{new_pen_location}".encode()
                         current_pen = line_pen_num
 
                 # Now, the correct pen is in the holder, we can proceed.
-                points = line.points
-                for i in range(len(points)):
-                    if i == 0:
-                        # Using the y-component as-is results in a mirrored image about the horizontal axis;
-                        # flip it here...
-                        gpgl.append(
-                            f'M{round(points[i].x)},{round(points[i].y)}'
-                        )
-                    else:
-                        gpgl.append(
-                            f'D{round(points[i].x)},{round(points[i].y)}'
-                        )
-
-        gpgl.append("J0")
-        gpgl.append("H")
-
-        return gpgl
+                yield from encode_line(values[offsets[line_index]:offsets[line_index + 1]], relative[line_index])
+
+        yield b"J0"
+        yield b"H"
@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+import queue
+import threading
+import time
+import traceback
+from typing import Callable
+
+from .Printer import Printer
+
+
+@dataclass
+class PrintProgress:
+    """
+    How far along a print is.
+
+    :ivar commands_sent: Number of drawing commands sent to the printer so far
+    :vartype commands_sent: int
+    :ivar total_commands: Number of drawing commands in the print
+    :vartype total_commands: int
+    :ivar percent: Percentage of drawing commands sent, only 100 once the print has finished
+    :vartype percent: float
+    :ivar eta: Estimated number of seconds left, not counting pauses, or None if not known,
+        such as once the print has stopped without finishing
+    :vartype eta: float
+    """
+
+    commands_sent: int
+    total_commands: int
+    percent: float
+    eta: float
+
+
+class PrintJobRunner:
+    """
+    Runs prints on a worker thread, so that sending commands never blocks the GUI.
+
+    Requests are passed to the worker through a queue and handled in order. When the
+    print pauses for a pen replacement, the worker sets an event, which the GUI polls
+    every frame; confirming the replacement queues a request to continue.
+    """
+
+    def __init__(self, printer: Printer):
+        self.printer = printer
+        self.requests = queue.Queue()
+        # Set while the print is paused until the user replaces a pen
+        self.pen_replacement_needed = threading.Event()
+        # Set from when a print is queued until it has finished
+        self.busy = threading.Event()
+        self._lock = threading.Lock()
+        self._active_seconds = 0
+        self._active_since = None
+        self._progress = PrintProgress(0, 0, 0, None)
+        self.thread = threading.Thread(target=self._run, name="print-job-runner", daemon=True)
+        self.thread.start()
+
+    def begin_print(self, prepare: Callable[[Printer], None] = None, spool_path: str = None):
+        """
+        Queue a print.
+
+        :param prepare: If given, called with the printer on the worker thread before the
+            print begins, to add models to it without holding up the caller
+        :param spool_path: If given, where to spool the print so that it can be resumed
+        """
+        self.busy.set()
+        self.requests.put((self._begin_print, (prepare, spool_path)))
+
+    def resume_print(self, spool_path: str, command_index: int = None):
+        """
+        Queue resuming an interrupted spooled print.
+
+        :param spool_path: Where the print was spooled
+        :param command_index: If given, the index in the spool of the command to resume
+            from, rather than the last checkpoint
+        """
+        self.busy.set()
+        self.requests.put((self._resume_print, (spool_path, command_index)))
+
+    def continue_print(self):
+        """Queue continuing a print paused for a pen replacement."""
+        self.pen_replacement_needed.clear()
+        self.requests.put((self._continue_print, None))
+
+    def stop(self):
+        """Stop the worker thread once it's done with all queued requests."""
+        self.requests.put(None)
+
+    def is_printing(self) -> bool:
+        return self.busy.is_set()
+
+    def needs_pen_replacement(self) -> bool:
+        return self.pen_replacement_needed.is_set()
+
+    def get_progress(self) -> PrintProgress:
+        """Get the progress of the current print, or of the last one if none is running."""
+        with self._lock:
+            if self._active_since is None:
+                return self._progress
+            return self._measure(self._active_seconds + time.monotonic() - self._active_since)
+
+    def _measure(self, active_seconds: float) -> PrintProgress:
+        """Get the progress of the printer, extrapolating from the time spent sending so far."""
+        sent = self.printer.commands_sent
+        total = self.printer.total_commands
+        if not self.printer.printing and self.printer.finished:
+            return PrintProgress(sent, total, 100, 0)
+        # An unfinished print never shows as complete, even if all of its commands were sent
+        percent = min(100 * sent / total, 99.9) if total > 0 else 0
+        if not self.printer.printing:
+            return PrintProgress(sent, total, percent, None)
+        eta = active_seconds / sent * max(total - sent, 0) if sent > 0 else None
+        return PrintProgress(sent, total, percent, eta)
+
+    def _begin_print(self, arguments):
+        prepare, spool_path = arguments
+        if prepare is not None:
+            prepare(self.printer)
+        with self._lock:
+            self._active_seconds = 0
+        self._send(lambda: self.printer.begin_print(spool_path))
+
+    def _resume_print(self, arguments):
+        spool_path, command_index = arguments
+        with self._lock:
+            self._active_seconds = 0
+        self._send(lambda: self.printer.resume_print(spool_path, command_index))
+
+    def _continue_print(self, _):
+        self._send(self.printer.continue_print)
+
+    def _send(self, send):
+        """Send commands until the print finishes or pauses, timing how long that takes."""
+        with self._lock:
+            self._active_since = time.monotonic()
+        try:
+            send()
+        finally:
+            with self._lock:
+                self._active_seconds += time.monotonic() - self._active_since
+                self._active_since = None
+                self._progress = self._measure(self._active_seconds)
+        if self.printer.printing_needs_user_input:
+            self.pen_replacement_needed.set()
+        else:
+            self.busy.clear()
+
+    def _run(self):
+        while (request := self.requests.get()) is not None:
+            handler, argument = request
+            try:
+                handler(argument)
+            except Exception as e:
+                print(f"Error while printing: {e}")
+                print(traceback.format_exc())
+                self.printer.end_print()
+                with self._lock:
+                    self._progress = self._measure(self._active_seconds)
+                self.pen_replacement_needed.clear()
+                self.busy.clear()
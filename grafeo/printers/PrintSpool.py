@@ -0,0 +1,154 @@
+import json
+import mmap
+import os
+from typing import Iterable, Iterator
+
+import numpy as np
+
+# Commands are stored one after another, each followed by this byte, as sent to the plotter
+TERMINATOR = b"\x03"
+# Number of bytes gathered before writing them to the spool file
+_WRITE_CHUNK_SIZE = 1 << 20
+
+
+def _metadata_path(path: str) -> str:
+    return path + ".json"
+
+
+def _checkpoint_path(path: str) -> str:
+    return path + ".checkpoint.json"
+
+
+def _write_json(path: str, value):
+    # Write to a temporary file first, so a crash never leaves a half-written file behind
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(value, f)
+    os.replace(temporary_path, path)
+
+
+def write_spool(path: str, command_buffers: Iterable[Iterable[bytes]], pen_maps: list, total_commands: int):
+    """
+    Write compiled print commands to a spool file, consuming the buffers.
+
+    Commands are written out a chunk at a time, so they're never all held in memory.
+    The start of each buffer and its pen map are stored alongside them.
+
+    :param path: Path of the spool file. The metadata and checkpoints are stored next to it.
+    :param command_buffers: Commands of each buffer, without terminators
+    :param pen_maps: Pen map of each buffer
+    :param total_commands: Number of drawing commands across all buffers
+    :return: The written spool
+    """
+    buffer_starts = []
+    num_commands = 0
+    chunk = bytearray()
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as f:
+        for commands in command_buffers:
+            buffer_starts.append(num_commands)
+            for command in commands:
+                chunk += command
+                chunk += TERMINATOR
+                num_commands += 1
+                if len(chunk) >= _WRITE_CHUNK_SIZE:
+                    f.write(chunk)
+                    chunk = bytearray()
+        f.write(chunk)
+    os.replace(temporary_path, path)
+    _write_json(
+        _metadata_path(path),
+        {"buffer_starts": buffer_starts, "pen_maps": pen_maps, "total_commands": total_commands},
+    )
+    # A previous job's checkpoint doesn't apply to this one
+    if os.path.exists(_checkpoint_path(path)):
+        os.remove(_checkpoint_path(path))
+    return PrintSpool(path)
+
+
+def has_checkpoint(path: str) -> bool:
+    """Check whether a spooled print was interrupted, and can be resumed."""
+    return os.path.exists(path) and os.path.exists(_checkpoint_path(path))
+
+
+class PrintSpool:
+    """
+    Reads compiled print commands back from a spool file, through a memory map.
+
+    The position of every command is found once by scanning for terminators, after
+    which commands can be read from any index without reading those before them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(_metadata_path(path)) as f:
+            metadata = json.load(f)
+        self.buffer_starts = metadata["buffer_starts"]
+        self.pen_maps = metadata["pen_maps"]
+        self.total_commands = metadata["total_commands"]
+
+        self.file = open(path, "rb")
+        if os.path.getsize(path) > 0:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            contents = np.frombuffer(self.data, dtype=np.uint8)
+            command_ends = np.flatnonzero(contents == TERMINATOR[0])
+            del contents
+        else:
+            self.data = b""
+            command_ends = np.empty(0, dtype=np.int64)
+        # Command i occupies bytes offsets[i] up to offsets[i + 1], including its terminator
+        self.offsets = np.concatenate([[0], command_ends + 1])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def buffer_end(self, buffer_index: int) -> int:
+        """Get the index after the last command of a buffer."""
+        if buffer_index + 1 < len(self.buffer_starts):
+            return self.buffer_starts[buffer_index + 1]
+        return len(self)
+
+    def buffer_index(self, command_index: int) -> int:
+        """Get the index of the buffer a command is in."""
+        return max(int(np.searchsorted(self.buffer_starts, command_index, side="right")) - 1, 0)
+
+    def command(self, index: int) -> bytes:
+        """Get a command, without its terminator."""
+        return self.data[self.offsets[index]:self.offsets[index + 1] - 1]
+
+    def commands(self, start: int, end: int) -> Iterator[bytes]:
+        """Lazily read the commands from index `start` up to `end`, without their terminators."""
+        offsets = self.offsets[start:end + 1].tolist()
+        data = self.data
+        for command_start, next_start in zip(offsets, offsets[1:]):
+            yield data[command_start:next_start - 1]
+
+    def save_checkpoint(self, command_index: int, commands_sent: int, pen):
+        """
+        Record how far the print got.
+
+        :param command_index: Index of the first command not known to have reached the printer
+        :param commands_sent: Number of drawing commands sent before it
+        :param pen: Config of the pen in the holder at that point, if any
+        """
+        _write_json(
+            _checkpoint_path(self.path),
+            {"command_index": command_index, "commands_sent": commands_sent, "pen": pen},
+        )
+
+    def load_checkpoint(self) -> dict:
+        """Get the last recorded checkpoint, or one at the very start if there is none."""
+        if not os.path.exists(_checkpoint_path(self.path)):
+            return {"command_index": 0, "commands_sent": 0, "pen": None}
+        with open(_checkpoint_path(self.path)) as f:
+            return json.load(f)
+
+    def clear_checkpoint(self):
+        """Forget the checkpoint, once the print has finished."""
+        if os.path.exists(_checkpoint_path(self.path)):
+            os.remove(_checkpoint_path(self.path))
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
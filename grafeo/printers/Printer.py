@@ -3,30 +3,149 @@ from typing import Any
 from ..pens import Pen
 from ..serializers.Serializer import Serializer
 from ..config.ConfigManager import PenConfig
-from ..models import Model
+from ..models import BoundingBox, Model, PackedLines
 from ..utils.scaling import scale_to_fit
-import math
+from ..utils.affine import rotation_matrix, scale_matrix, translation_matrix
+from ..utils.clipping import clip_to_rectangle
+from ..utils.line_merging import merge_lines, remove_redundant_segments
+from ..utils.path_optimization import optimize_paths
+from ..utils.pen_scheduling import merge_by_pen
+from ..utils.plot_estimation import PlotEstimate, estimate_plot
+from ..utils.simplification import simplify, snap_to_grid
+from .PrintSpool import PrintSpool, write_spool
+
+# Distance, in plotter units, within which points are considered the same
+MERGE_TOLERANCE = 0.5
+# Greatest distance, in plotter units, by which simplifying may move a line. The plotter
+# can't move by less than a unit, so this never changes what ends up on paper.
+SIMPLIFY_TOLERANCE = 0.5
+# Number of commands sent between checkpoints of a spooled print
+CHECKPOINT_INTERVAL = 2000
 
 
 class Printer(ABC):
-    def __init__(self, serializer: Serializer):
+    def __init__(self, serializer: Serializer, motion: dict = None):
+        """
+        :param serializer: Sends commands to the printer
+        :param motion: The printer's speeds and timings, from the `motion` settings in
+            printers.json, used to estimate how long prints take
+        """
         self.serializer = serializer
+        self.motion = motion
+        # Lines and pen map of each model added to the print, until they're scheduled
+        self.queued_jobs = []
+        self.print_settings = None
         self.command_buffer = []
         self.pen_maps = []
+        # Pen-up travel before and after optimizing each buffer's paths
+        self.path_optimizations = []
+        # Number of drawing commands (one per vertex) in the buffers, and sent so far. Both
+        # are kept once the print ends, until the next one is scheduled.
+        self.total_commands = 0
+        self.commands_sent = 0
         self.printing = False
+        # Whether the last print sent all of its commands
+        self.finished = False
         self.printing_needs_user_input = False
         self.current_buffer_index = 0
+        # Spool the buffers are read back from, if any, and the index in it of the next command
+        self.spool = None
+        self.command_index = 0
+        # Commands to send first when resuming an interrupted print
+        self.resume_commands = []
 
     def has_serializer(self):
         return self.serializer != None
 
-    def begin_print(self):
+    def begin_print(self, spool_path: str = None):
+        """
+        Start printing everything added to the print.
+
+        :param spool_path: If given, the compiled commands are first written to a spool
+            file here, and checkpoints recorded as they're sent, so the print can be
+            resumed with :meth:`resume_print` if it's interrupted
+        """
         if not self.serializer:
             return
+        self.finished = False
+        self.schedule()
+        if spool_path:
+            spool = write_spool(spool_path, self.command_buffer, self.pen_maps, self.total_commands)
+            spool.save_checkpoint(0, 0, None)
+            self._load_spool(spool, 0)
         self.printing = True
         self.current_buffer_index = 0
+        self.commands_sent = 0
         self.continue_print()
 
+    def resume_print(self, spool_path: str, command_index: int = None):
+        """
+        Resume a spooled print, without regenerating anything.
+
+        Checkpoints are recorded every `CHECKPOINT_INTERVAL` commands, and before every
+        pen change, so resuming from the last one may send again some commands which
+        already reached the printer. Given the index of the first command that didn't,
+        the print resumes from there instead.
+
+        :param spool_path: Where the print was spooled
+        :param command_index: If given, the index in the spool of the command to resume from
+        """
+        if not self.serializer:
+            return
+        self.finished = False
+        spool = PrintSpool(spool_path)
+        if command_index is None:
+            checkpoint = spool.load_checkpoint()
+        elif 0 <= command_index <= len(spool):
+            checkpoint = self._checkpoint_at(spool, command_index)
+        else:
+            spool.close()
+            raise ValueError(f"Command index {command_index} is outside of the spooled print")
+        self.total_commands = spool.total_commands
+        self.commands_sent = checkpoint["commands_sent"]
+        start = self._prepare_resume(spool, checkpoint)
+        self._load_spool(spool, start)
+        self.printing = True
+        if not self.printing_needs_user_input:
+            self.continue_print()
+
+    @abstractmethod
+    def _checkpoint_at(self, spool: PrintSpool, command_index: int) -> dict:
+        """
+        Work out the checkpoint a spooled print would have recorded at a command.
+
+        Returns the same fields as :meth:`PrintSpool.load_checkpoint`.
+        """
+        pass
+
+    def _prepare_resume(self, spool: PrintSpool, checkpoint: dict) -> int:
+        """
+        Get ready to resume a print from a checkpoint.
+
+        Returns the index of the command to resume from. May set up resume_commands, and
+        ask for user input before resuming.
+        """
+        return checkpoint["command_index"]
+
+    def _load_spool(self, spool: PrintSpool, start: int):
+        """Read the buffers back from a spool, from a command on."""
+        first_buffer = spool.buffer_index(start)
+        self.spool = spool
+        self.pen_maps = spool.pen_maps[first_buffer:]
+        self.command_buffer = [
+            spool.commands(max(start, spool.buffer_starts[i]), spool.buffer_end(i))
+            for i in range(first_buffer, len(spool.buffer_starts))
+        ]
+        self.command_index = start
+        self.current_buffer_index = 0
+
+    def _save_checkpoint(self, command_index: int, pen):
+        """Once everything before a command has been sent, record it as a spooled print's checkpoint."""
+        if self.spool is None:
+            return
+        self.serializer.flush()
+        self.spool.save_checkpoint(command_index, self.commands_sent, pen)
+
     @abstractmethod
     def pre_print_commands(self):
         pass
@@ -35,6 +154,13 @@ class Printer(ABC):
     def generate_commands(self, lines, print_settings, pen_map):
         pass
 
+    @abstractmethod
+    def count_command_bytes(self, lines):
+        """
+        Get the number of bytes of the commands drawing each of some lines.
+        """
+        pass
+
     @abstractmethod
     def _continue_print(self):
         """
@@ -51,10 +177,29 @@ class Printer(ABC):
         self.printing_needs_user_input = False
         result = self._continue_print()
         if result:
-            self.pen_maps = []
-            self.command_buffer = []
-            self.current_buffer_index = 0
-            self.printing = False
+            if self.spool:
+                self.spool.clear_checkpoint()
+            self.finished = True
+            self.end_print()
+
+    def end_print(self):
+        """
+        Drop everything queued for printing, whether or not it was all sent.
+
+        A spooled print's checkpoint is kept, unless it finished.
+        """
+        if self.spool:
+            self.spool.close()
+            self.spool = None
+        self.command_index = 0
+        self.resume_commands = []
+        self.queued_jobs = []
+        self.pen_maps = []
+        self.path_optimizations = []
+        self.command_buffer = []
+        self.current_buffer_index = 0
+        self.printing = False
+        self.printing_needs_user_input = False
 
     def add_to_print(
         self,
@@ -67,23 +212,38 @@ class Printer(ABC):
         rotation
     ):
         """
-        Given a model and some transformation parameters, generate commands and add to buffer.
+        Given a model and some transformation parameters, prepare its lines and queue them for printing.
         """
-        self.pen_maps.append(pen_map)
+        snapped_lines = self.place_lines(model, print_settings, translate_x, translate_y, scale, rotation)
+
+        # Drop what wouldn't show up on paper, and join lines that meet, so the pen is lifted
+        # less often. Then drop vertices that don't move a line by a visible amount.
+        merged_lines = merge_lines(remove_redundant_segments(snapped_lines, MERGE_TOLERANCE), MERGE_TOLERANCE)
+        merged_lines = simplify(merged_lines, SIMPLIFY_TOLERANCE)
 
-        # TODO: A copy is expensive -- can we do better?
+        self.queued_jobs.append((merged_lines, pen_map))
+        self.print_settings = print_settings
+
+    def place_lines(self, model: Model, print_settings, translate_x, translate_y, scale, rotation) -> PackedLines:
+        """
+        Given a model and some transformation parameters, get its lines as they'd be placed on paper.
+
+        The lines are scaled to the printer's resolution, so one unit is one plotter
+        step, clipped to the margins, and rounded to whole steps, but not otherwise
+        optimized.
+        """
+        # Copies are copy-on-write, so only the content that the transform below
+        # touches is duplicated, and the caller's model is left untouched
         model = model.copy()
-        bounding_box = model.get_bounding_box()
 
-        # Apply transforms here:
+        # Build up a single transform, applied to the model in one pass:
         # - Translate to be centered about origin
         bounding_box = model.get_bounding_box()
         bounding_box_center_x = (bounding_box.max_x + bounding_box.min_x)/2
         bounding_box_center_y = (bounding_box.max_y + bounding_box.min_y)/2
-        model.translate(-bounding_box_center_x, -bounding_box_center_y)
+        matrix = translation_matrix(-bounding_box_center_x, -bounding_box_center_y)
 
         # - Scale to fit maximally within margins, then scale again by user-determined scale factor
-        bounding_box = model.get_bounding_box()
         (scaled_x, scaled_y) = scale_to_fit(
             bounding_box.max_x - bounding_box.min_x,
             bounding_box.max_y - bounding_box.min_y,
@@ -94,29 +254,74 @@ class Printer(ABC):
         init_scale = scaled_x/(bounding_box.max_x - bounding_box.min_x)
         print_scale = scale
         final_scale = init_scale*print_scale
-
-        model.apply_matrix([
-            [final_scale, 0],
-            [0, final_scale]
-        ])
-        bounding_box = model.get_bounding_box()
+        matrix = scale_matrix(final_scale) @ matrix
 
         # - Rotate about origin (since we're currently centered about origin)
-        theta =  math.pi * rotation / 180.0
-        rotation_matrix = [
-            [math.cos(theta), -math.sin(theta)],
-            [math.sin(theta), math.cos(theta)]
-        ]
-        model.apply_matrix(rotation_matrix)
-
-        bounding_box = model.get_bounding_box()
+        matrix = rotation_matrix(rotation) @ matrix
 
         # - Finally, translate back into place in +x/+y quadrant, taking into account additional translations
         # If we don't flip the y translation, the printed image is shifted in the wrong direction...
-        model.translate(print_settings["resolution_x"]/2 + translate_x, print_settings["resolution_y"]/2 - translate_y)
-        bounding_box = model.get_bounding_box()
+        matrix = translation_matrix(
+            print_settings["resolution_x"]/2 + translate_x,
+            print_settings["resolution_y"]/2 - translate_y
+        ) @ matrix
+        model.transform(matrix)
+
+        # Never draw outside of the margins, however the model was scaled and translated
+        margins = BoundingBox(
+            min_x=print_settings["margin_x"],
+            max_x=print_settings["resolution_x"] - print_settings["margin_x"],
+            min_y=print_settings["margin_y"],
+            max_y=print_settings["resolution_y"] - print_settings["margin_y"],
+        )
+        clipped_lines = clip_to_rectangle(model.pack(), margins)
 
-        model_lines = model.all_lines
+        # Models were scaled to the printer's resolution, so one unit is one plotter step
+        return snap_to_grid(clipped_lines)
 
-        commands = self.generate_commands(model_lines, print_settings, pen_map)
+    def schedule(self):
+        """
+        Turn the lines of every model queued for printing into a buffer of commands.
+
+        All models' lines are merged, and grouped by physical pen, so that each pen is
+        only fetched (and replaced by hand, if need be) once, whichever models use it.
+        """
+        if len(self.queued_jobs) == 0:
+            return
+        if len(self.command_buffer) == 0:
+            # Nothing is scheduled yet, so this starts a new print
+            self.total_commands = 0
+        lines, pen_map = merge_by_pen(self.queued_jobs)
+        self.queued_jobs = []
+
+        # Reorder each pen's lines to spend as little time as possible moving with the pen up.
+        # The plotter starts each buffer from its home position.
+        optimization = optimize_paths(lines, start=(0, 0))
+        self.path_optimizations.append(optimization)
+
+        # Commands are generated lazily, as the print consumes them
+        commands = self.generate_commands(optimization.lines, self.print_settings, pen_map)
         self.command_buffer.append(commands)
+        self.pen_maps.append(pen_map)
+        self.total_commands += optimization.lines.num_vertices
+
+    def estimate(self, bytes_per_second: float = None) -> PlotEstimate:
+        """
+        Estimate what printing everything added to the print involves, per pen.
+
+        Queued models are scheduled first, exactly as they would be printed, and the
+        estimate covers every buffer of commands not yet sent.
+
+        :param bytes_per_second: Rate at which the connection sends commands, if limited
+        :return: Pen-down and pen-up lengths, lifts, pen changes, command bytes and time taken
+        """
+        if self.motion is None:
+            raise Exception('Printer has no motion settings to estimate prints with')
+        self.schedule()
+        estimate = PlotEstimate()
+        for optimization, pen_map in zip(self.path_optimizations, self.pen_maps):
+            lines = optimization.lines
+            estimate += estimate_plot(
+                lines, pen_map, self.motion, self.count_command_bytes(lines), bytes_per_second
+            )
+        return estimate
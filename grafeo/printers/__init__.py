@@ -2,4 +2,4 @@ from .GpglPrinter import GpglPrinter
 
 def get_printer(printer_config, serializer):
     if printer_config['serializer'] == 'gpgl':
-        return GpglPrinter(serializer)
+        return GpglPrinter(serializer, printer_config.get('motion'))
@@ -0,0 +1,245 @@
+from collections import deque
+import os
+import select
+import threading
+import time
+
+import numpy as np
+
+from .Serializer import Serializer
+from ..models.PackedLines import PackedLines
+from ..utils.plot_estimation import move_times
+
+ETX = b"\x03"
+XON = b"\x11"
+XOFF = b"\x13"
+
+
+class MockPlotter:
+    """
+    Simulates a GPGL plotter, for testing and benchmarking prints without one.
+
+    Commands are parsed as they're received, and everything drawn is recorded, so
+    the plotted output can be compared between versions of the print path. The
+    plotter has a receive buffer of `buffer_size` bytes, and executes commands from
+    it one at a time, each taking `command_time` seconds plus, given motion settings
+    as in printers.json, the time taken by the moves it makes.
+
+    Fed directly with :meth:`receive`, time is simulated: bytes arrive at the baud
+    rate, and once the buffer fills up, the plotter sends XOFF and the sender waits
+    until it has drained to a quarter full before XON lets it carry on. With
+    :meth:`serve_pty`, the plotter instead sits on the other end of a pseudo-terminal
+    in real time, sending actual XOFF and XON bytes.
+    """
+
+    def __init__(
+        self,
+        baud: float = 9600,
+        bits_per_byte: float = 11,
+        buffer_size: int = 1024,
+        command_time: float = 0.001,
+        motion: dict = None,
+    ):
+        """
+        :param baud: Bits per second the connection carries
+        :param bits_per_byte: Bits sent per byte, framing included
+        :param buffer_size: Number of bytes the plotter can hold before executing them
+        :param command_time: Time taken to execute any command, besides moving
+        :param motion: The printer's `pen_down_speed`, `pen_up_speed`, `acceleration`,
+            `pen_lift_time` and `pen_change_time`. If not given, moves take no time.
+        """
+        self.bytes_per_second = baud / bits_per_byte
+        self.buffer_size = buffer_size
+        self.command_time = command_time
+        self.motion = motion
+
+        self.position = (0, 0)
+        self.pen = 0
+        # Plotted polylines, each a list of vertices, and the pen slot each was drawn with
+        self.lines = []
+        self.line_pens = []
+        self._drawing = False
+        self._partial = bytearray()
+
+        self.bytes_received = 0
+        self.commands_executed = 0
+        self.pauses = 0
+        # Simulated time at which the last byte finished arriving, and the last command finished executing
+        self.transmit_clock = 0.0
+        self.execute_clock = 0.0
+        # Finish time and size of each buffered command not yet executed
+        self._buffered = deque()
+        self._buffered_bytes = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def elapsed(self) -> float:
+        """Get the simulated time from the first byte received until everything was executed."""
+        return max(self.transmit_clock, self.execute_clock)
+
+    def receive(self, data: bytes):
+        """
+        Receive bytes from the host, in simulated time.
+
+        Complete commands are executed right away, and sending waits whenever the
+        receive buffer is full.
+        """
+        self._partial += data
+        *commands, self._partial = self._partial.split(ETX)
+        for command in commands:
+            size = len(command) + len(ETX)
+            self._drain(self.transmit_clock)
+            if self._buffered_bytes + size > self.buffer_size and self._buffered:
+                # XOFF, until the plotter has caught up enough to send XON
+                self.pauses += 1
+                while self._buffered and self._buffered_bytes > self.buffer_size // 4:
+                    finish, buffered_size = self._buffered.popleft()
+                    self._buffered_bytes -= buffered_size
+                    self.transmit_clock = max(self.transmit_clock, finish)
+            self.transmit_clock += size / self.bytes_per_second
+            self.bytes_received += size
+            self.execute_clock = max(self.execute_clock, self.transmit_clock) + self.execute(bytes(command))
+            self._buffered.append((self.execute_clock, size))
+            self._buffered_bytes += size
+
+    def _drain(self, now: float):
+        """Free the buffer space of commands executed by some simulated time."""
+        while self._buffered and self._buffered[0][0] <= now:
+            self._buffered_bytes -= self._buffered.popleft()[1]
+
+    def execute(self, command: bytes) -> float:
+        """
+        Execute a command, recording anything it draws.
+
+        :return: The time it takes
+        """
+        self.commands_executed += 1
+        if len(command) == 0:
+            return 0
+        letter = chr(command[0])
+        seconds = self.command_time
+        if letter in "MDEO":
+            values = [int(value) for value in command[1:].split(b",")]
+            points = list(zip(values[0::2], values[1::2]))
+            if letter in "EO":
+                points = list(zip(*(np.cumsum([self.position] + points, axis=0)[1:].T.tolist())))
+            pen_down = letter in "DE"
+            seconds += self._move_time(points, pen_down)
+            for point in points:
+                self._move_to(tuple(point), pen_down)
+        elif letter == "H":
+            seconds += self._move_time([(0, 0)], False)
+            self._move_to((0, 0), False)
+        elif letter == "J":
+            # J0 puts the held pen back, and any other slot fetches the pen from there
+            self.pen = int(command[1:] or 0)
+            self._drawing = False
+            if self.motion and self.pen != 0:
+                seconds += self.motion["pen_change_time"]
+        return seconds
+
+    def _move_time(self, points: list, pen_down: bool) -> float:
+        if not self.motion:
+            return 0
+        path = np.array([self.position] + list(points), dtype=np.float64)
+        lengths = np.hypot(*np.diff(path, axis=0).T)
+        speed = self.motion["pen_down_speed" if pen_down else "pen_up_speed"]
+        seconds = float(move_times(lengths, speed, self.motion["acceleration"]).sum())
+        if pen_down and not self._drawing:
+            seconds += self.motion["pen_lift_time"]
+        return seconds
+
+    def _move_to(self, point: tuple, pen_down: bool):
+        if pen_down:
+            if not self._drawing:
+                self.lines.append([self.position])
+                self.line_pens.append(self.pen)
+                self._drawing = True
+            self.lines[-1].append(point)
+        else:
+            self._drawing = False
+        self.position = point
+
+    def plotted_lines(self) -> PackedLines:
+        """Get everything drawn so far, with the pen slot each line was drawn with as its pen."""
+        if len(self.lines) == 0:
+            return PackedLines()
+        offsets = np.concatenate([[0], np.cumsum([len(line) for line in self.lines])])
+        coords = np.array([point for line in self.lines for point in line], dtype=np.float64)
+        return PackedLines(coords, offsets, np.array(self.line_pens, dtype=np.int64))
+
+    def plotted_segments(self) -> set:
+        """Get every segment drawn so far, regardless of direction, order and pen."""
+        return {
+            tuple(sorted((start, end)))
+            for line in self.lines
+            for start, end in zip(line, line[1:])
+            if start != end
+        }
+
+    def serve_pty(self, time_scale: float = 1) -> str:
+        """
+        Act as the plotter on the other end of a new pseudo-terminal, on a background thread.
+
+        Commands are executed as they're received, taking `time_scale` real seconds
+        per simulated second. XOFF is sent once the receive buffer fills up, and XON
+        once it has drained to a quarter full.
+
+        :return: The path of the device to connect to, e.g. with :class:`SerialSerializer`
+        """
+        import pty
+        import tty
+
+        self._controller, device = pty.openpty()
+        tty.setraw(device)
+        self._device = device
+        self._thread = threading.Thread(target=self._serve, args=(time_scale,), daemon=True)
+        self._thread.start()
+        return os.ttyname(device)
+
+    def _serve(self, time_scale: float):
+        received = bytearray()
+        paused = False
+        while not self._stopped.is_set():
+            timeout = 0 if ETX in received else 0.05
+            if select.select([self._controller], [], [], timeout)[0]:
+                data = os.read(self._controller, 4096)
+                received += data
+                self.bytes_received += len(data)
+                if not paused and len(received) >= self.buffer_size:
+                    os.write(self._controller, XOFF)
+                    self.pauses += 1
+                    paused = True
+            end = received.find(ETX)
+            if end >= 0:
+                command = bytes(received[:end])
+                del received[:end + 1]
+                seconds = self.execute(command)
+                self.execute_clock += seconds
+                if time_scale > 0:
+                    time.sleep(seconds * time_scale)
+            if paused and len(received) <= self.buffer_size // 4:
+                os.write(self._controller, XON)
+                paused = False
+
+    def stop(self):
+        """Stop serving a pseudo-terminal, and close it."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        os.close(self._controller)
+        os.close(self._device)
+        self._thread = None
+
+
+class MockPlotterSerializer(Serializer):
+    """Sends commands straight to a :class:`MockPlotter` in the same process, in simulated time."""
+
+    def __init__(self, plotter: MockPlotter = None):
+        super().__init__()
+        self.plotter = plotter if plotter is not None else MockPlotter()
+
+    def serialize_command(self, command):
+        self.plotter.receive(command)
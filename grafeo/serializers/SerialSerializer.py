@@ -6,6 +6,9 @@ from serial import STOPBITS_ONE, STOPBITS_ONE_POINT_FIVE, STOPBITS_TWO
 import sys
 import glob
 
+# Number of bytes of commands sent to the printer in one write, by default
+DEFAULT_CHUNK_SIZE = 4096
+
 class SerialSerializer(Serializer):
 
     @staticmethod
@@ -78,8 +81,27 @@ class SerialSerializer(Serializer):
         else:
             raise Exception(f'Unknown stopbits {stopbits} for serial port')
 
-    def __init__(self, serial_settings):
+    @staticmethod
+    def get_bytes_per_second(serial_settings) -> float:
+        """
+        Get the rate at which bytes are sent with some connection settings.
+
+        Each byte is framed by a start bit, its parity bit if any, and its stop bits.
+        """
+        bits = 1 + serial_settings['bytesize'] + float(serial_settings['stopbits'])
+        if serial_settings['parity'] != 'none':
+            bits += 1
+        return serial_settings['baud'] / bits
+
+    def __init__(self, serial_settings, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        :param serial_settings: Connection settings of the printer
+        :param chunk_size: Commands are held back and sent together once they add up to this
+            many bytes, or when flushed. If 0 or None, each command is written as it comes.
+        """
         super().__init__()
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
         bytesize = SerialSerializer.get_bytesize(serial_settings['bytesize'])
         parity = SerialSerializer.get_parity(serial_settings['parity'])
         stopbits= SerialSerializer.get_stopbits(serial_settings['stopbits'])
@@ -96,4 +118,23 @@ class SerialSerializer(Serializer):
         )
 
     def serialize_command(self, command):
-        self.ser.write(command)
+        if not self.chunk_size:
+            self.ser.write(command)
+            return
+        self.buffer += command
+        if len(self.buffer) >= self.chunk_size:
+            self._write_buffer()
+
+    def _write_buffer(self):
+        # With xon/xoff flow control, the driver holds back whatever part of the write the
+        # printer isn't ready for, so chunks may be larger than the printer's own buffer
+        if self.buffer:
+            self.ser.write(self.buffer)
+            self.buffer = bytearray()
+
+    def flush(self):
+        """
+        Sends all held back commands, and waits until they've been transmitted.
+        """
+        self._write_buffer()
+        self.ser.flush()
@@ -12,3 +12,9 @@ class Serializer(ABC):
         Serializes a command and sends it to the printer.
         """
         pass
+
+    def flush(self):
+        """
+        Sends any commands still held back on to the printer.
+        """
+        pass
@@ -1,7 +1,10 @@
+from .MockPlotterSerializer import MockPlotter, MockPlotterSerializer
 from .SerialSerializer import SerialSerializer
 
 def get_serializer(printer_config):
     if printer_config["connection"] == 'serial':
         if printer_config['connection_defaults']['port']:
             return SerialSerializer(printer_config['connection_defaults'])
+    if printer_config["connection"] == 'mock':
+        return MockPlotterSerializer(MockPlotter(motion=printer_config.get('motion')))
     return None
@@ -1,9 +1,24 @@
 from barcode.writer import BaseWriter
 from ..models.Model import Model
 from ..models.derived.Box import Box
+from ..models.derived.mixins.Hatchable import hatch_many
 from ..pens.Pen import Pen
 import math
 
+
+def hatch_modules(modules):
+    """
+    Hatch painted barcode bars in a single pass.
+
+    :param modules: Pairs of bar models and the spacing to hatch them with
+    """
+    num_modules = len(modules)
+    module_models = [module_model for module_model, _ in modules]
+    spacings = [spacing for _, spacing in modules]
+    hatches = hatch_many(module_models, [Pen.One] * num_modules, [30.0] * num_modules, spacings)
+    for module_model, hatch_model in zip(module_models, hatches.models):
+        module_model.add_model(hatch_model)
+
 class BarcodeModelWriter(BaseWriter):
 
     def __init__(self, barcode_width, barcode_height, model_width, model_height):
@@ -21,20 +36,25 @@ class BarcodeModelWriter(BaseWriter):
         self.model_height = model_height
 
         self.current_barcode = Model()
+        # Bars painted so far, along with their hatch spacing
+        self.modules = []
 
     def initialize(self, code):
         self.current_barcode = Model()
+        self.modules = []
 
     def paint_module(self, xpos, ypos, width, color):
         if color == 'black':
             module_model = Box(width, self.module_height, xpos, ypos, Pen.One)
-            module_model.hatch(Pen.One, 30.0, self.module_height/25)
+            self.modules.append((module_model, self.module_height/25))
             self.current_barcode.add_model(module_model)
 
     def paint_text(self, xpos, ypos):
         pass
 
     def finish(self):
+        hatch_modules(self.modules)
+        self.modules = []
         # Translate such that it's registered to origin
         bounding_box = self.current_barcode.get_bounding_box()
         min_x = bounding_box.min_x
@@ -75,20 +95,25 @@ class BarcodeModelWriter2(BaseWriter):
         self.origin_y = origin_y
 
         self.current_barcode = Model()
+        # Bars painted so far, along with their hatch spacing
+        self.modules = []
 
     def initialize(self, code):
         self.current_barcode = Model()
+        self.modules = []
 
     def paint_module(self, xpos, ypos, width, color):
         if color == 'black':
             module_model = Box(width, self.module_height, xpos, ypos, Pen.One)
-            module_model.hatch(Pen.One, 30.0, self.module_height/50)
+            self.modules.append((module_model, self.module_height/50))
             self.current_barcode.add_model(module_model)
 
     def paint_text(self, xpos, ypos):
         pass
 
     def finish(self):
+        hatch_modules(self.modules)
+        self.modules = []
         # Translate such that it's centered about origin
         bounding_box = self.current_barcode.get_bounding_box()
         min_x = bounding_box.min_x
@@ -1,7 +1,7 @@
+import numpy as np
 from svg.path import parse_path
 from ..models.Model import Model
 from ..models.atoms.Line import Line
-from ..models.atoms.Point import Point
 from ..pens.Pen import Pen
 from svg.path import Line as SvgLine
 
@@ -21,18 +21,15 @@ class Svg():
             for raw_path in self.paths:
                 # This is a beautifulsoup node
                 path = parse_path(raw_path['d'])
-                line_points = []
+                # Collect raw coordinates rather than Point objects; the line packs them anyway
+                line_coords = []
                 for i in range(len(path)):
                     element = path[i]
                     if type(element) == SvgLine:
                         if i == 0:
-                            line_points.append(
-                                Point(float(element.start.real), float(-element.start.imag + self.height), Pen.One),
-                            )
-                        line_points.append(
-                            Point(float(element.end.real), float(-element.end.imag + self.height), Pen.One),
-                        )
-                line = Line(line_points, Pen.One)
+                            line_coords.append((element.start.real, -element.start.imag + self.height))
+                        line_coords.append((element.end.real, -element.end.imag + self.height))
+                line = Line.from_coords(np.array(line_coords, dtype=np.float64).reshape(-1, 2), Pen.One)
                 model.add_line(line)
             self.model = model
             return model
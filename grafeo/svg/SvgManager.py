@@ -130,7 +130,7 @@ class SvgManager():
         font_manager = FontManager()
 
         models_per_page = self.num_rows * self.num_cols
-        # TODO: IDK if we need this copy
+        # Copy so that laying out the page doesn't move the cached svg models
         models = [svg.get_model().copy() for svg in self.svgs[models_per_page*page:models_per_page*(page+1)]]
         page_model = Model()
         for i in range(self.num_rows):
@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+
+
+def translation_matrix(x: float, y: float) -> np.ndarray:
+    """
+    Create a 3x3 homogeneous matrix translating by x, y.
+
+    :param x: Magnitude in x direction of translation
+    :param y: Magnitude in y direction of translation
+    """
+    return np.array([[1, 0, x], [0, 1, y], [0, 0, 1]], dtype=np.float64)
+
+
+def scale_matrix(scale_x: float, scale_y: float | None = None) -> np.ndarray:
+    """
+    Create a 3x3 homogeneous matrix scaling about the origin.
+
+    :param scale_x: Scale factor along the x axis
+    :param scale_y: Scale factor along the y axis. Defaults to `scale_x`.
+    """
+    if scale_y is None:
+        scale_y = scale_x
+    return np.array([[scale_x, 0, 0], [0, scale_y, 0], [0, 0, 1]], dtype=np.float64)
+
+
+def rotation_matrix(deg: float, x: float = 0, y: float = 0) -> np.ndarray:
+    """
+    Create a 3x3 homogeneous matrix rotating by deg about the point x, y.
+
+    :param deg: Degrees to rotate by
+    :param x: x coordinate of point to rotate about
+    :param y: y coordinate of point to rotate about
+    """
+    theta = math.pi * deg / 180.0
+    cos, sin = math.cos(theta), math.sin(theta)
+    return np.array(
+        [
+            [cos, -sin, x - x * cos + y * sin],
+            [sin, cos, y - x * sin - y * cos],
+            [0, 0, 1],
+        ],
+        dtype=np.float64,
+    )
+
+
+def to_affine(matrix) -> np.ndarray:
+    """
+    Convert a 2x2 linear or 3x3 homogeneous matrix into a 3x3 homogeneous matrix.
+
+    :param matrix: Nested sequence or array of shape (2, 2) or (3, 3)
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.shape == (3, 3):
+        return matrix
+    if matrix.shape == (2, 2):
+        affine = np.identity(3)
+        affine[:2, :2] = matrix
+        return affine
+    raise Exception(f"Expected a 2x2 or 3x3 matrix, got shape {matrix.shape}")
+
+
+def apply_affine(coords: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Apply a 3x3 homogeneous matrix to an array of coordinates.
+
+    :param coords: Array of shape (N, 2)
+    :param matrix: 3x3 homogeneous matrix
+    :return: A new array of shape (N, 2) with transformed coordinates
+    """
+    return coords @ matrix[:2, :2].T + matrix[:2, 2]
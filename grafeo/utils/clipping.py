@@ -0,0 +1,198 @@
+import numpy as np
+import shapely
+
+from ..models.BoundingBox import BoundingBox
+from ..models.PackedLines import PackedLines
+
+# The rectangle is grown by this fraction of its coordinates' magnitude, so that vertices
+# lying on its edges up to rounding error are considered inside rather than split off
+_EPSILON = 1e-9
+
+# Shapely geometry type ids
+_LINESTRING = 1
+_POLYGON = 3
+_MULTIPOLYGON = 6
+_GEOMETRYCOLLECTION = 7
+
+
+def clip_to_rectangle(packed: PackedLines, bounding_box: BoundingBox) -> PackedLines:
+    """
+    Clip lines to an axis-aligned rectangle.
+
+    Uses the Liang-Barsky algorithm, vectorized over every segment of every line at
+    once. Each line becomes one polyline per run of consecutive segments inside the
+    rectangle (edges included), drawn with the pen of the original line. Lines with
+    fewer than two vertices are dropped.
+
+    :param packed: Lines to clip
+    :param bounding_box: Rectangle to clip to
+    :return: The clipped lines
+    """
+    coords = packed.coords
+    if len(coords) < 2:
+        return PackedLines()
+    line_indices = packed.line_indices()
+    # Index of the start vertex of each segment
+    vertex_indices = np.flatnonzero(line_indices[:-1] == line_indices[1:])
+    starts = coords[vertex_indices]
+    ends = coords[vertex_indices + 1]
+    deltas = ends - starts
+
+    tolerance = _EPSILON * max(
+        1, abs(bounding_box.min_x), abs(bounding_box.max_x), abs(bounding_box.min_y), abs(bounding_box.max_y)
+    )
+    # A point start + t * delta is inside when p * t <= q holds for all four edges
+    p = np.stack([-deltas[:, 0], deltas[:, 0], -deltas[:, 1], deltas[:, 1]], axis=1)
+    q = np.stack(
+        [
+            starts[:, 0] - (bounding_box.min_x - tolerance),
+            (bounding_box.max_x + tolerance) - starts[:, 0],
+            starts[:, 1] - (bounding_box.min_y - tolerance),
+            (bounding_box.max_y + tolerance) - starts[:, 1],
+        ],
+        axis=1,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = q / p
+    t0 = np.max(np.where(p < 0, ratios, 0), axis=1)
+    t1 = np.min(np.where(p > 0, ratios, 1), axis=1)
+
+    # Segments parallel to and outside of an edge are rejected outright. Of the rest,
+    # only keep those with some length inside (or no length at all).
+    outside = np.any((p == 0) & (q < 0), axis=1)
+    kept = np.flatnonzero(~outside & (t0 < t1))
+    if len(kept) == 0:
+        return PackedLines()
+    t0, t1 = t0[kept], t1[kept]
+    starts, ends, deltas = starts[kept], ends[kept], deltas[kept]
+    vertex_indices = vertex_indices[kept]
+
+    # Crossings are computed against the grown rectangle, so clamp them onto the exact one
+    lower = (bounding_box.min_x, bounding_box.min_y)
+    upper = (bounding_box.max_x, bounding_box.max_y)
+    clipped_starts = np.where(
+        (t0 == 0)[:, np.newaxis], starts, np.clip(starts + t0[:, np.newaxis] * deltas, lower, upper)
+    )
+    clipped_ends = np.where(
+        (t1 == 1)[:, np.newaxis], ends, np.clip(starts + t1[:, np.newaxis] * deltas, lower, upper)
+    )
+
+    # A kept segment continues the previous one's polyline if it directly follows it
+    # on the same line, and neither was clipped where they meet
+    run_starts = np.ones(len(kept), dtype=bool)
+    run_starts[1:] = ~(
+        (vertex_indices[1:] == vertex_indices[:-1] + 1)
+        & (line_indices[vertex_indices[1:]] == line_indices[vertex_indices[:-1]])
+        & (t1[:-1] == 1)
+        & (t0[1:] == 0)
+    )
+
+    # Every segment contributes its end point, and each run also its first start point
+    vertices = np.stack([clipped_starts, clipped_ends], axis=1).reshape(-1, 2)
+    emitted = np.ones(2 * len(kept), dtype=bool)
+    emitted[0::2] = run_starts
+    run_ids = np.cumsum(run_starts) - 1
+    offsets = np.zeros(run_ids[-1] + 2, dtype=np.int64)
+    np.cumsum(np.bincount(run_ids) + 1, out=offsets[1:])
+    return PackedLines(
+        vertices[emitted],
+        offsets,
+        packed.pens[line_indices[vertex_indices[run_starts]]],
+    )
+
+
+def polygonal_part(geometry):
+    """
+    Get the polygonal part of a geometry, i.e. the area that lines are clipped against.
+
+    Lines and points within geometry collections enclose no area and are ignored.
+
+    :param geometry: Shapely geometry
+    :return: A Polygon or MultiPolygon, possibly empty
+    """
+    if shapely.get_type_id(geometry) in (_POLYGON, _MULTIPOLYGON):
+        return geometry
+    parts = shapely.get_parts(geometry)
+    while len(parts) > 0 and np.any(shapely.get_type_id(parts) == _GEOMETRYCOLLECTION):
+        parts = shapely.get_parts(parts)
+    polygons = parts[np.isin(shapely.get_type_id(parts), (_POLYGON, _MULTIPOLYGON))]
+    if len(polygons) == 0:
+        return shapely.Polygon()
+    if len(polygons) == 1:
+        return polygons[0]
+    return shapely.union_all(polygons)
+
+
+def clip_to_regions(packed: PackedLines, regions, difference: bool = False) -> PackedLines:
+    """
+    Clip lines to (or out of) polygonal regions.
+
+    Every line is clipped against its own region, with all lines handled by a single
+    vectorized shapely operation. Lines entirely inside or outside of their region are
+    recognized with prepared predicates and passed through or dropped without any
+    overlay. Each remaining piece keeps the pen of the line it was cut from, and
+    pieces are ordered as their source lines are. Lines with fewer than two vertices
+    are dropped.
+
+    Only the polygonal part of a region is clipped against; a region without any area
+    contains no lines.
+
+    :param packed: Lines to clip
+    :param regions: Shapely geometry to clip every line to, or an array of one geometry per line
+    :param difference: Keep the parts of lines outside of their region rather than inside
+    :return: The clipped lines
+    """
+    num_lines = len(packed)
+    regions = np.asarray(regions, dtype=object)
+    if regions.ndim == 0:
+        regions = np.full(num_lines, polygonal_part(regions.item()), dtype=object)
+    else:
+        regions = np.array([polygonal_part(region) for region in regions], dtype=object)
+    drawable = packed.line_lengths() >= 2
+    if not np.all(drawable):
+        packed, regions = packed.take(drawable), regions[drawable]
+    if len(packed) == 0:
+        return PackedLines()
+    shapely.prepare(regions)
+    linestrings = packed.linestrings()
+
+    inside = shapely.contains_properly(regions, linestrings)
+    outside = ~shapely.intersects(regions, linestrings)
+    if difference:
+        inside, outside = outside, inside
+    kept = np.flatnonzero(inside)
+    crossing = np.flatnonzero(~inside & ~outside)
+
+    operation = shapely.difference if difference else shapely.intersection
+    pieces, piece_lines = shapely.get_parts(
+        operation(linestrings[crossing], regions[crossing]), return_index=True
+    )
+    # Overlays may also yield collections holding points where a line touches a boundary
+    while len(pieces) > 0 and np.any(shapely.get_type_id(pieces) == _GEOMETRYCOLLECTION):
+        nested = shapely.get_type_id(pieces) == _GEOMETRYCOLLECTION
+        parts, part_indices = shapely.get_parts(pieces[nested], return_index=True)
+        pieces = np.concatenate([pieces[~nested], parts])
+        piece_lines = np.concatenate([piece_lines[~nested], piece_lines[nested][part_indices]])
+    is_line = (shapely.get_type_id(pieces) == _LINESTRING) & ~shapely.is_empty(pieces)
+    pieces = pieces[is_line]
+    piece_lines = crossing[piece_lines[is_line]]
+
+    # Interleave the untouched lines with the pieces, in the order of their source lines
+    order = np.argsort(np.concatenate([kept, piece_lines]), kind="stable")
+    unclipped = packed.take(kept)
+    combined = PackedLines.concatenate([unclipped, PackedLines.from_linestrings(pieces, packed.pens[piece_lines])])
+    return combined.take(order)
+
+
+def clip_to_region(packed: PackedLines, region, difference: bool = False) -> PackedLines:
+    """
+    Clip lines to (or out of) a single polygonal region.
+
+    See :func:`clip_to_regions`.
+
+    :param packed: Lines to clip
+    :param region: Shapely geometry to clip to
+    :param difference: Keep the parts of lines outside of the region rather than inside
+    :return: The clipped lines
+    """
+    return clip_to_regions(packed, region, difference)
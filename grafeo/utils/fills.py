@@ -0,0 +1,214 @@
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import shapely
+
+from ..models.PackedLines import PackedLines
+from .clipping import polygonal_part
+from .hatch_join import JOIN_TOLERANCE, join_strokes
+from .scanline import get_rings, hatch_regions
+
+
+@dataclass
+class Fill:
+    """
+    The lines filling a batch of regions.
+
+    :ivar lines: All lines, grouped by region in order
+    :vartype lines: :class:`grafeo.models.PackedLines`
+    :ivar regions: Index of the region each line fills
+    :vartype regions: :class:`numpy.ndarray`
+    :ivar pen_down_length: Total length drawn with the pen down
+    :vartype pen_down_length: float
+    """
+
+    lines: PackedLines
+    regions: np.ndarray
+    pen_down_length: float
+
+    @staticmethod
+    def from_lines(lines: PackedLines, regions: np.ndarray) -> "Fill":
+        """Create a fill, measuring the length of its lines."""
+        return Fill(lines, regions, float(lines.path_lengths().sum()))
+
+
+def _polygonal_parts(geometries) -> np.ndarray:
+    return np.array([polygonal_part(geometry) for geometry in geometries], dtype=object)
+
+
+def _rotate(coords: np.ndarray, radians: np.ndarray) -> np.ndarray:
+    """Rotate each point about the origin by its own angle."""
+    cos, sin = np.cos(radians), np.sin(radians)
+    return np.column_stack([cos * coords[:, 0] - sin * coords[:, 1], sin * coords[:, 0] + cos * coords[:, 1]])
+
+
+def _parallel_lines(
+    rings: PackedLines, ring_regions: np.ndarray, num_regions: int, pens, angles, spacings
+) -> tuple[PackedLines, np.ndarray]:
+    """
+    Fill regions with parallel lines at any angle, a given perpendicular distance apart.
+
+    Each region is rotated so that its lines run vertically, hatched, and the hatch
+    lines are rotated back.
+    """
+    radians = np.radians(np.asarray(angles, dtype=np.float64))
+    vertex_regions = ring_regions[rings.line_indices()]
+    rotated = _rotate(rings.coords, radians[vertex_regions])
+
+    bounds = np.zeros((num_regions, 4), dtype=np.float64)
+    if len(rotated) > 0:
+        bounds[:, :2] = np.inf
+        bounds[:, 2:] = -np.inf
+        np.minimum.at(bounds[:, :2], vertex_regions, rotated)
+        np.maximum.at(bounds[:, 2:], vertex_regions, rotated)
+        bounds[~np.isfinite(bounds)] = 0
+
+    strokes, stroke_regions = hatch_regions(
+        PackedLines(rotated, rings.offsets, rings.pens),
+        ring_regions,
+        bounds,
+        pens,
+        np.zeros(num_regions),
+        spacings,
+    )
+    stroke_vertex_regions = stroke_regions[strokes.line_indices()]
+    strokes.coords = _rotate(strokes.coords, -radians[stroke_vertex_regions])
+    return strokes, stroke_regions
+
+
+def cross_hatch(geometries, pens, angles, spacings, join_distances=None) -> Fill:
+    """
+    Fill regions with two perpendicular sets of parallel lines.
+
+    Unlike :meth:`Hatchable.hatch`, spacings are measured perpendicular to the lines,
+    which may be at any angle. Lines are chained into zig-zags, as for hatching.
+
+    :param geometries: Shapely geometry of each region
+    :param pens: Pen value to draw each region's lines with
+    :param angles: Angle of each region's first set of lines, in degrees from vertical
+    :param spacings: Distance between each region's lines
+    :param join_distances: Longest joint to chain each region's lines with. Defaults
+        to a multiple of the spacing; 0 leaves every line separate.
+    :return: The lines filling each region
+    """
+    geometries = _polygonal_parts(geometries)
+    num_regions = len(geometries)
+    pens = np.asarray(pens, dtype=np.int64)
+    angles = np.asarray(angles, dtype=np.float64)
+    spacings = np.asarray(spacings, dtype=np.float64)
+
+    # Both directions are hatched in one pass, with regions num_regions and up for the second
+    rings, ring_regions = get_rings(geometries)
+    strokes, stroke_regions = _parallel_lines(
+        PackedLines.concatenate([rings, rings]),
+        np.concatenate([ring_regions, ring_regions + num_regions]),
+        2 * num_regions,
+        np.tile(pens, 2),
+        np.concatenate([angles, angles + 90]),
+        np.tile(spacings, 2),
+    )
+    stroke_regions = stroke_regions % num_regions if num_regions > 0 else stroke_regions
+    order = np.argsort(stroke_regions, kind="stable")
+    strokes, stroke_regions = strokes.take(order), stroke_regions[order]
+
+    if join_distances is None:
+        join_distances = JOIN_TOLERANCE * spacings
+    return Fill.from_lines(*join_strokes(strokes, stroke_regions, geometries, join_distances))
+
+
+def contour_fill(geometries, pens, spacings, max_contours: int = None) -> Fill:
+    """
+    Fill regions with concentric contours, each offset inwards from the last.
+
+    Contours are found by buffering every region inwards by increasing multiples of
+    its spacing, all regions at once, until nothing is left of them.
+
+    :param geometries: Shapely geometry of each region
+    :param pens: Pen value to draw each region's contours with
+    :param spacings: Distance between each region's contours. Must be positive.
+    :param max_contours: If given, draw at most this many contours per region
+    :return: The contours filling each region, outermost first, as closed lines
+    :raises ValueError: If a spacing isn't positive, as the contours would never shrink
+    """
+    geometries = _polygonal_parts(geometries)
+    pens = np.asarray(pens, dtype=np.int64)
+    spacings = np.asarray(spacings, dtype=np.float64)
+    if not np.all(spacings > 0):
+        raise ValueError("Contour spacings must be positive")
+
+    contours = []
+    contour_regions = []
+    active = np.flatnonzero(~shapely.is_empty(geometries))
+    step = 1
+    while len(active) > 0 and (max_contours is None or step <= max_contours):
+        offset = shapely.buffer(geometries[active], -step * spacings[active], join_style="mitre")
+        polygons, polygon_indices = shapely.get_parts(offset, return_index=True)
+        rings, ring_polygons = shapely.get_rings(polygons, return_index=True)
+        contours.append(rings)
+        contour_regions.append(active[polygon_indices[ring_polygons]])
+        active = active[~shapely.is_empty(offset)]
+        step += 1
+
+    if len(contours) == 0:
+        return Fill.from_lines(PackedLines(), np.empty(0, dtype=np.int64))
+    regions = np.concatenate(contour_regions)
+    order = np.argsort(regions, kind="stable")
+    regions = regions[order]
+    return Fill.from_lines(PackedLines.from_linestrings(np.concatenate(contours)[order], pens[regions]), regions)
+
+
+def stipple(
+    geometries,
+    pens,
+    densities,
+    dot_sizes,
+    density_function: Callable[[np.ndarray, np.ndarray], np.ndarray] = None,
+    seed: int = None,
+) -> Fill:
+    """
+    Fill regions with randomly placed dots.
+
+    Candidate dots are scattered uniformly over each region's bounds, all regions at
+    once, and those not inside the region are discarded. Each dot is drawn as a
+    short horizontal dash.
+
+    :param geometries: Shapely geometry of each region
+    :param pens: Pen value to draw each region's dots with
+    :param densities: Number of dots per unit of area in each region
+    :param dot_sizes: Length of the dash drawn for each region's dots
+    :param density_function: If given, the relative density at given x and y coordinates,
+        between 0 and 1, by which dots are thinned out
+    :param seed: Seed for the random number generator
+    :return: The dots filling each region
+    """
+    geometries = _polygonal_parts(geometries)
+    pens = np.asarray(pens, dtype=np.int64)
+    densities = np.asarray(densities, dtype=np.float64)
+    dot_sizes = np.asarray(dot_sizes, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    bounds = np.nan_to_num(shapely.bounds(geometries).reshape(-1, 4))
+    widths, heights = bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1]
+    counts = rng.poisson(densities * widths * heights)
+    regions = np.repeat(np.arange(len(geometries)), counts)
+    x = bounds[regions, 0] + rng.random(len(regions)) * widths[regions]
+    y = bounds[regions, 1] + rng.random(len(regions)) * heights[regions]
+
+    # Keep dots whose centre and dash ends all lie inside
+    shapely.prepare(geometries)
+    half_sizes = dot_sizes[regions] / 2
+    inside = shapely.contains_xy(geometries[regions], x, y)
+    inside[inside] &= shapely.contains_xy(geometries[regions[inside]], x[inside] - half_sizes[inside], y[inside])
+    inside[inside] &= shapely.contains_xy(geometries[regions[inside]], x[inside] + half_sizes[inside], y[inside])
+    if density_function is not None:
+        inside &= rng.random(len(regions)) < np.clip(density_function(x, y), 0, 1)
+    regions, x, y = regions[inside], x[inside], y[inside]
+
+    # Draw each region's dots row by row
+    order = np.lexsort((x, y, regions))
+    regions, x, y = regions[order], x[order], y[order]
+    half_sizes = dot_sizes[regions] / 2
+    coords = np.stack([np.column_stack([x - half_sizes, y]), np.column_stack([x + half_sizes, y])], axis=1)
+    dots = PackedLines(coords.reshape(-1, 2), np.arange(0, 2 * len(regions) + 1, 2), pens[regions])
+    return Fill.from_lines(dots, regions)
@@ -1,10 +1,14 @@
 import more_itertools
+import numpy as np
+import shapely
 from py5 import Py5Vector
 from shapely import affinity
 from shapely.geometry import LineString, MultiLineString, MultiPolygon
 from shapely.ops import polygonize, unary_union
 
 from ..generators.Line import Line
+from ..models.PackedLines import PackedLines
+from .hatch_join import join_strokes
 
 
 # Makes a potentially non-simple polygon out of two lines
@@ -80,39 +84,12 @@ def hatch(
     # And intersect them with the polygon
     cropped = mls.intersection(hatch_polygon)
 
-    # Now try to merge the lines boustrophedonically. This algorithm relies on the lines being sorted nicely by
-    # intersection(). It does not work on messy polygons: concave or those with holes. The intersection operation
-    # seems to mostly preserve ordering of the line collection but if it has to break a line it seems to insert new
-    # lines in-place when putting them at the end would be more helpful to this algorithm. I think complex polyognos
-    # could be supported by making the code actually search for the closest next line to join to, instead of relying
-    # on intersection() returning lines in a useful order. for the small number of lines a simple scan would
-    # probably work. Optimizations would be to counter-rotate the lines back to horizontal and sort by Y, or maybe
-    # build a full spatial index.
-    lines = list(cropped.geoms)  # type: ignore
-    merged = []  # collection of new merged lines
-    to_merge = list(lines[0].coords)  # accumulate the next new merged line here
-    which_end = 1  # whether we're at the left end of the line or the right
-    join_limit = (
-        spacing * tolerance
-    ) ** 2  # squared to avoid sqrt in distance calculation
-    for line in lines[1:]:
-        # Endpoint of the previous line we're building up
-        old_x, old_y = to_merge[-1]
-        # New candidate line and the point we're considering merging in
-        lc = line.coords
-        new_x, new_y = lc[which_end]
-        # Check the distance of the new candidate joining line
-        if ((new_x - old_x) ** 2 + (new_y - old_y) ** 2) < join_limit:
-            # Small enough? Attach candidate line to the line we're building
-            to_merge.append((new_x, new_y))
-            to_merge.append(lc[1 - which_end])
-        else:
-            # Too far away; start a new line
-            merged.append(to_merge)
-            to_merge = list(lc)
-        which_end = 1 - which_end  # turn the ox around
-    merged.append(to_merge)  # bring in the final line
+    # Now merge the lines boustrophedonically, chaining each line to the nearest free end of another
+    # as long as the joint is short enough and stays inside the polygon
+    strokes = PackedLines.from_linestrings(shapely.get_parts(cropped))
+    merged, _ = join_strokes(
+        strokes, np.zeros(len(strokes), dtype=np.int64), np.array([hatch_polygon], dtype=object), [spacing * tolerance]
+    )
 
-    # print(f'{len(merged)} lines in hatch pattern')
     # And return the hatch lines as a collection
-    return MultiLineString(merged)
+    return MultiLineString(list(merged.linestrings()))
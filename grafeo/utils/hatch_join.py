@@ -0,0 +1,145 @@
+import numpy as np
+import shapely
+from scipy.spatial import KDTree
+
+from ..models.PackedLines import PackedLines
+
+# Strokes are joined by default if no further apart than this many times their spacing
+JOIN_TOLERANCE = 5
+# Number of nearest endpoints considered when continuing a stroke
+_NUM_CANDIDATES = 8
+# Number of those which are then checked to stay inside, after discarding unsuitable ones
+_NUM_CHECKED = 3
+# Regions are grown by this fraction of the join distance when checking that a joint
+# stays inside, so that joints running along the region's edges are accepted
+_EPSILON = 1e-6
+
+
+def join_strokes(
+    strokes: PackedLines, stroke_regions: np.ndarray, regions: np.ndarray, join_distances: np.ndarray
+) -> tuple[PackedLines, np.ndarray]:
+    """
+    Chain strokes into continuous polylines, so they can be drawn without lifting the pen.
+
+    Starting from the first stroke not yet drawn, each chain is greedily extended by
+    the nearest free stroke endpoint, found with a KD-tree over all endpoints. The
+    stroke is then drawn on from that endpoint, reversed if need be. Only strokes of
+    the same region and pen are joined, and only if the joint is no longer than the
+    region's join distance and is covered by the region, its edges included. Joints
+    which would leave the region are skipped, and the pen is lifted there instead.
+    For hatching, this yields the usual zig-zag, with joints running along the
+    region's edges, also for concave regions and regions with holes.
+
+    :param strokes: Strokes to join, in the order they should preferably be drawn
+    :param stroke_regions: Index of the region each stroke belongs to
+    :param regions: Shapely geometry of each region. Joints must lie within it, or on its edges.
+    :param join_distances: Maximum length of a joint within each region
+    :return: The joined polylines, and the index of the region each belongs to
+    """
+    stroke_regions = np.asarray(stroke_regions, dtype=np.int64)
+    join_distances = np.asarray(join_distances, dtype=np.float64)
+    num_strokes = len(strokes)
+    if num_strokes < 2 or not np.any(join_distances > 0):
+        return strokes, stroke_regions
+
+    # Endpoint 2 * s is the start of stroke s, and endpoint 2 * s + 1 its end
+    lengths = strokes.line_lengths()
+    endpoints = np.stack(
+        [strokes.coords[strokes.offsets[:-1]], strokes.coords[strokes.offsets[1:] - 1]], axis=1
+    ).reshape(-1, 2)
+    num_neighbours = min(_NUM_CANDIDATES + 1, len(endpoints))
+    distances, neighbours = KDTree(endpoints).query(
+        endpoints, k=num_neighbours, distance_upper_bound=join_distances.max()
+    )
+    distances = distances.reshape(len(endpoints), -1)
+    neighbours = neighbours.reshape(len(endpoints), -1)
+
+    # Candidate joints, ordered by endpoint and then by length
+    sources = np.repeat(np.arange(len(endpoints)), neighbours.shape[1])
+    targets = neighbours.ravel()
+    found = targets < len(endpoints)
+    sources, targets, distances = sources[found], targets[found], distances.ravel()[found]
+    source_regions = stroke_regions[sources // 2]
+    candidate = (
+        (sources // 2 != targets // 2)
+        & (source_regions == stroke_regions[targets // 2])
+        & (strokes.pens[sources // 2] == strokes.pens[targets // 2])
+        & (distances <= join_distances[source_regions])
+    )
+    sources, targets, source_regions = sources[candidate], targets[candidate], source_regions[candidate]
+    # Only the nearest few are worth checking in full
+    group_starts = np.searchsorted(sources, sources)
+    nearest = np.arange(len(sources)) - group_starts < _NUM_CHECKED
+    sources, targets, source_regions = sources[nearest], targets[nearest], source_regions[nearest]
+
+    # Joints must not leave their region
+    if len(sources) > 0:
+        joined_regions = np.unique(source_regions)
+        grown = np.empty(len(regions), dtype=object)
+        grown[joined_regions] = shapely.buffer(
+            np.asarray(regions, dtype=object)[joined_regions],
+            _EPSILON * join_distances[joined_regions],
+            quad_segs=1,
+            join_style="mitre",
+        )
+        shapely.prepare(grown[joined_regions])
+        # Joints between the same two endpoints found from either end are checked once
+        keys = np.minimum(sources, targets) * len(endpoints) + np.maximum(sources, targets)
+        unique_keys, key_indices = np.unique(keys, return_inverse=True)
+        lower, upper = np.divmod(unique_keys, len(endpoints))
+        joints = shapely.linestrings(np.stack([endpoints[lower], endpoints[upper]], axis=1))
+        inside = shapely.covers(grown[stroke_regions[lower // 2]], joints)[key_indices]
+        sources, targets = sources[inside], targets[inside]
+
+    candidate_offsets = np.zeros(len(endpoints) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(endpoints)), out=candidate_offsets[1:])
+    candidate_offsets = candidate_offsets.tolist()
+    targets = targets.tolist()
+
+    # Greedily chain strokes, as (stroke, reversed) pairs
+    used = [False] * num_strokes
+    chain_strokes = []
+    chain_reversed = []
+    chain_lengths = []
+    for first in range(num_strokes):
+        if used[first]:
+            continue
+        used[first] = True
+        chain_strokes.append(first)
+        chain_reversed.append(False)
+        chain_length = 1
+        end = 2 * first + 1
+        while True:
+            for target in targets[candidate_offsets[end]:candidate_offsets[end + 1]]:
+                if not used[target >> 1]:
+                    break
+            else:
+                break
+            used[target >> 1] = True
+            chain_strokes.append(target >> 1)
+            chain_reversed.append(bool(target & 1))
+            chain_length += 1
+            end = target ^ 1
+        chain_lengths.append(chain_length)
+
+    # Gather the vertices of every chain, reversing strokes drawn backwards
+    chain_strokes = np.array(chain_strokes, dtype=np.int64)
+    chain_reversed = np.array(chain_reversed, dtype=bool)
+    element_lengths = lengths[chain_strokes]
+    positions = np.arange(element_lengths.sum()) - np.repeat(
+        np.cumsum(element_lengths) - element_lengths, element_lengths
+    )
+    starts = np.repeat(strokes.offsets[:-1][chain_strokes], element_lengths)
+    vertex_indices = np.where(
+        np.repeat(chain_reversed, element_lengths),
+        starts + np.repeat(element_lengths, element_lengths) - 1 - positions,
+        starts + positions,
+    )
+    chain_firsts = np.cumsum([0] + chain_lengths[:-1])
+    offsets = np.zeros(len(chain_lengths) + 1, dtype=np.int64)
+    np.cumsum(np.add.reduceat(element_lengths, chain_firsts), out=offsets[1:])
+    first_strokes = chain_strokes[chain_firsts]
+    return (
+        PackedLines(strokes.coords[vertex_indices], offsets, strokes.pens[first_strokes]),
+        stroke_regions[first_strokes],
+    )
@@ -0,0 +1,170 @@
+import math
+
+import numpy as np
+
+from ..models.PackedLines import PackedLines
+
+
+def _snap(coords: np.ndarray, tolerance: float) -> np.ndarray:
+    """Get the grid cell of every point, for cells `tolerance` wide."""
+    return np.floor(coords / tolerance).astype(np.int64)
+
+
+def _segment_runs(
+    packed: PackedLines, starts: np.ndarray, ends: np.ndarray, line_indices: np.ndarray, kept: np.ndarray
+) -> PackedLines:
+    """
+    Turn a subset of segments back into polylines.
+
+    A kept segment continues the previous one's polyline if it directly follows it
+    on the same line.
+    """
+    segment_indices = np.flatnonzero(kept)
+    if len(segment_indices) == 0:
+        return PackedLines()
+    run_starts = np.ones(len(segment_indices), dtype=bool)
+    run_starts[1:] = (segment_indices[1:] != segment_indices[:-1] + 1) | (
+        line_indices[segment_indices[1:]] != line_indices[segment_indices[:-1]]
+    )
+    # Every segment contributes its end point, and each run also its first start point
+    vertices = np.stack([starts[segment_indices], ends[segment_indices]], axis=1).reshape(-1, 2)
+    emitted = np.ones(2 * len(segment_indices), dtype=bool)
+    emitted[0::2] = run_starts
+    run_ids = np.cumsum(run_starts) - 1
+    offsets = np.zeros(run_ids[-1] + 2, dtype=np.int64)
+    np.cumsum(np.bincount(run_ids) + 1, out=offsets[1:])
+    return PackedLines(vertices[emitted], offsets, packed.pens[line_indices[segment_indices[run_starts]]])
+
+
+def remove_redundant_segments(packed: PackedLines, tolerance: float) -> PackedLines:
+    """
+    Drop zero-length segments, and segments which repeat an earlier one.
+
+    Points are compared by the cell of a grid `tolerance` wide they fall in. Vertices
+    in the same cell as the previous vertex of their line are dropped, and then
+    segments between the same two cells as an earlier segment of the same pen (in
+    either direction) are dropped, splitting their line. Lines left without any
+    segment are dropped.
+
+    :param packed: Lines to clean up
+    :param tolerance: Size of the grid points are compared on
+    :return: The remaining lines
+    """
+    if len(packed.coords) < 2:
+        return PackedLines()
+    cells = _snap(packed.coords, tolerance)
+    line_indices = packed.line_indices()
+    repeated = np.zeros(len(cells), dtype=bool)
+    repeated[1:] = np.all(cells[1:] == cells[:-1], axis=1) & (line_indices[1:] == line_indices[:-1])
+    cells = cells[~repeated]
+    line_indices = line_indices[~repeated]
+    packed = PackedLines(
+        packed.coords[~repeated],
+        np.searchsorted(line_indices, np.arange(len(packed) + 1)),
+        packed.pens,
+    )
+
+    # Key each segment by its pen and its two cells, in a fixed order
+    starts, ends, segment_lines = packed.segments()
+    is_segment = line_indices[:-1] == line_indices[1:]
+    start_cells, end_cells = cells[:-1][is_segment], cells[1:][is_segment]
+    flipped = (start_cells[:, 0] > end_cells[:, 0]) | (
+        (start_cells[:, 0] == end_cells[:, 0]) & (start_cells[:, 1] > end_cells[:, 1])
+    )
+    keys = np.where(
+        flipped[:, np.newaxis],
+        np.concatenate([end_cells, start_cells], axis=1),
+        np.concatenate([start_cells, end_cells], axis=1),
+    )
+    keys = np.concatenate([packed.pens[segment_lines][:, np.newaxis], keys], axis=1)
+    kept = np.zeros(len(keys), dtype=bool)
+    if len(keys) > 0:
+        kept[np.unique(keys, axis=0, return_index=True)[1]] = True
+    return _segment_runs(packed, starts, ends, segment_lines, kept)
+
+
+def merge_lines(packed: PackedLines, tolerance: float) -> PackedLines:
+    """
+    Join polylines drawn with the same pen whose endpoints are within a tolerance.
+
+    Endpoints are bucketed in a hash grid of cells `tolerance` wide, so only those
+    in neighbouring cells are compared. Each line is extended at its end, and then
+    at its start, by another line meeting it there, reversed if need be, until no
+    line is left to join. The joined vertex of the added line is dropped.
+
+    :param packed: Lines to join
+    :param tolerance: Greatest distance between two endpoints that are joined
+    :return: The joined lines, in the order of the first line of each
+    """
+    drawn = np.flatnonzero(packed.line_lengths() > 0)
+    packed = packed.take(drawn)
+    num_lines = len(packed)
+    if num_lines == 0:
+        return packed
+
+    # Endpoint 2 * i is the start of line i, and endpoint 2 * i + 1 its end
+    endpoints = np.stack([packed.coords[packed.offsets[:-1]], packed.coords[packed.offsets[1:] - 1]], axis=1)
+    endpoints = endpoints.reshape(-1, 2)
+    cells = _snap(endpoints, tolerance).tolist()
+    points = endpoints.tolist()
+    pens = packed.pens.tolist()
+    grid = {}
+    for endpoint, cell in enumerate(cells):
+        grid.setdefault(tuple(cell), []).append(endpoint)
+
+    used = [False] * num_lines
+
+    def find_joint(endpoint):
+        """Find the nearest free endpoint of another line with the same pen."""
+        line = endpoint >> 1
+        x, y = points[endpoint]
+        cell_x, cell_y = cells[endpoint]
+        best, best_distance = None, tolerance
+        for neighbour_x in (cell_x - 1, cell_x, cell_x + 1):
+            for neighbour_y in (cell_y - 1, cell_y, cell_y + 1):
+                for candidate in grid.get((neighbour_x, neighbour_y), ()):
+                    other = candidate >> 1
+                    if other == line or used[other] or pens[other] != pens[line]:
+                        continue
+                    distance = math.dist((x, y), points[candidate])
+                    if distance <= best_distance:
+                        best, best_distance = candidate, distance
+        return best
+
+    # Each chain is a list of (line, reversed) pairs
+    chains = []
+    for first in range(num_lines):
+        if used[first]:
+            continue
+        used[first] = True
+        forward = [(first, False)]
+        end = 2 * first + 1
+        while (joint := find_joint(end)) is not None:
+            used[joint >> 1] = True
+            forward.append((joint >> 1, bool(joint & 1)))
+            end = joint ^ 1
+        backward = []
+        start = 2 * first
+        while (joint := find_joint(start)) is not None:
+            used[joint >> 1] = True
+            # Lines added before the start are drawn so as to end at the joint
+            backward.append((joint >> 1, not joint & 1))
+            start = joint ^ 1
+        chains.append(backward[::-1] + forward)
+
+    # Gather the vertices of every chain, dropping the first vertex of each joined line
+    elements = [element for chain in chains for element in chain]
+    element_lines = np.array([line for line, _ in elements], dtype=np.int64)
+    element_reversed = np.array([reversed_ for _, reversed_ in elements], dtype=bool)
+    chain_lengths = np.array([len(chain) for chain in chains], dtype=np.int64)
+    ordered = packed.take(element_lines, element_reversed)
+    is_joined = np.ones(len(elements), dtype=bool)
+    is_joined[np.cumsum(chain_lengths) - chain_lengths] = False
+    kept = np.ones(len(ordered.coords), dtype=bool)
+    kept[ordered.offsets[:-1][is_joined]] = False
+
+    lengths = ordered.line_lengths() - is_joined
+    chain_ids = np.repeat(np.arange(len(chains)), chain_lengths)
+    offsets = np.zeros(len(chains) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(chain_ids, weights=lengths, minlength=len(chains)).astype(np.int64), out=offsets[1:])
+    return PackedLines(ordered.coords[kept], offsets, ordered.pens[np.cumsum(chain_lengths) - chain_lengths])
@@ -0,0 +1,179 @@
+from dataclasses import dataclass
+import math
+
+import numpy as np
+from scipy.spatial import KDTree
+
+from ..models.PackedLines import PackedLines
+
+# Number of nearest endpoints looked at for each greedy step and 2-opt move
+_NUM_NEIGHBOURS = 16
+# Upper limit on full 2-opt passes over a pen's lines
+_MAX_TWO_OPT_PASSES = 10
+
+
+@dataclass
+class PathOptimization:
+    """
+    Lines reordered to reduce pen-up travel.
+
+    :ivar lines: The reordered lines
+    :vartype lines: :class:`grafeo.models.PackedLines`
+    :ivar travel_before: Pen-up travel distance of the lines in their original order
+    :vartype travel_before: float
+    :ivar travel_after: Pen-up travel distance of the reordered lines
+    :vartype travel_after: float
+    """
+
+    lines: PackedLines
+    travel_before: float
+    travel_after: float
+
+
+def travel_distance(packed: PackedLines, start: tuple[float, float] = (0, 0)) -> float:
+    """
+    Get the distance travelled with the pen up when drawing lines in order.
+
+    :param packed: Lines to draw
+    :param start: Position of the pen before the first line
+    :return: The sum of the distances from `start` to the first line, and from the end
+        of each line to the start of the next
+    """
+    drawn = packed.line_lengths() > 0
+    starts = packed.coords[packed.offsets[:-1][drawn]]
+    ends = packed.coords[packed.offsets[1:][drawn] - 1]
+    previous_ends = np.concatenate([np.asarray(start, dtype=np.float64).reshape(1, 2), ends[:-1]])
+    return float(np.hypot(*(starts - previous_ends).T).sum())
+
+
+def _greedy_order(endpoints: np.ndarray, start: tuple[float, float]) -> tuple[list[int], list[bool]]:
+    """
+    Order lines by repeatedly drawing the one with the nearest free endpoint next.
+
+    Endpoint 2 * i is the start of line i, and endpoint 2 * i + 1 its end. A line
+    entered at its end is drawn reversed. Endpoints of drawn lines are pruned from
+    the KD-tree by rebuilding it once most of them are used.
+    """
+    num_lines = len(endpoints) // 2
+    used = [False] * num_lines
+    order = []
+    reversed_ = []
+    tree_ids = np.arange(len(endpoints))
+    tree = KDTree(endpoints)
+    num_used_in_tree = 0
+    position = start
+    while len(order) < num_lines:
+        if 2 * num_used_in_tree > len(tree_ids):
+            tree_ids = np.flatnonzero(~np.repeat(used, 2))
+            tree = KDTree(endpoints[tree_ids])
+            num_used_in_tree = 0
+        # Look further afield until a free endpoint turns up
+        num_neighbours = _NUM_NEIGHBOURS
+        endpoint = None
+        while endpoint is None:
+            _, nearest = tree.query(position, k=min(num_neighbours, len(tree_ids)))
+            for candidate in tree_ids[np.atleast_1d(nearest)].tolist():
+                if not used[candidate >> 1]:
+                    endpoint = candidate
+                    break
+            num_neighbours *= 4
+        line = endpoint >> 1
+        used[line] = True
+        num_used_in_tree += 2
+        order.append(line)
+        reversed_.append(bool(endpoint & 1))
+        position = endpoints[endpoint ^ 1]
+    return order, reversed_
+
+
+def _two_opt(endpoints: np.ndarray, order: list[int], reversed_: list[bool]) -> tuple[list[int], list[bool]]:
+    """
+    Improve an order by reversing runs of lines, using neighbour lists.
+
+    For the joint from line p to line q, the candidates are lines c whose current
+    end is near the end of p. Reversing the run from q to c replaces the joints
+    p -> q and c -> next with p -> c and q -> next, which is kept if shorter.
+    """
+    num_lines = len(order)
+    if num_lines < 3:
+        return order, reversed_
+    points = endpoints.tolist()
+    _, neighbours = KDTree(endpoints).query(endpoints, k=min(_NUM_NEIGHBOURS + 1, len(endpoints)))
+    neighbours = neighbours.tolist()
+    position = [0] * num_lines
+    for index, line in enumerate(order):
+        position[line] = index
+
+    def start_of(line):
+        return 2 * line + reversed_[line]
+
+    def end_of(line):
+        return 2 * line + 1 - reversed_[line]
+
+    reversed_ = dict(zip(order, reversed_))
+    for _ in range(_MAX_TWO_OPT_PASSES):
+        improved = False
+        for i in range(1, num_lines):
+            p_end = end_of(order[i - 1])
+            q_start = start_of(order[i])
+            old_joint = math.dist(points[p_end], points[q_start])
+            for candidate in neighbours[p_end]:
+                new_joint = math.dist(points[p_end], points[candidate])
+                if new_joint >= old_joint:
+                    break
+                line = candidate >> 1
+                j = position[line]
+                if j < i or candidate != end_of(line):
+                    continue
+                gain = old_joint - new_joint
+                if j + 1 < num_lines:
+                    next_start = start_of(order[j + 1])
+                    gain += math.dist(points[candidate], points[next_start])
+                    gain -= math.dist(points[q_start], points[next_start])
+                if gain > 1e-9:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    for index in range(i, j + 1):
+                        reversed_[order[index]] = not reversed_[order[index]]
+                        position[order[index]] = index
+                    improved = True
+                    break
+        if not improved:
+            break
+    return order, [reversed_[line] for line in order]
+
+
+def optimize_paths(packed: PackedLines, start: tuple[float, float] = (0, 0)) -> PathOptimization:
+    """
+    Reorder and reverse lines to reduce the distance travelled with the pen up.
+
+    Lines are grouped by pen, in the order each pen is first used. Within each group,
+    lines are first ordered greedily by nearest endpoint, and the order is then
+    improved by 2-opt moves. Both look up nearby endpoints in a KD-tree, so this
+    scales to large numbers of lines. Lines without vertices are dropped.
+
+    :param packed: Lines to reorder
+    :param start: Position of the pen before the first line
+    :return: The reordered lines, along with the travel distance before and after
+    """
+    travel_before = travel_distance(packed, start)
+    drawn = np.flatnonzero(packed.line_lengths() > 0)
+    pens, first_uses = np.unique(packed.pens[drawn], return_index=True)
+
+    indices = []
+    reverse = []
+    position = start
+    for pen in pens[np.argsort(first_uses)].tolist():
+        lines = drawn[packed.pens[drawn] == pen]
+        endpoints = np.stack(
+            [packed.coords[packed.offsets[:-1][lines]], packed.coords[packed.offsets[1:][lines] - 1]], axis=1
+        ).reshape(-1, 2)
+        order, reversed_ = _two_opt(endpoints, *_greedy_order(endpoints, position))
+        indices.append(lines[order])
+        reverse.append(np.array(reversed_, dtype=bool))
+        last = order[-1]
+        position = endpoints[2 * last + (0 if reversed_[-1] else 1)]
+
+    if len(indices) == 0:
+        return PathOptimization(PackedLines(), travel_before, travel_before)
+    optimized = packed.take(np.concatenate(indices), np.concatenate(reverse))
+    return PathOptimization(optimized, travel_before, travel_distance(optimized, start))
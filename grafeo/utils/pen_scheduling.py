@@ -0,0 +1,29 @@
+import numpy as np
+
+from ..models.PackedLines import PackedLines
+
+
+def merge_by_pen(jobs: list[tuple[PackedLines, dict]]) -> tuple[PackedLines, dict]:
+    """
+    Merge lines queued with separate pen maps, so that each physical pen is used once.
+
+    Pens are identified by their config's `descr` across all jobs. Every physical pen
+    gets a new pen value, in the order it's first used, and each job's lines are
+    relabelled with these values. Once the lines are grouped by pen value, each
+    physical pen is then fetched exactly once.
+
+    :param jobs: The lines of each job, with the pen map they're drawn with
+    :return: All lines in job order, and the pen map of the new pen values
+    """
+    physical_pens = {}
+    pen_map = {}
+    relabelled = []
+    for lines, job_pen_map in jobs:
+        pens, first_uses, pen_indices = np.unique(lines.pens, return_index=True, return_inverse=True)
+        new_pens = np.zeros(len(pens), dtype=np.int64)
+        for index in np.argsort(first_uses).tolist():
+            config = job_pen_map[str(pens[index])]
+            new_pens[index] = physical_pens.setdefault(config["descr"], len(physical_pens) + 1)
+            pen_map.setdefault(str(new_pens[index]), config)
+        relabelled.append(PackedLines(lines.coords, lines.offsets, new_pens[pen_indices.reshape(-1)]))
+    return PackedLines.concatenate(relabelled), pen_map
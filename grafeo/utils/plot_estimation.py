@@ -0,0 +1,177 @@
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+
+from ..models.PackedLines import PackedLines
+
+
+@dataclass
+class PenEstimate:
+    """
+    What drawing with one pen involves.
+
+    :ivar pen_down_length: Distance drawn with the pen down, in plotter units
+    :vartype pen_down_length: float
+    :ivar pen_up_length: Distance travelled with the pen up, in plotter units
+    :vartype pen_up_length: float
+    :ivar lifts: Number of times the pen is lifted to move to the next line
+    :vartype lifts: int
+    :ivar pen_changes: Number of times the pen is replaced by hand
+    :vartype pen_changes: int
+    :ivar command_bytes: Number of bytes of drawing commands sent to the plotter
+    :vartype command_bytes: int
+    :ivar seconds: Estimated time taken, not counting the time the user takes to replace pens
+    :vartype seconds: float
+    """
+
+    pen_down_length: float = 0
+    pen_up_length: float = 0
+    lifts: int = 0
+    pen_changes: int = 0
+    command_bytes: int = 0
+    seconds: float = 0
+
+    def __add__(self, other: "PenEstimate") -> "PenEstimate":
+        return PenEstimate(*(getattr(self, f.name) + getattr(other, f.name) for f in fields(PenEstimate)))
+
+
+@dataclass
+class PlotEstimate:
+    """
+    What a plot involves, per pen and in total.
+
+    :ivar pens: Estimate for each physical pen, keyed by its config's `descr`, in the order they're used
+    :vartype pens: dict[str, PenEstimate]
+    """
+
+    pens: dict[str, PenEstimate] = field(default_factory=dict)
+
+    @property
+    def total(self) -> PenEstimate:
+        return sum(self.pens.values(), PenEstimate())
+
+    def __add__(self, other: "PlotEstimate") -> "PlotEstimate":
+        pens = dict(self.pens)
+        for descr, estimate in other.pens.items():
+            pens[descr] = pens.get(descr, PenEstimate()) + estimate
+        return PlotEstimate(pens)
+
+
+def move_times(lengths: np.ndarray, speed: float, acceleration: float) -> np.ndarray:
+    """
+    Get the time taken by straight moves which start and end at rest.
+
+    The plotter accelerates at a constant rate up to its top speed, and then slows
+    down the same way. Moves too short to reach the top speed accelerate for half
+    their length.
+
+    :param lengths: Length of each move
+    :param speed: Top speed
+    :param acceleration: Rate of acceleration and deceleration
+    :return: The time taken by each move
+    """
+    lengths = np.asarray(lengths, dtype=np.float64)
+    full_speed = lengths >= speed * speed / acceleration
+    return np.where(
+        full_speed,
+        lengths / speed + speed / acceleration,
+        2 * np.sqrt(lengths / acceleration),
+    )
+
+
+def estimate_plot(
+    lines: PackedLines,
+    pen_map: dict,
+    motion: dict,
+    command_bytes: np.ndarray,
+    bytes_per_second: float = None,
+    start: tuple[float, float] = (0, 0),
+) -> PlotEstimate:
+    """
+    Estimate what drawing lines in order involves, per physical pen.
+
+    Every segment is drawn as a separate move, and the pen is lifted to move from
+    each line to the next, starting from `start`. Pens are changed whenever the
+    next line's pen differs from the one loaded, if it's replaced by hand, as the
+    printers do. If the connection is slower than the plotter, the time taken with
+    each pen is the time it takes to send its commands instead.
+
+    :param lines: Lines, in plotter units, in the order they're drawn
+    :param pen_map: Pen config for each pen value, keyed by the value as a string
+    :param motion: The printer's `pen_down_speed` and `pen_up_speed` (units per second),
+        `acceleration` (units per second squared), `pen_lift_time` and `pen_change_time` (seconds)
+    :param command_bytes: Number of bytes of the commands drawing each line
+    :param bytes_per_second: Rate at which commands are sent to the plotter, if limited
+    :param start: Position of the pen before the first line
+    :return: The estimate for each physical pen
+    """
+    drawn = np.flatnonzero(lines.line_lengths() > 0)
+    lines = lines.take(drawn)
+    command_bytes = np.asarray(command_bytes)[drawn]
+    num_lines = len(lines)
+    if num_lines == 0:
+        return PlotEstimate()
+
+    # Pen-down moves along every segment, and pen-up moves from each line's end to the next start
+    line_indices = lines.line_indices()
+    segment_lengths = np.hypot(*np.diff(lines.coords, axis=0).T)
+    is_segment = line_indices[1:] == line_indices[:-1]
+    segment_lines = line_indices[1:][is_segment]
+    segment_lengths = segment_lengths[is_segment]
+    down_lengths = np.bincount(segment_lines, weights=segment_lengths, minlength=num_lines)
+    down_times = np.bincount(
+        segment_lines,
+        weights=move_times(segment_lengths, motion["pen_down_speed"], motion["acceleration"]),
+        minlength=num_lines,
+    )
+    starts = lines.coords[lines.offsets[:-1]]
+    previous_ends = np.concatenate(
+        [np.asarray(start, dtype=np.float64).reshape(1, 2), lines.coords[lines.offsets[1:-1] - 1]]
+    )
+    up_lengths = np.hypot(*(starts - previous_ends).T)
+    up_times = move_times(up_lengths, motion["pen_up_speed"], motion["acceleration"])
+
+    # Group lines by physical pen, in the order pens are first used
+    pens, first_uses, pen_indices = np.unique(lines.pens, return_index=True, return_inverse=True)
+    configs = [pen_map[str(pen)] for pen in pens.tolist()]
+    descrs = list(dict.fromkeys(configs[index]["descr"] for index in np.argsort(first_uses).tolist()))
+    groups = np.array([descrs.index(config["descr"]) for config in configs], dtype=np.int64)[pen_indices.reshape(-1)]
+
+    # As when generating commands, pens replaced by hand are changed whenever the next such
+    # pen differs from the one loaded, while other pens draw with whatever is loaded
+    is_manual = np.array([bool(config["pause_to_replace"]) for config in configs])[pen_indices.reshape(-1)]
+    manual_lines = np.flatnonzero(is_manual)
+    pen_changes = np.zeros(num_lines, dtype=np.int64)
+    if len(manual_lines) > 0:
+        manual_groups = groups[manual_lines]
+        changed = np.concatenate([[True], manual_groups[1:] != manual_groups[:-1]])
+        pen_changes[manual_lines[changed]] = 1
+
+    motion_times = down_times + up_times + motion["pen_lift_time"] + pen_changes * motion["pen_change_time"]
+
+    def per_pen(values):
+        return np.bincount(groups, weights=values, minlength=len(descrs))
+
+    seconds = per_pen(motion_times)
+    pen_bytes = per_pen(command_bytes)
+    if bytes_per_second:
+        seconds = np.maximum(seconds, pen_bytes / bytes_per_second)
+    return PlotEstimate({
+        descr: PenEstimate(
+            pen_down_length=float(down_length),
+            pen_up_length=float(up_length),
+            lifts=int(lifts),
+            pen_changes=int(changes),
+            command_bytes=int(num_bytes),
+            seconds=float(pen_seconds),
+        )
+        for descr, down_length, up_length, lifts, changes, num_bytes, pen_seconds in zip(
+            descrs,
+            per_pen(down_lengths),
+            per_pen(up_lengths),
+            np.bincount(groups, minlength=len(descrs)),
+            per_pen(pen_changes),
+            pen_bytes,
+            seconds,
+        )
+    })
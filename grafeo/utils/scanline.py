@@ -0,0 +1,108 @@
+import numpy as np
+import shapely
+
+from ..models.PackedLines import PackedLines
+from .clipping import polygonal_part
+
+
+def get_rings(geometries) -> tuple[PackedLines, np.ndarray]:
+    """
+    Get the exterior and interior rings of the polygonal part of some geometries.
+
+    :param geometries: Shapely geometry, or an array of geometries
+    :return: Every ring as a closed polyline, and the index of the geometry each
+        ring belongs to
+    """
+    geometries = np.atleast_1d(np.asarray(geometries, dtype=object))
+    polygons, polygon_indices = shapely.get_parts(
+        np.array([polygonal_part(geometry) for geometry in geometries], dtype=object), return_index=True
+    )
+    rings, ring_polygons = shapely.get_rings(polygons, return_index=True)
+    return PackedLines.from_linestrings(rings), polygon_indices[ring_polygons]
+
+
+def hatch_regions(
+    rings: PackedLines,
+    ring_regions: np.ndarray,
+    bounds: np.ndarray,
+    pens: np.ndarray,
+    angles: np.ndarray,
+    spacings: np.ndarray,
+) -> tuple[PackedLines, np.ndarray]:
+    """
+    Hatch the areas enclosed by several sets of closed rings, all at once.
+
+    For each region, hatch lines are laid `spacing` apart horizontally across its
+    bounds, at `angle` degrees from vertical, and alternate in direction. Where each
+    of them crosses the region's rings is found for all hatch lines of all regions
+    at once, and the crossings along a hatch line are paired up by the even-odd
+    rule, so holes (and the gaps between separate polygons) are left out.
+
+    :param rings: Closed rings bounding the areas. Their pens are ignored.
+    :param ring_regions: Index of the region each ring bounds
+    :param bounds: Box to lay each region's hatch lines across, as an (R, 4) array of
+        (min_x, min_y, max_x, max_y) rows. Each must contain the region's rings.
+    :param pens: Pen value to draw each region's hatch lines with
+    :param angles: Angle of each region's hatch lines, in degrees. Between -90 and 90.
+    :param spacings: Horizontal distance between each region's hatch lines
+    :return: The hatch strokes as two-vertex lines, grouped by region in order, and
+        the index of the region each stroke belongs to
+    """
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+    spacings = np.asarray(spacings, dtype=np.float64)
+    min_x, min_y, max_x, max_y = bounds.T
+    origin_y = max_y
+    slopes = np.tan(np.pi * np.asarray(angles, dtype=np.float64) / 180.0)
+    hatch_x_offsets = np.abs(slopes * (max_y - min_y))
+    start_u = min_x - hatch_x_offsets
+    num_lines = np.round((max_x - min_x + 2 * hatch_x_offsets) / spacings).astype(np.int64)
+
+    # Shear each region's plane so that its hatch line i becomes the vertical line
+    # u = start_u + i * spacing
+    starts, ends, segment_rings = rings.segments()
+    regions = np.asarray(ring_regions, dtype=np.int64)[segment_rings]
+    slope, spacing, start, origin = slopes[regions], spacings[regions], start_u[regions], origin_y[regions]
+    u0 = starts[:, 0] - slope * (starts[:, 1] - origin)
+    u1 = ends[:, 0] - slope * (ends[:, 1] - origin)
+
+    # Edge e crosses hatch lines first[e] up to last[e]. Edges are taken to span
+    # [min(u0, u1), max(u0, u1)), so a vertex lying on a hatch line is crossed
+    # once where the boundary passes through it, and zero or two times at a turn.
+    first = np.clip(np.ceil((np.minimum(u0, u1) - start) / spacing), 0, num_lines[regions]).astype(np.int64)
+    last = np.clip(np.ceil((np.maximum(u0, u1) - start) / spacing), 0, num_lines[regions]).astype(np.int64)
+    counts = last - first
+    num_crossings = counts.sum()
+    if num_crossings == 0:
+        return PackedLines(), np.empty(0, dtype=np.int64)
+    edges = np.repeat(np.arange(len(counts)), counts)
+    hatch_indices = first[edges] + np.arange(num_crossings) - np.repeat(np.cumsum(counts) - counts, counts)
+    crossing_regions = regions[edges]
+
+    u = start_u[crossing_regions] + hatch_indices * spacings[crossing_regions]
+    y0, y1 = starts[edges, 1], ends[edges, 1]
+    y = y0 + (u - u0[edges]) * (y1 - y0) / (u1[edges] - u0[edges])
+
+    # Sort crossings along each hatch line in its direction of travel: upwards for
+    # even lines and downwards for odd ones. Consecutive pairs then span the inside.
+    direction = np.where(hatch_indices % 2 == 0, 1.0, -1.0)
+    order = np.lexsort((direction * y, hatch_indices, crossing_regions))
+    u, y, crossing_regions = u[order], y[order], crossing_regions[order]
+    entries, exits = np.arange(0, num_crossings, 2), np.arange(1, num_crossings, 2)
+    drawn = y[entries] != y[exits]
+    entries, exits = entries[drawn], exits[drawn]
+
+    num_strokes = len(entries)
+    stroke_regions = crossing_regions[entries]
+    stroke_u = u[entries]
+    stroke_y = np.stack([y[entries], y[exits]], axis=1)
+    stroke_x = stroke_u[:, np.newaxis] + slopes[stroke_regions][:, np.newaxis] * (
+        stroke_y - origin_y[stroke_regions][:, np.newaxis]
+    )
+    coords = np.stack([stroke_x, stroke_y], axis=2)
+    packed = PackedLines(
+        coords.reshape(-1, 2),
+        np.arange(0, 2 * num_strokes + 1, 2),
+        np.asarray(pens, dtype=np.int64)[stroke_regions],
+    )
+    return packed, stroke_regions
+
@@ -0,0 +1,83 @@
+import numpy as np
+
+from ..models.PackedLines import PackedLines
+
+
+def _keep_vertices(packed: PackedLines, kept: np.ndarray) -> PackedLines:
+    """Create a packed collection from a subset of vertices, keeping every line."""
+    offsets = np.zeros(len(packed) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(packed.line_indices()[kept], minlength=len(packed)), out=offsets[1:])
+    return PackedLines(packed.coords[kept], offsets, packed.pens)
+
+
+def snap_to_grid(packed: PackedLines) -> PackedLines:
+    """
+    Round all vertices to whole units, and drop those that then repeat the previous vertex of their line.
+
+    :param packed: Lines to round
+    :return: The rounded lines
+    """
+    rounded = PackedLines(np.rint(packed.coords), packed.offsets, packed.pens)
+    if len(rounded.coords) < 2:
+        return rounded
+    line_indices = rounded.line_indices()
+    kept = np.ones(len(rounded.coords), dtype=bool)
+    kept[1:] = np.any(rounded.coords[1:] != rounded.coords[:-1], axis=1) | (line_indices[1:] != line_indices[:-1])
+    return _keep_vertices(rounded, kept)
+
+
+def simplify(packed: PackedLines, tolerance: float) -> PackedLines:
+    """
+    Simplify lines with the Ramer-Douglas-Peucker algorithm.
+
+    Each line's first and last vertices are kept. Between two kept vertices, the
+    vertex furthest from the segment joining them is kept too if it is further away
+    than `tolerance`, and the two halves are simplified in turn; otherwise all
+    vertices in between are dropped. Every iteration handles the spans of all lines
+    at once.
+
+    :param packed: Lines to simplify
+    :param tolerance: Greatest distance from the simplified line a dropped vertex may have
+    :return: The simplified lines
+    """
+    coords = packed.coords
+    lengths = packed.line_lengths()
+    kept = np.zeros(len(coords), dtype=bool)
+    drawn = lengths > 0
+    kept[packed.offsets[:-1][drawn]] = True
+    kept[packed.offsets[1:][drawn] - 1] = True
+
+    # Spans between two kept vertices with vertices in between
+    span_starts = packed.offsets[:-1][lengths > 2]
+    span_ends = packed.offsets[1:][lengths > 2] - 1
+    while len(span_starts) > 0:
+        interior_counts = span_ends - span_starts - 1
+        spans = np.repeat(np.arange(len(span_starts)), interior_counts)
+        first_interiors = np.cumsum(interior_counts) - interior_counts
+        vertices = span_starts[spans] + 1 + np.arange(len(spans)) - first_interiors[spans]
+
+        # Distance from each interior vertex to the segment spanning it
+        starts, ends = coords[span_starts][spans], coords[span_ends][spans]
+        deltas = ends - starts
+        squared_lengths = np.einsum("ij,ij->i", deltas, deltas)
+        offsets = coords[vertices] - starts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip(np.einsum("ij,ij->i", offsets, deltas) / squared_lengths, 0, 1)
+        t[squared_lengths == 0] = 0
+        distances = np.hypot(*(offsets - t[:, np.newaxis] * deltas).T)
+
+        # The furthest vertex of each span is the first in its group once sorted by distance
+        order = np.lexsort((-distances, spans))
+        furthest = order[first_interiors]
+        split = distances[furthest] > tolerance
+        pivots = vertices[furthest[split]]
+        kept[pivots] = True
+
+        span_starts, span_ends = (
+            np.concatenate([span_starts[split], pivots]),
+            np.concatenate([pivots, span_ends[split]]),
+        )
+        has_interior = span_ends - span_starts > 1
+        span_starts, span_ends = span_starts[has_interior], span_ends[has_interior]
+
+    return _keep_vertices(packed, kept)
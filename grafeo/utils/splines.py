@@ -57,9 +57,7 @@ def generate_line(
 # returns a new array of n points, representing equidistant samples
 # on a spline fitted to the original.
 def sample_spline(line: Line, n_samples: int, tightness: float = 0) -> Line:
-    x = np.array([point.x for point in line.points])
-    y = np.array([point.y for point in line.points])
-    xy = np.stack((x, y), axis=-1)
+    xy = line.coords
 
     # return Line(
     #     [Point(point.x, point.y, line.pen) for point in line.points],
@@ -72,10 +70,7 @@ def sample_spline(line: Line, n_samples: int, tightness: float = 0) -> Line:
     u = np.linspace(0, 1, n_samples)
     sampled_points = splev(u, tck)
     sampled_points = np.stack(sampled_points, axis=-1)
-    return Line(
-        [Point(pt[0], pt[1], line.pen) for pt in sampled_points],
-        line.pen,
-    )
+    return Line.from_coords(sampled_points, line.pen)
 
     inter_point_differences = np.diff(sampled_points, axis=0)
     inter_point_distances = np.linalg.norm(inter_point_differences, axis=-1)
@@ -96,10 +91,7 @@ def sample_spline(line: Line, n_samples: int, tightness: float = 0) -> Line:
         axis=0
     )
 
-    return Line(
-        [Point(point[0], point[1], line.pen) for point in equidistant_point_samples],
-        line.pen,
-    )
+    return Line.from_coords(equidistant_point_samples, line.pen)
 
 
 # plt.plot(*equidistant_point_samples.T, 'ok', label='original points')
@@ -0,0 +1,109 @@
+from grafeo.models import Model
+from grafeo.models.atoms import Line, Point
+from grafeo.pens import Pen
+
+
+def make_line(*points) -> Line:
+    return Line([Point(x, y, Pen.One) for x, y in points], Pen.One)
+
+
+def all_coords(model: Model) -> list:
+    return [line.coords.tolist() for line in model.all_lines]
+
+
+def test_copy_is_unchanged_by_translating_held_line():
+    model = Model()
+    line = make_line((0, 0), (1, 1))
+    model.add_line(line)
+    copy = model.copy()
+    line.translate(100, 0)
+    assert all_coords(copy) == [[[0, 0], [1, 1]]]
+    assert all_coords(model) == [[[100, 0], [101, 1]]]
+    assert copy.get_bounding_box().max_x == 1
+    assert model.get_bounding_box().max_x == 101
+
+
+def test_copy_is_unchanged_by_translating_held_point():
+    model = Model()
+    point = Point(1, 1, Pen.One)
+    model.add_point(point)
+    copy = model.copy()
+    point.translate(5, 5)
+    assert [(point.x, point.y) for point in copy.points] == [(1, 1)]
+    assert [(point.x, point.y) for point in model.points] == [(6, 6)]
+    assert copy.get_bounding_box().max_x == 1
+    assert model.get_bounding_box().max_x == 6
+
+
+def test_copy_is_unchanged_by_line_read_after_copying():
+    model = Model()
+    model.add_line(make_line((0, 0), (1, 1)))
+    copy = model.copy()
+    model.lines[0].translate(-1, -1)
+    copy.lines[0].add_point(Point(2, 2, Pen.One))
+    assert all_coords(model) == [[[-1, -1], [0, 0]]]
+    assert all_coords(copy) == [[[0, 0], [1, 1], [2, 2]]]
+
+
+def test_copy_is_unchanged_by_modifying_held_submodel():
+    model = Model()
+    submodel = Model()
+    line = make_line((0, 0), (1, 1))
+    submodel.add_line(line)
+    model.add_model(submodel)
+    copy = model.copy()
+    line.add_point(Point(100, 0, Pen.One))
+    submodel.add_line(make_line((7, 7), (8, 8)))
+    submodel.translate(0, 1)
+    assert all_coords(copy) == [[[0, 0], [1, 1]]]
+    assert all_coords(model) == [[[0, 1], [1, 2], [100, 1]], [[7, 8], [8, 9]]]
+    assert copy.get_bounding_box().max_x == 1
+
+
+def test_original_is_unchanged_by_modifying_copy():
+    model = Model()
+    submodel = Model()
+    submodel.add_line(make_line((0, 0), (1, 1)))
+    model.add_model(submodel)
+    copy = model.copy()
+    copy.models[0].lines[0].translate(5, 5)
+    copy.translate(1, 0)
+    assert all_coords(model) == [[[0, 0], [1, 1]]]
+    assert submodel.lines[0].coords.tolist() == [[0, 0], [1, 1]]
+    assert all_coords(copy) == [[[6, 5], [7, 6]]]
+
+
+def test_copy_of_copy_is_unchanged_by_modifying_original():
+    model = Model()
+    line = make_line((0, 0), (1, 1))
+    model.add_line(line)
+    copy = model.copy()
+    copy_of_copy = copy.copy()
+    copy.translate(1, 0)
+    line.translate(0, 1)
+    assert all_coords(model) == [[[0, 1], [1, 2]]]
+    assert all_coords(copy) == [[[1, 0], [2, 1]]]
+    assert all_coords(copy_of_copy) == [[[0, 0], [1, 1]]]
+
+
+def test_processing_detached_copy_leaves_original_untouched():
+    model = Model()
+    submodel = Model()
+    submodel.add_line(make_line((0, 0), (1, 1)))
+    model.add_model(submodel)
+    model.add_line(make_line((2, 2), (3, 3)))
+    detached = model.detached_copy()
+
+    def state(model):
+        return (
+            model._lines, list(model._lines), model._models, list(model._models), model._sharers,
+            list(model._sharers), model._shared, list(model._parents),
+        )
+
+    before = [state(model), state(submodel)]
+    copy = detached.copy()
+    copy.translate(1, 1)
+    copy.pack()
+    detached.models[0].lines[0].translate(5, 5)
+    assert [state(model), state(submodel)] == before
+    assert all_coords(model) == [[[0, 0], [1, 1]], [[2, 2], [3, 3]]]
@@ -0,0 +1,88 @@
+import numpy as np
+
+from grafeo.models import Model
+from grafeo.models.atoms import Line, Point
+from grafeo.pens import Pen
+
+
+def make_line(*points) -> Line:
+    return Line([Point(x, y, Pen.One) for x, y in points], Pen.One)
+
+
+def make_nested_model():
+    model = Model()
+    submodel = Model()
+    line = make_line((0, 0), (1, 1))
+    submodel.add_line(line)
+    model.add_model(submodel)
+    return model, submodel, line
+
+
+def test_submodel_lines_include_parent_transform():
+    model, submodel, _ = make_nested_model()
+    model.translate(1, 1)
+    assert submodel.lines[0].coords.tolist() == [[1, 1], [2, 2]]
+
+
+def test_held_line_coords_include_parent_transform():
+    model, _, line = make_nested_model()
+    model.translate(1, 1)
+    assert line.coords.tolist() == [[1, 1], [2, 2]]
+    assert [(point.x, point.y) for point in line.points] == [(1, 1), (2, 2)]
+
+
+def test_submodel_bounding_box_includes_parent_transform():
+    model, submodel, line = make_nested_model()
+    model.translate(1, 1)
+    bounding_box = submodel.get_bounding_box()
+    assert (bounding_box.min_x, bounding_box.max_x, bounding_box.min_y, bounding_box.max_y) == (1, 2, 1, 2)
+    bounding_box = line.get_bounding_box()
+    assert (bounding_box.min_x, bounding_box.max_x, bounding_box.min_y, bounding_box.max_y) == (1, 2, 1, 2)
+
+
+def test_held_point_includes_model_transform():
+    model = Model()
+    point = Point(1, 1, Pen.One)
+    model.add_point(point)
+    model.translate(10, 0)
+    assert (point.x, point.y) == (11, 1)
+
+
+def test_held_point_moved_after_model_transform():
+    model, submodel, _ = make_nested_model()
+    point = Point(1, 1, Pen.One)
+    submodel.add_point(point)
+    model.translate(10, 0)
+    point.translate(0, 5)
+    assert [(point.x, point.y) for point in submodel.points] == [(11, 6)]
+    assert model.get_bounding_box().max_y == 6
+
+
+def test_point_added_to_held_line_is_not_transformed():
+    model, _, line = make_nested_model()
+    model.translate(1, 1)
+    line.add_point(Point(5, 5, Pen.One))
+    assert line.coords.tolist() == [[1, 1], [2, 2], [5, 5]]
+    assert model.all_lines[0].coords.tolist() == [[1, 1], [2, 2], [5, 5]]
+
+
+def test_line_added_to_submodel_is_not_transformed():
+    model, submodel, _ = make_nested_model()
+    model.translate(1, 1)
+    submodel.add_line(make_line((5, 5), (6, 6)))
+    assert [line.coords.tolist() for line in model.all_lines] == [[[1, 1], [2, 2]], [[5, 5], [6, 6]]]
+    bounding_box = model.get_bounding_box()
+    assert (bounding_box.min_x, bounding_box.max_x, bounding_box.min_y, bounding_box.max_y) == (1, 6, 1, 6)
+
+
+def test_submodel_transform_applies_after_parent_transform():
+    model, submodel, _ = make_nested_model()
+    model.translate(1, 0)
+    submodel.rotate(90, 0, 0)
+    assert np.allclose(model.all_lines[0].coords, [[0, 1], [-1, 2]])
+
+
+def test_copy_of_submodel_includes_parent_transform():
+    model, submodel, _ = make_nested_model()
+    model.translate(1, 1)
+    assert submodel.copy().lines[0].coords.tolist() == [[1, 1], [2, 2]]
@@ -0,0 +1,11 @@
+import shapely
+
+from grafeo.models import PackedLines
+from grafeo.pens import Pen
+
+
+def test_lines_from_linestrings_default_to_first_pen():
+    packed = PackedLines.from_linestrings([shapely.LineString([(0, 0), (1, 1)]), shapely.LineString([(2, 2), (3, 3)])])
+    lines = packed.lines()
+    assert [line.pen for line in lines] == [Pen.One, Pen.One]
+    assert [line.coords.tolist() for line in lines] == [[[0, 0], [1, 1]], [[2, 2], [3, 3]]]
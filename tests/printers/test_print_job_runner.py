@@ -0,0 +1,58 @@
+import sys
+
+import pytest
+
+from grafeo.models import Model
+from grafeo.models.atoms import Line, Point
+from grafeo.pens import Pen
+from grafeo.printers.GpglPrinter import GpglPrinter
+from grafeo.printers.PrintJobRunner import PrintJobRunner
+from grafeo.serializers.MockPlotterSerializer import MockPlotterSerializer
+
+PEN_MAP = {str(pen.value): {"descr": "black", "pause_to_replace": False, "location": 1} for pen in Pen}
+PRINT_SETTINGS = {"resolution_x": 1000, "resolution_y": 1000, "margin_x": 10, "margin_y": 10}
+
+
+class FailingSerializer(MockPlotterSerializer):
+    """Stops accepting commands after a number of them."""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+
+    def serialize_command(self, command):
+        if self.plotter.commands_executed >= self.limit:
+            raise IOError("Plotter disconnected")
+        super().serialize_command(command)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    # The real plotter needs a moment to initialize, the mock doesn't
+    monkeypatch.setattr(sys.modules[GpglPrinter.__module__], "sleep", lambda seconds: None)
+
+
+def run_print(serializer) -> PrintJobRunner:
+    model = Model()
+    for i in range(20):
+        model.add_line(Line([Point(i, 0, Pen.One), Point(i, 10, Pen.One), Point(i + 1, 10, Pen.One)], Pen.One))
+    runner = PrintJobRunner(GpglPrinter(serializer))
+    runner.begin_print(lambda printer: printer.add_to_print(model, PEN_MAP, PRINT_SETTINGS, 0, 0, 1, 0))
+    runner.stop()
+    runner.thread.join()
+    return runner
+
+
+def test_finished_print_is_complete():
+    progress = run_print(MockPlotterSerializer()).get_progress()
+    assert progress.total_commands > 0
+    assert progress.commands_sent == progress.total_commands
+    assert progress.percent == 100
+    assert progress.eta == 0
+
+
+def test_failed_print_is_not_complete():
+    progress = run_print(FailingSerializer(10)).get_progress()
+    assert 0 < progress.commands_sent < progress.total_commands
+    assert progress.percent == pytest.approx(100 * progress.commands_sent / progress.total_commands)
+    assert progress.eta is None
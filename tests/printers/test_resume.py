@@ -0,0 +1,94 @@
+import sys
+
+import pytest
+
+from grafeo.models import Model
+from grafeo.models.atoms import Line, Point
+from grafeo.pens import Pen
+from grafeo.printers.GpglPrinter import GpglPrinter
+from grafeo.serializers.MockPlotterSerializer import MockPlotterSerializer
+
+PEN_MAP = {
+    str(pen.value): (
+        {"descr": "black", "pause_to_replace": False, "location": 1}
+        if pen.value % 2
+        else {"descr": "red", "pause_to_replace": True, "location": 3}
+    )
+    for pen in Pen
+}
+PRINT_SETTINGS = {"resolution_x": 1000, "resolution_y": 1000, "margin_x": 10, "margin_y": 10}
+
+
+class DisconnectingSerializer(MockPlotterSerializer):
+    """Stops accepting commands after a number of them."""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+
+    def serialize_command(self, command):
+        if self.plotter.commands_executed >= self.limit:
+            raise IOError("Plotter disconnected")
+        super().serialize_command(command)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    # The real plotter needs a moment to initialize, the mock doesn't
+    monkeypatch.setattr(sys.modules[GpglPrinter.__module__], "sleep", lambda seconds: None)
+
+
+def make_model() -> Model:
+    model = Model()
+    for i in range(40):
+        pen = Pen.One if i < 20 else Pen.Two
+        model.add_line(Line([Point(i, 0, pen), Point(i, 10, pen), Point(i + 1, 10, pen)], pen))
+    return model
+
+
+def start_print(serializer, spool_path) -> GpglPrinter:
+    printer = GpglPrinter(serializer)
+    printer.add_to_print(make_model(), PEN_MAP, PRINT_SETTINGS, 0, 0, 1, 0)
+    printer.begin_print(spool_path)
+    return printer
+
+
+def finish_print(printer: GpglPrinter):
+    # Replace pens straight away
+    while printer.printing:
+        printer.continue_print()
+
+
+@pytest.mark.parametrize("limit", [10, 60])
+def test_resume_from_command_index_draws_the_rest(tmp_path, limit):
+    expected = MockPlotterSerializer()
+    finish_print(start_print(expected, str(tmp_path / "expected.spool")))
+
+    spool_path = str(tmp_path / "print.spool")
+    interrupted = DisconnectingSerializer(limit)
+    printer = GpglPrinter(interrupted)
+    printer.add_to_print(make_model(), PEN_MAP, PRINT_SETTINGS, 0, 0, 1, 0)
+    with pytest.raises(IOError):
+        printer.begin_print(spool_path)
+        finish_print(printer)
+    command_index = printer.command_index
+    printer.end_print()
+
+    resumed = MockPlotterSerializer()
+    printer = GpglPrinter(resumed)
+    printer.resume_print(spool_path, command_index)
+    finish_print(printer)
+
+    # The print carries on from where it stopped, rather than starting over
+    assert len(resumed.plotter.plotted_segments()) < len(expected.plotter.plotted_segments())
+    plotted = interrupted.plotter.plotted_segments() | resumed.plotter.plotted_segments()
+    assert plotted == expected.plotter.plotted_segments()
+    assert printer.finished
+    assert printer.commands_sent == printer.total_commands
+
+
+def test_resume_from_outside_of_print_is_rejected(tmp_path):
+    spool_path = str(tmp_path / "print.spool")
+    finish_print(start_print(MockPlotterSerializer(), spool_path))
+    with pytest.raises(ValueError):
+        GpglPrinter(MockPlotterSerializer()).resume_print(spool_path, 10 ** 6)
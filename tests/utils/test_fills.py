@@ -0,0 +1,15 @@
+import pytest
+import shapely
+
+from grafeo.utils.fills import contour_fill
+
+
+def test_contour_fill_shrinks_until_region_is_filled():
+    fill = contour_fill([shapely.box(0, 0, 10, 10)], [1], [1])
+    assert len(fill.lines) == 4
+
+
+@pytest.mark.parametrize("spacing", [0, -1])
+def test_contour_fill_rejects_spacings_that_never_shrink(spacing):
+    with pytest.raises(ValueError):
+        contour_fill([shapely.box(0, 0, 10, 10), shapely.box(0, 0, 5, 5)], [1, 1], [1, spacing])
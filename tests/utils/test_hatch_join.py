@@ -0,0 +1,55 @@
+import pytest
+import shapely
+
+from grafeo.utils.fills import cross_hatch
+from grafeo.utils.hatch_join import join_strokes
+
+REGIONS = {
+    "box": shapely.box(0, 0, 10, 10),
+    "concave": shapely.Polygon([(0, 0), (10, 0), (10, 10), (6, 10), (6, 4), (4, 4), (4, 10), (0, 10)]),
+    "hole": shapely.box(0, 0, 10, 10).difference(shapely.box(3, 3, 7, 7)),
+}
+
+
+def segment_keys(lines) -> list:
+    starts, ends, _ = lines.segments()
+    return [tuple(sorted((tuple(start), tuple(end)))) for start, end in zip(starts.tolist(), ends.tolist())]
+
+
+def hatch_and_join(region, angle):
+    strokes = cross_hatch([region], [1], [angle], [0.25], join_distances=[0])
+    joined, _ = join_strokes(strokes.lines, strokes.regions, [region], [1.25])
+    return strokes.lines, joined
+
+
+@pytest.mark.parametrize("name", REGIONS)
+@pytest.mark.parametrize("angle", [0, 30, 45, 90])
+def test_joints_lie_inside_region(name, angle):
+    region = REGIONS[name]
+    strokes, joined = hatch_and_join(region, angle)
+
+    stroke_segments = set(segment_keys(strokes))
+    joints = [segment for segment in segment_keys(joined) if segment not in stroke_segments]
+    assert len(joints) == len(strokes) - len(joined)
+    assert shapely.covers(region.buffer(1e-9), shapely.linestrings(joints)).all()
+
+
+@pytest.mark.parametrize(("name", "angle", "max_chains"), [
+    ("box", 0, 2),
+    ("box", 45, 2),
+    ("box", 90, 2),
+    ("concave", 0, 4),
+    ("concave", 45, 10),
+    ("concave", 90, 4),
+])
+def test_neighbouring_strokes_are_joined_along_edges(name, angle, max_chains):
+    strokes, joined = hatch_and_join(REGIONS[name], angle)
+    assert len(strokes) > 50
+    assert len(joined) <= max_chains
+
+
+def test_joints_do_not_leave_region():
+    # Strokes on either side of the notch are close, but a joint between them would cross it
+    region = shapely.Polygon([(0, 0), (10, 0), (10, 10), (5.1, 10), (5.1, 1), (4.9, 1), (4.9, 10), (0, 10)])
+    strokes, joined = hatch_and_join(region, 90)
+    assert len(joined) >= 2
@@ -0,0 +1,18 @@
+import numpy as np
+
+from grafeo.models import PackedLines
+from grafeo.utils.line_merging import remove_redundant_segments
+
+
+def test_repeated_segments_of_the_same_pen_are_dropped():
+    packed = PackedLines([(0, 0), (10, 0), (10, 0), (0, 0)], [0, 2, 4], [1, 1])
+    cleaned = remove_redundant_segments(packed, 0.5)
+    assert len(cleaned) == 1
+    assert cleaned.coords.tolist() == [[0, 0], [10, 0]]
+
+
+def test_repeated_segments_of_other_pens_are_kept():
+    packed = PackedLines([(0, 0), (10, 0), (10, 0), (0, 0), (0, 0), (10, 0)], [0, 2, 4, 6], [1, 2, 1])
+    cleaned = remove_redundant_segments(packed, 0.5)
+    assert cleaned.pens.tolist() == [1, 2]
+    assert np.array_equal(cleaned.coords, [[0, 0], [10, 0], [10, 0], [0, 0]])